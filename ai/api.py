@@ -1,35 +1,67 @@
 # AI Service API v2 - GPU Server
 # Hybrid Recommender: SBERT + ALS
 # Last updated: 2026-01-21
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Any, Dict
 import os
-import numpy as np
+import threading
+import time
 
 from inference.recommendation_model import HybridRecommender
+from inference.data_source import catalog_source_from_env
+from inference.pool_cache import pool_cache_from_env
+from profiling import is_authorized, profile_request, profile_store
+import wire
+from json_response import FastJSONResponse
 
 
-def convert_numpy_types(obj: Any) -> Any:
-    """numpy 타입을 Python 네이티브 타입으로 변환"""
-    if isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, dict):
-        return {k: convert_numpy_types(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_numpy_types(item) for item in obj]
-    return obj
-
-
-app = FastAPI(title="MovieSir AI Service")
+app = FastAPI(title="MovieSir AI Service", default_response_class=FastJSONResponse)
 
 # 모델 로드 (서버 시작 시 한 번만)
 recommender = None
 
+# 후보 풀 캐시 (동일 요청 재계산 방지, 모델 재로드 시 세대 변경으로 무효화)
+pool_cache = pool_cache_from_env()
+
+# 워밍업 (로드 직후 합성 요청으로 첫 요청 지연 제거)
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_ITERATIONS = int(os.getenv("WARMUP_ITERATIONS", "2"))
+
+# 교체 후보 예비 목록 (include_reserve 요청 시) - 런타임 구간(30분)별 상위 N편
+RESERVE_PER_BAND = int(os.getenv("RESERVE_PER_BAND", "5"))
+
+# 시작 단계 상태 (/ready) - loading → warming_up → ready
+startup_state = {
+    "phase": "loading",
+    "ready": False,
+    "timings": {},
+    "warmup_error": None,
+}
+_startup_started_at = time.time()
+
+
+def _warm_up():
+    """워밍업 후 ready 전환 (백그라운드 스레드)"""
+    startup_state["phase"] = "warming_up"
+    if WARMUP_ENABLED:
+        phase_start = time.time()
+        try:
+            timings = recommender.warm_up(iterations=WARMUP_ITERATIONS)
+            startup_state["timings"]["warmup"] = timings
+        except Exception as e:
+            # 워밍업 실패는 서비스 불가가 아님 → 기록만 하고 ready 전환
+            import traceback
+            traceback.print_exc()
+            startup_state["warmup_error"] = str(e)
+        startup_state["timings"]["warmup_total"] = round(time.time() - phase_start, 3)
+
+    startup_state["timings"]["total"] = round(time.time() - _startup_started_at, 3)
+    startup_state["phase"] = "ready"
+    startup_state["ready"] = True
+    print(f"✅ AI service ready: {startup_state['timings']}")
+
 
 @app.on_event("startup")
 async def load_model():
@@ -50,12 +82,18 @@ async def load_model():
 
     for attempt in range(1, max_retries + 1):
         try:
+            # CATALOG_SOURCE=db(기본) | snapshot | synthetic
             recommender = HybridRecommender(
-                db_config=db_config,
-                als_model_path="training/als_data",
-                als_data_path="training/als_data"
+                data_source=catalog_source_from_env(db_config, als_path="training/als_data"),
+                pool_cache=pool_cache
             )
+            startup_state["timings"]["model_load"] = round(time.time() - _startup_started_at, 3)
+            startup_state["timings"]["model_load_attempts"] = attempt
+            startup_state["timings"].update(recommender.startup_timings)
             print("✅ AI Model loaded successfully (SBERT + ALS)")
+
+            # 워밍업은 백그라운드에서 (그동안 /health는 응답, /ready는 503)
+            threading.Thread(target=_warm_up, name="warm-up", daemon=True).start()
             return
         except Exception as e:
             if attempt < max_retries:
@@ -78,11 +116,32 @@ def health_check():
     return {
         "status": "healthy",
         "model_loaded": recommender is not None,
+        "ready": startup_state["ready"],
+        "model_generation": recommender.generation if recommender is not None else None,
         "version": "final",
-        "model": "SBERT+ALS"
+        "model": "SBERT+ALS",
+        "pool_cache": pool_cache.stats() if pool_cache is not None else {"enabled": False}
     }
 
 
+@app.get("/ready")
+def readiness_check():
+    """
+    Readiness - 모델 로드 + 워밍업 완료 후에만 200
+
+    오케스트레이션(healthcheck, 로드밸런서)은 이 엔드포인트로 트래픽 라우팅 여부 판단
+    """
+    body = {
+        "ready": startup_state["ready"],
+        "phase": startup_state["phase"],
+        "timings": startup_state["timings"],
+        "warmup_error": startup_state["warmup_error"],
+    }
+    if not startup_state["ready"]:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+
 # ==================== Request/Response Models ====================
 
 class RecommendRequest(BaseModel):
@@ -94,6 +153,11 @@ class RecommendRequest(BaseModel):
     excluded_ids_a: Optional[List[int]] = None  # Track A 제외 (같은 장르 이전 추천)
     excluded_ids_b: Optional[List[int]] = None  # Track B 제외 (전체 이전 추천)
     negative_movie_ids: Optional[List[int]] = None  # 부정 피드백 영화 (유사도 페널티)
+    include_reserve: bool = False  # 교체 후보 예비 목록 포함 (B2C 재추천 선계산)
+
+
+class RecommendBatchRequest(BaseModel):
+    items: List[RecommendRequest]
 
 
 class RecommendSingleRequest(BaseModel):
@@ -131,85 +195,194 @@ class RecommendResponse(BaseModel):
     track_a: TrackResult
     track_b: TrackResult
     elapsed_time: float
+    reserve: Optional[Dict[str, List[Dict[str, Any]]]] = None  # {'a': [...], 'b': [...]}
+
+
+class RecommendBatchResponse(BaseModel):
+    results: List[Dict[str, Any]]  # 요청 순서대로 {'data': RecommendResponse} 또는 {'error': str}
+    elapsed_time: float
+
+
+def _recommend_kwargs(request: RecommendRequest) -> Dict[str, Any]:
+    return dict(
+        user_movie_ids=request.user_movie_ids,
+        available_time=request.available_time,
+        preferred_genres=request.preferred_genres,
+        preferred_otts=request.preferred_otts,
+        allow_adult=request.allow_adult,
+        excluded_ids_a=request.excluded_ids_a or [],
+        excluded_ids_b=request.excluded_ids_b or [],
+        negative_movie_ids=request.negative_movie_ids or [],
+        reserve_per_band=RESERVE_PER_BAND if request.include_reserve else 0
+    )
+
+
+def _stream_recommend(kwargs: Dict[str, Any]):
+    """
+    /recommend NDJSON 스트리밍 (wire.py 프레임 형식)
+
+    동기 제너레이터 → StreamingResponse가 스레드풀에서 한 프레임씩 실행
+    트랙 조합이 정해질 때마다 바로 전송, 예비 목록 / 소요 시간은 마지막 meta 프레임
+    """
+    meta = {"type": "meta", "elapsed_time": 0, "reserve": None}
+    try:
+        for key, value in recommender.iter_recommend(**kwargs):
+            if key in ("track_a", "track_b"):
+                yield wire.ndjson({"type": "track", "track": key, "data": value})
+            else:
+                meta[key] = value
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        yield wire.ndjson({"type": "error", "message": str(e)})
+        return
+    yield wire.ndjson(meta)
+
+
+def _recommend_body(result: Dict[str, Any]) -> Dict[str, Any]:
+    """/recommend 응답 본문 (RecommendResponse 형식)"""
+    return {
+        "track_a": result["track_a"],
+        "track_b": result["track_b"],
+        "elapsed_time": result.get("elapsed_time", 0),
+        "reserve": result.get("reserve"),
+    }
 
 
 # ==================== Endpoints ====================
 
 @app.post("/recommend", response_model=RecommendResponse)
-def recommend(request: RecommendRequest):
+def recommend(
+    request: RecommendRequest,
+    x_profile_request_id: Optional[str] = Header(None, alias="X-Profile-Request-Id"),
+    x_profile_secret: Optional[str] = Header(None, alias="X-Profile-Secret"),
+    accept: Optional[str] = Header(None)
+):
     """
     영화 추천 - 시간 맞춤 조합 반환 (SBERT + ALS)
 
     - Track A: 장르 + OTT 필터, SBERT 0.7 + ALS 0.3 (선호 장르 맞춤)
     - Track B: 장르 확장, SBERT 0.4 + ALS 0.6 (장르 확장 추천)
     - 총 런타임: 입력 시간의 90%~100%
+    - X-Profile-Request-Id + X-Profile-Secret(게이트웨이 공유 비밀) 헤더가 있으면 샘플링 프로파일러로 실행
+    - Accept: application/x-msgpack 이면 compact 응답 (wire.py)
+    - Accept: application/x-ndjson 이면 트랙별 스트리밍 응답 (wire.py)
     """
     if recommender is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
 
-    try:
-        result = recommender.recommend(
-            user_movie_ids=request.user_movie_ids,
-            available_time=request.available_time,
-            preferred_genres=request.preferred_genres,
-            preferred_otts=request.preferred_otts,
-            allow_adult=request.allow_adult,
-            excluded_ids_a=request.excluded_ids_a or [],
-            excluded_ids_b=request.excluded_ids_b or [],
-            negative_movie_ids=request.negative_movie_ids or []
-        )
-
-        # numpy 타입 변환
-        result = convert_numpy_types(result)
-
-        return RecommendResponse(
-            track_a=TrackResult(
-                label=result['track_a']['label'],
-                movies=result['track_a']['movies'],
-                total_runtime=result['track_a']['total_runtime']
-            ),
-            track_b=TrackResult(
-                label=result['track_b']['label'],
-                movies=result['track_b']['movies'],
-                total_runtime=result['track_b']['total_runtime']
-            ),
-            elapsed_time=result.get('elapsed_time', 0)
-        )
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
+    # NDJSON 스트리밍 (트랙별로 먼저 전송, 프로파일링 미지원)
+    if wire.wants_stream(accept):
+        return StreamingResponse(_stream_recommend(_recommend_kwargs(request)), media_type=wire.NDJSON_MEDIA_TYPE)
+
+    with profile_request(x_profile_request_id, "/recommend", x_profile_secret):
+        try:
+            result = recommender.recommend(**_recommend_kwargs(request))
+
+            # compact 전송 (게이트웨이가 표시용 필드를 카탈로그로 채움)
+            if wire.wants_compact(accept):
+                return Response(wire.pack(wire.compact_recommend(result)), media_type=wire.MSGPACK_MEDIA_TYPE)
+
+            # numpy 타입은 orjson이 직접 인코딩 (convert_numpy_types / RecommendResponse 재검증 없음)
+            # RecommendResponse는 문서(OpenAPI)용 스키마
+            return FastJSONResponse(_recommend_body(result))
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/recommend_batch", response_model=RecommendBatchResponse)
+def recommend_batch(
+    request: RecommendBatchRequest,
+    x_profile_request_id: Optional[str] = Header(None, alias="X-Profile-Request-Id"),
+    x_profile_secret: Optional[str] = Header(None, alias="X-Profile-Secret")
+):
+    """
+    여러 사용자 추천 일괄 처리 (B2B /v1/recommend/batch)
+
+    - 같은 필터 조건끼리 필터 결과 / 후보 인덱스를 공유 (recommender.recommend_batch)
+    - 항목별 실패는 results[i].error로 반환, 나머지 항목은 정상 응답
+    - 응답은 항상 JSON (compact 전송 미사용)
+    """
+    if recommender is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+
+    start_time = time.time()
+    with profile_request(x_profile_request_id, "/recommend_batch", x_profile_secret):
+        outcomes = recommender.recommend_batch([_recommend_kwargs(item) for item in request.items])
+
+    return FastJSONResponse({
+        "results": [
+            {"data": _recommend_body(outcome["result"])} if "result" in outcome else {"error": outcome["error"]}
+            for outcome in outcomes
+        ],
+        "elapsed_time": time.time() - start_time,
+    })
 
 
 @app.post("/recommend_single")
-def recommend_single(request: RecommendSingleRequest):
+def recommend_single(
+    request: RecommendSingleRequest,
+    x_profile_request_id: Optional[str] = Header(None, alias="X-Profile-Request-Id"),
+    x_profile_secret: Optional[str] = Header(None, alias="X-Profile-Secret"),
+    accept: Optional[str] = Header(None)
+):
     """
     개별 영화 재추천 - 단일 영화 반환
 
     - 기존 영화 교체용
     - 런타임: 대상 영화의 90%~100%
+    - Accept: application/x-msgpack 이면 compact 응답 (wire.py)
     """
     if recommender is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
 
-    try:
-        result = recommender.recommend_single(
-            user_movie_ids=request.user_movie_ids,
-            target_runtime=request.target_runtime,
-            excluded_ids=request.excluded_ids,
-            track=request.track,
-            preferred_genres=request.preferred_genres,
-            preferred_otts=request.preferred_otts,
-            allow_adult=request.allow_adult,
-            negative_movie_ids=request.negative_movie_ids or []
-        )
-
-        if result:
-            return convert_numpy_types(result)
-        else:
-            return None
+    with profile_request(x_profile_request_id, "/recommend_single", x_profile_secret):
+        try:
+            result = recommender.recommend_single(
+                user_movie_ids=request.user_movie_ids,
+                target_runtime=request.target_runtime,
+                excluded_ids=request.excluded_ids,
+                track=request.track,
+                preferred_genres=request.preferred_genres,
+                preferred_otts=request.preferred_otts,
+                allow_adult=request.allow_adult,
+                negative_movie_ids=request.negative_movie_ids or []
+            )
 
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
+            if wire.wants_compact(accept):
+                return Response(wire.pack(wire.compact_single(result)), media_type=wire.MSGPACK_MEDIA_TYPE)
+
+            return FastJSONResponse(result or None)
+
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+# ==================== Debug ====================
+
+@app.get("/debug/profiles/{request_id}")
+def get_profile(
+    request_id: str,
+    format: str = "json",
+    x_profile_secret: Optional[str] = Header(None, alias="X-Profile-Secret")
+):
+    """
+    프로파일 결과 조회 (게이트웨이 전용 - X-Profile-Secret 필수)
+
+    - format=json: 함수별 통계 + collapsed stack
+    - format=collapsed: flamegraph 도구 입력용 텍스트
+    """
+    if not is_authorized(x_profile_secret):
+        raise HTTPException(status_code=403, detail="Profiling not allowed")
+
+    report = profile_store.get(request_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    if format == "collapsed":
+        return PlainTextResponse(report["collapsed"])
+    return report
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HybridRecommender 핫패스 벤치마크
+
+- 합성 카탈로그(SyntheticCatalogSource)로 DB 없이 실행
+- 대상: recommend, recommend_single, _apply_filters, _get_top_movies,
+        _find_combination, _apply_negative_penalty
+- 사용자 프로필(히스토리) 크기 / 제외 목록 크기별 p50, p95, p99, 처리량 측정
+- 결과는 JSON으로 저장, --compare로 두 실행 결과 비교 (회귀 시 exit 1)
+
+사용법 (ai/ 폴더에서):
+    python -m benchmarks.recommendation_bench --sizes 10000,100000,500000 --out bench_new.json
+    python -m benchmarks.recommendation_bench --compare bench_base.json bench_new.json --threshold 0.1
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# ai/ 폴더 기준 import
+sys.path.append(str(Path(__file__).parent.parent))
+
+from inference.recommendation_model import HybridRecommender  # noqa: E402
+
+GENRES = ["Action", "Drama"]
+OTTS = ["Netflix", "Watcha"]
+
+
+# ============================================================
+# 측정 유틸
+# ============================================================
+
+def percentile(sorted_values, pct):
+    """정렬된 값에서 선형 보간 백분위수"""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def measure(fn, iterations, warmup):
+    """
+    fn을 반복 실행해 지연시간 통계 계산
+
+    fn은 매 호출마다 새 입력을 만들 수 있도록 인자 없는 callable
+    추천기 로그 출력은 측정에서 제외 (stdout → devnull)
+    """
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(warmup):
+            fn()
+
+        latencies = []
+        total_start = time.perf_counter()
+        for _ in range(iterations):
+            start = time.perf_counter()
+            fn()
+            latencies.append((time.perf_counter() - start) * 1000)
+        total = time.perf_counter() - total_start
+
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "mean_ms": round(sum(latencies) / len(latencies), 4),
+        "min_ms": round(latencies[0], 4),
+        "p50_ms": round(percentile(latencies, 50), 4),
+        "p95_ms": round(percentile(latencies, 95), 4),
+        "p99_ms": round(percentile(latencies, 99), 4),
+        "max_ms": round(latencies[-1], 4),
+        "throughput_rps": round(iterations / total, 2) if total > 0 else 0.0,
+    }
+
+
+# ============================================================
+# 벤치마크 케이스
+# ============================================================
+
+def run_size(size, args):
+    """카탈로그 크기 하나에 대해 모든 케이스 실행"""
+    print(f"\n=== Catalog size: {size:,} ===")
+    build_start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        rec = HybridRecommender.from_synthetic(n_movies=size, seed=args.seed)
+    build_s = time.perf_counter() - build_start
+    print(f"  built in {build_s:.1f}s")
+
+    rng = random.Random(args.seed)
+    all_ids = rec.common_movie_ids
+    results = [{"case": "build", "size": size, "params": {}, "build_s": round(build_s, 3)}]
+
+    def sample(k):
+        return rng.sample(all_ids, min(k, len(all_ids)))
+
+    def record(case, params, fn):
+        random.seed(args.seed)  # _find_combination 노이즈 재현성
+        stats = measure(fn, args.iterations, args.warmup)
+        results.append({"case": case, "size": size, "params": params, **stats})
+        label = ", ".join(f"{k}={v}" for k, v in params.items())
+        print(f"  {case:<24} [{label}] p50={stats['p50_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms "
+              f"p99={stats['p99_ms']:.2f}ms ({stats['throughput_rps']:.1f} rps)")
+
+    wanted = set(args.cases.split(",")) if args.cases != "all" else None
+
+    def enabled(case):
+        return wanted is None or case in wanted
+
+    # _apply_filters
+    if enabled("_apply_filters"):
+        record("_apply_filters", {"filters": "genre+ott"},
+               lambda: rec._apply_filters(preferred_genres=GENRES, preferred_otts=OTTS))
+        record("_apply_filters", {"filters": "none"},
+               lambda: rec._apply_filters())
+
+    filtered_a = rec._apply_filters(preferred_genres=GENRES, preferred_otts=OTTS)
+    filtered_b = rec._apply_filters(preferred_otts=OTTS)
+
+    for history in args.history_sizes:
+        for exclusions in args.exclusion_sizes:
+            params = {"history": history, "exclusions": exclusions}
+            user_ids = sample(history)
+            excluded = sample(exclusions)
+            negatives = sample(5)
+            sbert_profile, als_profile = rec._get_user_profile(user_ids)
+
+            if enabled("_get_top_movies"):
+                record("_get_top_movies", {**params, "track": "a"}, lambda: rec._get_top_movies(
+                    sbert_profile, als_profile, filtered_a, sbert_weight=0.7, als_weight=0.3,
+                    top_k=300, exclude_ids=excluded, preferred_genres=GENRES))
+                record("_get_top_movies", {**params, "track": "b"}, lambda: rec._get_top_movies(
+                    sbert_profile, als_profile, filtered_b, sbert_weight=0.4, als_weight=0.6,
+                    top_k=300, exclude_ids=excluded))
+
+            if enabled("recommend"):
+                record("recommend", params, lambda: rec.recommend(
+                    user_movie_ids=user_ids, available_time=180,
+                    preferred_genres=GENRES, preferred_otts=OTTS,
+                    excluded_ids_a=excluded, excluded_ids_b=excluded,
+                    negative_movie_ids=negatives))
+
+            if enabled("recommend_single"):
+                for track in ("a", "b"):
+                    record("recommend_single", {**params, "track": track}, lambda: rec.recommend_single(
+                        user_movie_ids=user_ids, target_runtime=120, excluded_ids=excluded,
+                        track=track, preferred_genres=GENRES, preferred_otts=OTTS,
+                        negative_movie_ids=negatives))
+
+    # 후보 300개 기준 조합 / 페널티
+    user_ids = sample(args.history_sizes[0])
+    sbert_profile, als_profile = rec._get_user_profile(user_ids)
+    candidates = rec._get_top_movies(sbert_profile, als_profile, filtered_a, 0.7, 0.3, top_k=300,
+                                     preferred_genres=GENRES)
+
+    if enabled("_find_combination"):
+        for available_time in (120, 180, 360):
+            record("_find_combination", {"available_time": available_time, "candidates": len(candidates)},
+                   lambda: rec._find_combination(candidates, available_time))
+
+    if enabled("_apply_negative_penalty"):
+        for negatives in (5, 20):
+            negative_ids = sample(negatives)
+            record("_apply_negative_penalty", {"negatives": negatives, "candidates": len(candidates)},
+                   lambda: rec._apply_negative_penalty(candidates, negative_ids))
+
+    del rec
+    return results
+
+
+def environment_info():
+    """재현성 확인용 실행 환경 정보"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, timeout=5).stdout.strip()
+    except Exception:
+        commit = ""
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+# ============================================================
+# 비교 모드
+# ============================================================
+
+def result_key(result):
+    params = ",".join(f"{k}={v}" for k, v in sorted(result["params"].items()))
+    return f"{result['case']}|{result['size']}|{params}"
+
+
+def compare(base_path, new_path, threshold, metrics):
+    """두 결과 파일 비교 - threshold(비율) 이상 느려진 항목을 회귀로 표시"""
+    with open(base_path) as f:
+        base = {result_key(r): r for r in json.load(f)["results"] if "p50_ms" in r}
+    with open(new_path) as f:
+        new = {result_key(r): r for r in json.load(f)["results"] if "p50_ms" in r}
+
+    regressions = []
+    print(f"{'benchmark':<70} " + " ".join(f"{m:>22}" for m in metrics))
+    for key in sorted(base.keys() & new.keys()):
+        cells = []
+        regressed = False
+        for m in metrics:
+            old_v, new_v = base[key][m], new[key][m]
+            ratio = (new_v / old_v - 1) if old_v > 0 else 0.0
+            flag = ""
+            if ratio > threshold:
+                regressed = True
+                flag = " !"
+            cells.append(f"{old_v:8.2f}→{new_v:8.2f} ({ratio:+.0%}){flag}")
+        print(f"{key:<70} " + " ".join(f"{c:>22}" for c in cells))
+        if regressed:
+            regressions.append(key)
+
+    missing = sorted(base.keys() - new.keys())
+    if missing:
+        print(f"\n{len(missing)} benchmarks missing from {new_path}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) over {threshold:.0%}:")
+        for key in regressions:
+            print(f"  - {key}")
+        return 1
+
+    print(f"\n✅ No regressions over {threshold:.0%}")
+    return 0
+
+
+def parse_int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HybridRecommender 핫패스 벤치마크")
+    parser.add_argument("--sizes", type=parse_int_list, default=[10000, 100000, 500000],
+                        help="합성 카탈로그 크기 (쉼표 구분)")
+    parser.add_argument("--history-sizes", type=parse_int_list, default=[5, 20, 50],
+                        help="사용자 프로필 영화 수 (쉼표 구분)")
+    parser.add_argument("--exclusion-sizes", type=parse_int_list, default=[0, 100, 1000],
+                        help="제외 목록 크기 (쉼표 구분)")
+    parser.add_argument("--cases", default="all",
+                        help="실행할 케이스 (쉼표 구분, 기본 all)")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None, help="결과 JSON 경로 (기본: stdout 요약만)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="두 결과 JSON 비교")
+    parser.add_argument("--threshold", type=float, default=0.10, help="회귀 판정 비율 (기본 0.10 = 10%%)")
+    parser.add_argument("--metrics", default="p50_ms,p95_ms", help="비교 지표 (쉼표 구분)")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(args.compare[0], args.compare[1], args.threshold, args.metrics.split(",")))
+
+    output = {"meta": {**environment_info(), "args": {
+        "sizes": args.sizes, "history_sizes": args.history_sizes,
+        "exclusion_sizes": args.exclusion_sizes, "iterations": args.iterations,
+        "warmup": args.warmup, "seed": args.seed, "cases": args.cases,
+    }}, "results": []}
+
+    for size in args.sizes:
+        output["results"].extend(run_size(size, args))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(output, f, indent=2, ensure_ascii=False)
+        print(f"\nResults saved: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
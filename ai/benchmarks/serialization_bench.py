@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+/recommend 응답 직렬화 벤치마크
+
+- 합성 카탈로그로 실제 recommend() 결과(numpy 점수 포함)를 만든 뒤 응답 바이트까지의 비용만 측정
+- legacy      : convert_numpy_types → RecommendResponse 생성 → response_model 재검증 / 직렬화 → json.dumps
+                (이전 /recommend 경로, FastAPI serialize_response와 같은 단계)
+- json_default: json.dumps + numpy default (orjson 미설치 시 FastJSONResponse)
+- orjson      : FastJSONResponse (orjson OPT_SERIALIZE_NUMPY, 변환 / 검증 없음)
+- 예비 목록(include_reserve) 유무별 p50, p95, p99와 요청당 절감 시간, 응답 크기 출력
+- 결과 JSON 형식 / --compare는 recommendation_bench와 동일
+
+사용법 (ai/ 폴더에서):
+    python -m benchmarks.serialization_bench --out serialization.json
+    python -m benchmarks.serialization_bench --compare base.json new.json --threshold 0.1
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from pydantic import TypeAdapter
+
+# ai/ 폴더 기준 import
+sys.path.append(str(Path(__file__).parent.parent))
+
+import json_response  # noqa: E402
+from api import RecommendResponse, TrackResult  # noqa: E402
+from benchmarks.recommendation_bench import compare, environment_info, measure  # noqa: E402
+from inference.recommendation_model import HybridRecommender  # noqa: E402
+
+GENRES = ["Action", "Drama"]
+OTTS = ["Netflix", "Watcha"]
+
+
+# ============================================================
+# 이전 경로 (비교 기준)
+# ============================================================
+
+def convert_numpy_types(obj: Any) -> Any:
+    """이전 ai/api.py의 numpy → Python 재귀 변환"""
+    if isinstance(obj, np.floating):
+        return float(obj)
+    elif isinstance(obj, np.integer):
+        return int(obj)
+    elif isinstance(obj, np.ndarray):
+        return obj.tolist()
+    elif isinstance(obj, dict):
+        return {k: convert_numpy_types(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [convert_numpy_types(item) for item in obj]
+    return obj
+
+
+RESPONSE_ADAPTER = TypeAdapter(RecommendResponse)
+
+
+def legacy_serialize(result):
+    converted = convert_numpy_types(result)
+    response = RecommendResponse(
+        track_a=TrackResult(**converted["track_a"]),
+        track_b=TrackResult(**converted["track_b"]),
+        elapsed_time=converted.get("elapsed_time", 0),
+        reserve=converted.get("reserve")
+    )
+    # response_model 검증 + JSON 모드 덤프 → JSONResponse.render
+    content = RESPONSE_ADAPTER.dump_python(RESPONSE_ADAPTER.validate_python(response), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def response_body(result):
+    """/recommend 응답 본문 (api.py와 동일)"""
+    return {
+        "track_a": result["track_a"],
+        "track_b": result["track_b"],
+        "elapsed_time": result.get("elapsed_time", 0),
+        "reserve": result.get("reserve"),
+    }
+
+
+def json_default_serialize(result):
+    return json.dumps(response_body(result), default=json_response._default, ensure_ascii=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def fast_serialize(result):
+    return json_response.dumps(response_body(result))
+
+
+# ============================================================
+# 벤치마크
+# ============================================================
+
+def run(args):
+    print(f"\n=== Catalog size: {args.size:,} ===")
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        rec = HybridRecommender.from_synthetic(n_movies=args.size, seed=args.seed)
+
+    rng = random.Random(args.seed)
+    user_ids = rng.sample(rec.common_movie_ids, 20)
+    serializers = [("legacy", legacy_serialize), ("json_default", json_default_serialize)]
+    if json_response.orjson is not None:
+        serializers.append(("orjson", fast_serialize))
+    else:
+        print("  orjson not installed - skipping 'orjson' case")
+
+    results = []
+    for reserve_per_band in args.reserve_sizes:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            result = rec.recommend(
+                user_movie_ids=user_ids, available_time=180,
+                preferred_genres=GENRES, preferred_otts=OTTS,
+                reserve_per_band=reserve_per_band
+            )
+        movies = len(result["track_a"]["movies"]) + len(result["track_b"]["movies"])
+        movies += sum(len(items) for items in (result.get("reserve") or {}).values())
+        params = {"reserve_per_band": reserve_per_band, "movies": movies}
+
+        # 같은 내용인지 확인 (바이트 순서는 달라도 파싱 결과 동일해야 함)
+        expected = json.loads(legacy_serialize(result))
+        for name, fn in serializers[1:]:
+            assert json.loads(fn(result)) == expected, f"{name} output differs from legacy"
+
+        baseline = None
+        for name, fn in serializers:
+            stats = measure(lambda: fn(result), args.iterations, args.warmup)
+            stats["bytes"] = len(fn(result))
+            if baseline is None:
+                baseline = stats
+            stats["saved_ms"] = round(baseline["mean_ms"] - stats["mean_ms"], 4)
+            results.append({"case": name, "size": args.size, "params": params, **stats})
+            print(f"  {name:<14} [movies={movies}] p50={stats['p50_ms']:.3f}ms p95={stats['p95_ms']:.3f}ms "
+                  f"p99={stats['p99_ms']:.3f}ms saved/req={stats['saved_ms']:.3f}ms ({stats['bytes']:,} bytes)")
+    return results
+
+
+def parse_int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/recommend 응답 직렬화 벤치마크")
+    parser.add_argument("--size", type=int, default=10000, help="합성 카탈로그 크기")
+    parser.add_argument("--reserve-sizes", type=parse_int_list, default=[0, 5, 20],
+                        help="RESERVE_PER_BAND 값 (쉼표 구분, 0 = 예비 목록 없음)")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None, help="결과 JSON 경로 (기본: stdout 요약만)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="두 결과 JSON 비교")
+    parser.add_argument("--threshold", type=float, default=0.10, help="회귀 판정 비율 (기본 0.10 = 10%%)")
+    parser.add_argument("--metrics", default="p50_ms,p95_ms", help="비교 지표 (쉼표 구분)")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(args.compare[0], args.compare[1], args.threshold, args.metrics.split(",")))
+
+    output = {"meta": {**environment_info(), "orjson": getattr(json_response.orjson, "__version__", None), "args": {
+        "size": args.size, "reserve_sizes": args.reserve_sizes, "iterations": args.iterations,
+        "warmup": args.warmup, "seed": args.seed,
+    }}, "results": run(args)}
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(output, f, indent=2, ensure_ascii=False)
+        print(f"\nResults saved: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
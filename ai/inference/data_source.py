@@ -0,0 +1,456 @@
+"""
+HybridRecommender 데이터 소스 레이어
+
+- DatabaseCatalogSource: PostgreSQL(movies, movie_vectors, movie_ott_map) + ALS 파일 (운영)
+- SnapshotCatalogSource: save_snapshot()으로 저장한 디렉토리 (DB 없이 재현)
+- SyntheticCatalogSource: 고정 시드 기반 가짜 카탈로그 (벤치마크 / 프로파일링 / CI)
+- InMemoryCatalogSource: 이미 메모리에 있는 CatalogData 그대로 사용
+"""
+import argparse
+import os
+import pickle
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import psycopg2
+    from psycopg2.extras import RealDictCursor
+except ImportError:  # DB 없이 스냅샷/합성 데이터만 쓰는 환경
+    psycopg2 = None
+    RealDictCursor = None
+
+
+class DatabaseConnection:
+    """PostgreSQL 연결 관리"""
+
+    def __init__(self, host: str, port: int, database: str, user: str, password: str):
+        self.connection_params = {
+            'host': host,
+            'port': port,
+            'database': database,
+            'user': user,
+            'password': password,
+            'options': '-c search_path=public,b2c,b2b'
+        }
+        self.conn = None
+
+    def connect(self):
+        """DB 연결"""
+        if psycopg2 is None:
+            raise RuntimeError("psycopg2가 설치되지 않았습니다 (DB 데이터 소스 사용 불가)")
+        if self.conn is None or self.conn.closed:
+            self.conn = psycopg2.connect(**self.connection_params)
+        return self.conn
+
+    def close(self):
+        """DB 연결 종료"""
+        if self.conn and not self.conn.closed:
+            self.conn.close()
+
+    def execute_query(self, query: str, params: tuple = None) -> List[dict]:
+        """쿼리 실행 및 결과 반환"""
+        conn = self.connect()
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+
+
+class CatalogData:
+    """
+    추천기 구성에 필요한 원천 데이터 묶음
+
+    Attributes:
+        metadata_map: movie_id → 메타데이터 dict
+        sbert_movie_ids: SBERT 임베딩 행 순서의 movie_id 리스트
+        sbert_embeddings: (N, 1024) float32
+        movie_ott_map: movie_id → provider_name 리스트
+        als_item_to_idx: movie_id → ALS factor 행 인덱스
+        als_item_factors: (M, 128) float32
+    """
+
+    def __init__(
+        self,
+        metadata_map: Dict[int, dict],
+        sbert_movie_ids: List[int],
+        sbert_embeddings: np.ndarray,
+        movie_ott_map: Dict[int, List[str]],
+        als_item_to_idx: Dict[int, int],
+        als_item_factors: np.ndarray
+    ):
+        self.metadata_map = metadata_map
+        self.sbert_movie_ids = sbert_movie_ids
+        self.sbert_embeddings = sbert_embeddings
+        self.movie_ott_map = movie_ott_map
+        self.als_item_to_idx = als_item_to_idx
+        self.als_item_factors = als_item_factors
+
+
+class InMemoryCatalogSource:
+    """메모리 상의 CatalogData를 그대로 반환"""
+
+    def __init__(self, catalog: CatalogData):
+        self.catalog = catalog
+
+    def load(self) -> CatalogData:
+        return self.catalog
+
+    def close(self):
+        pass
+
+
+class DatabaseCatalogSource:
+    """PostgreSQL + ALS 파일 기반 데이터 소스 (운영 기본값)"""
+
+    def __init__(self, db_config: dict, als_model_path: str, als_data_path: str):
+        """
+        Args:
+            db_config: PostgreSQL 연결 설정
+            als_model_path: ALS 모델 경로 (폴더, als_item_factors.npy)
+            als_data_path: ALS 데이터 경로 (폴더, mappings.pkl)
+        """
+        self.db = DatabaseConnection(**db_config)
+        self.als_model_path = Path(als_model_path)
+        self.als_data_path = Path(als_data_path)
+
+    def load(self) -> CatalogData:
+        metadata_map = self._load_metadata()
+        sbert_movie_ids, sbert_embeddings = self._load_sbert_embeddings()
+        movie_ott_map = self._load_ott_map()
+
+        with open(self.als_data_path / 'mappings.pkl', 'rb') as f:
+            mappings = pickle.load(f)
+
+        print(f"Loading ALS model from {self.als_model_path}")
+        als_item_factors = np.load(self.als_model_path / 'als_item_factors.npy')
+
+        # item2idx의 key가 이미 DB의 movie_id와 동일하므로 직접 사용
+        return CatalogData(
+            metadata_map=metadata_map,
+            sbert_movie_ids=sbert_movie_ids,
+            sbert_embeddings=sbert_embeddings,
+            movie_ott_map=movie_ott_map,
+            als_item_to_idx=mappings['item2idx'],
+            als_item_factors=als_item_factors
+        )
+
+    def _load_metadata(self) -> Dict[int, dict]:
+        """DB에서 영화 메타데이터 로드"""
+        print("Loading metadata from database...")
+
+        rows = self.db.execute_query("""
+            SELECT
+                movie_id, tmdb_id, title, runtime, genres,
+                overview, poster_path, release_date,
+                vote_average, vote_count, popularity, adult
+            FROM movies
+        """)
+
+        metadata_map = {}
+        for row in rows:
+            movie_id = row['movie_id']
+            metadata_map[movie_id] = {
+                'movie_id': movie_id,
+                'tmdb_id': row['tmdb_id'],
+                'title': row['title'],
+                'runtime': row['runtime'] or 0,
+                'genres': row['genres'] or [],
+                'overview': row['overview'] or '',
+                'poster_path': row['poster_path'],
+                'release_date': str(row['release_date']) if row['release_date'] else '',
+                'vote_average': float(row['vote_average']) if row['vote_average'] else 0.0,
+                'vote_count': int(row['vote_count']) if row['vote_count'] else 0,
+                'popularity': row['popularity'] or 0,
+                'adult': row['adult'] or False
+            }
+        return metadata_map
+
+    def _load_sbert_embeddings(self):
+        """DB에서 SBERT 임베딩 로드"""
+        print("Loading SBERT embeddings from database...")
+
+        rows = self.db.execute_query("""
+            SELECT mv.movie_id, mv.embedding
+            FROM movie_vectors mv
+            ORDER BY mv.movie_id
+        """)
+
+        movie_ids = []
+        embeddings = []
+        for row in rows:
+            embedding = row['embedding']
+            if isinstance(embedding, str):
+                embedding = np.fromstring(embedding.strip('[]'), sep=',', dtype='float32')
+            else:
+                embedding = np.array(embedding, dtype='float32')
+
+            movie_ids.append(row['movie_id'])
+            embeddings.append(embedding)
+
+        return movie_ids, np.array(embeddings, dtype='float32')
+
+    def _load_ott_map(self) -> Dict[int, List[str]]:
+        """DB에서 OTT 데이터 로드"""
+        print("Loading OTT data from database...")
+
+        rows = self.db.execute_query("""
+            SELECT mom.movie_id, op.provider_name
+            FROM movie_ott_map mom
+            JOIN ott_providers op ON mom.provider_id = op.provider_id
+        """)
+
+        movie_ott_map = {}
+        for row in rows:
+            movie_ott_map.setdefault(row['movie_id'], []).append(row['provider_name'])
+        return movie_ott_map
+
+    def close(self):
+        self.db.close()
+
+
+# ==================== Snapshot ====================
+
+SNAPSHOT_FILES = {
+    'catalog': 'catalog.pkl',           # metadata_map, movie_ott_map, sbert_movie_ids
+    'sbert': 'sbert_embeddings.npy',
+    'als_mappings': 'mappings.pkl',     # ALS 학습 산출물과 동일 포맷 ({'item2idx': ...})
+    'als_factors': 'als_item_factors.npy',
+}
+
+
+def save_snapshot(catalog: CatalogData, snapshot_dir: str):
+    """CatalogData를 디렉토리에 저장 (SnapshotCatalogSource로 다시 로드 가능)"""
+    path = Path(snapshot_dir)
+    path.mkdir(parents=True, exist_ok=True)
+
+    with open(path / SNAPSHOT_FILES['catalog'], 'wb') as f:
+        pickle.dump({
+            'metadata_map': catalog.metadata_map,
+            'movie_ott_map': catalog.movie_ott_map,
+            'sbert_movie_ids': list(catalog.sbert_movie_ids),
+        }, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    np.save(path / SNAPSHOT_FILES['sbert'], np.asarray(catalog.sbert_embeddings, dtype='float32'))
+
+    with open(path / SNAPSHOT_FILES['als_mappings'], 'wb') as f:
+        pickle.dump({'item2idx': catalog.als_item_to_idx}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    np.save(path / SNAPSHOT_FILES['als_factors'], np.asarray(catalog.als_item_factors, dtype='float32'))
+    print(f"Snapshot saved: {path} ({len(catalog.metadata_map):,} movies)")
+
+
+class SnapshotCatalogSource:
+    """save_snapshot() 디렉토리 기반 데이터 소스"""
+
+    def __init__(self, snapshot_dir: str, mmap: bool = False):
+        """
+        Args:
+            snapshot_dir: 스냅샷 디렉토리
+            mmap: True면 임베딩 행렬을 memory-map으로 로드 (대용량 카탈로그용)
+        """
+        self.path = Path(snapshot_dir)
+        self.mmap_mode = 'r' if mmap else None
+
+    def load(self) -> CatalogData:
+        print(f"Loading catalog snapshot from {self.path}...")
+        with open(self.path / SNAPSHOT_FILES['catalog'], 'rb') as f:
+            catalog = pickle.load(f)
+        with open(self.path / SNAPSHOT_FILES['als_mappings'], 'rb') as f:
+            mappings = pickle.load(f)
+
+        return CatalogData(
+            metadata_map=catalog['metadata_map'],
+            sbert_movie_ids=catalog['sbert_movie_ids'],
+            sbert_embeddings=np.load(self.path / SNAPSHOT_FILES['sbert'], mmap_mode=self.mmap_mode),
+            movie_ott_map=catalog['movie_ott_map'],
+            als_item_to_idx=mappings['item2idx'],
+            als_item_factors=np.load(self.path / SNAPSHOT_FILES['als_factors'], mmap_mode=self.mmap_mode)
+        )
+
+    def close(self):
+        pass
+
+
+# ==================== Synthetic ====================
+
+# TMDB 장르 분포를 대략 반영한 가중치 (Drama/Comedy 다수, Western/War 소수)
+SYNTHETIC_GENRES = {
+    "Drama": 0.20, "Comedy": 0.13, "Thriller": 0.09, "Action": 0.08,
+    "Romance": 0.07, "Horror": 0.06, "Crime": 0.05, "Documentary": 0.05,
+    "Adventure": 0.04, "Science Fiction": 0.035, "Family": 0.03, "Mystery": 0.03,
+    "Fantasy": 0.03, "Animation": 0.03, "Music": 0.02, "History": 0.015,
+    "War": 0.01, "Western": 0.01,
+}
+
+# OTT별 보유 확률 (movie_ott_map 커버리지)
+SYNTHETIC_OTTS = {
+    "Netflix": 0.35, "Watcha": 0.30, "Wavve": 0.25, "TVING": 0.20,
+    "Disney+": 0.12, "Prime Video": 0.15, "Apple TV+": 0.05,
+}
+
+
+class SyntheticCatalogSource:
+    """
+    고정 시드 기반 합성 카탈로그
+
+    - 런타임: 장편 중심 정규분포(평균 105분) + 단편 5% + 런타임 누락 1%
+    - 장르: TMDB 비율 근사, 영화당 1~3개
+    - 개봉연도: 최근 연도 편중 (1960~2025)
+    - OTT: 제공사별 보유 확률
+    - SBERT: 주 장르 중심 벡터 + 노이즈, L2 정규화 (장르 내 유사도 > 장르 간 유사도)
+    - ALS: 전체의 als_coverage 비율만 factor 보유
+    """
+
+    def __init__(
+        self,
+        n_movies: int = 10000,
+        seed: int = 42,
+        sbert_dim: int = 1024,
+        als_dim: int = 128,
+        als_coverage: float = 0.8
+    ):
+        self.n_movies = n_movies
+        self.seed = seed
+        self.sbert_dim = sbert_dim
+        self.als_dim = als_dim
+        self.als_coverage = als_coverage
+
+    def load(self) -> CatalogData:
+        print(f"Generating synthetic catalog: {self.n_movies:,} movies (seed={self.seed})...")
+        rng = np.random.default_rng(self.seed)
+        n = self.n_movies
+        movie_ids = np.arange(1, n + 1)
+
+        # 런타임
+        runtimes = np.clip(rng.normal(105, 22, n), 60, 220).astype(int)
+        short_mask = rng.random(n) < 0.05
+        runtimes[short_mask] = rng.integers(15, 50, short_mask.sum())
+        runtimes[rng.random(n) < 0.01] = 0
+
+        # 장르 (주 장르 + 보조 장르 0~2개)
+        genre_names = list(SYNTHETIC_GENRES.keys())
+        genre_probs = np.array(list(SYNTHETIC_GENRES.values()))
+        genre_probs = genre_probs / genre_probs.sum()
+        primary = rng.choice(len(genre_names), n, p=genre_probs)
+        extra_counts = rng.choice(3, n, p=[0.35, 0.45, 0.20])
+        extra_genres = rng.choice(len(genre_names), (n, 2), p=genre_probs)
+
+        # 개봉일 (최근 편중)
+        years = np.clip(2025 - rng.exponential(14, n).astype(int), 1960, 2025)
+        day_offsets = rng.integers(0, 365, n)
+
+        # 평점 / 투표수 (투표수는 롱테일)
+        vote_average = np.clip(rng.normal(6.4, 1.0, n), 1.0, 9.5).round(1)
+        vote_count = rng.lognormal(5.5, 2.0, n).astype(int)
+        popularity = (vote_count ** 0.5 * rng.uniform(0.5, 1.5, n)).round(3)
+        adult = rng.random(n) < 0.01
+
+        ott_names = list(SYNTHETIC_OTTS.keys())
+        ott_mask = rng.random((n, len(ott_names))) < np.array(list(SYNTHETIC_OTTS.values()))
+
+        metadata_map = {}
+        movie_ott_map = {}
+        for i, mid in enumerate(movie_ids.tolist()):
+            genres = [genre_names[primary[i]]]
+            for g in extra_genres[i, :extra_counts[i]]:
+                if genre_names[g] not in genres:
+                    genres.append(genre_names[g])
+
+            release = date(int(years[i]), 1, 1) + timedelta(days=int(day_offsets[i]))
+            metadata_map[mid] = {
+                'movie_id': mid,
+                'tmdb_id': 100000 + mid,
+                'title': f"Synthetic Movie {mid}",
+                'runtime': int(runtimes[i]),
+                'genres': genres,
+                'overview': f"Synthetic overview for movie {mid} ({', '.join(genres)}).",
+                'poster_path': f"/synthetic/{mid}.jpg",
+                'release_date': release.isoformat(),
+                'vote_average': float(vote_average[i]),
+                'vote_count': int(vote_count[i]),
+                'popularity': float(popularity[i]),
+                'adult': bool(adult[i])
+            }
+
+            otts = [ott_names[j] for j in np.flatnonzero(ott_mask[i])]
+            if otts:
+                movie_ott_map[mid] = otts
+
+        # SBERT: 장르 중심 벡터 + 노이즈 (float32로 바로 생성해 메모리 절약)
+        centroids = rng.standard_normal((len(genre_names), self.sbert_dim), dtype=np.float32)
+        sbert = rng.standard_normal((n, self.sbert_dim), dtype=np.float32)
+        for start in range(0, n, 50000):
+            chunk = sbert[start:start + 50000]
+            chunk += 1.5 * centroids[primary[start:start + 50000]]
+            chunk /= np.linalg.norm(chunk, axis=1, keepdims=True) + 1e-10
+
+        # ALS: 일부 영화만 factor 보유
+        als_ids = movie_ids[rng.random(n) < self.als_coverage]
+        als_centroids = rng.standard_normal((len(genre_names), self.als_dim), dtype=np.float32) * 0.3
+        als_factors = rng.standard_normal((len(als_ids), self.als_dim), dtype=np.float32) * 0.1
+        als_factors += als_centroids[primary[als_ids - 1]]
+        als_item_to_idx = {int(mid): idx for idx, mid in enumerate(als_ids)}
+
+        return CatalogData(
+            metadata_map=metadata_map,
+            sbert_movie_ids=movie_ids.tolist(),
+            sbert_embeddings=sbert,
+            movie_ott_map=movie_ott_map,
+            als_item_to_idx=als_item_to_idx,
+            als_item_factors=als_factors
+        )
+
+    def close(self):
+        pass
+
+
+def catalog_source_from_env(db_config: Optional[dict] = None, als_path: str = "training/als_data"):
+    """
+    CATALOG_SOURCE 환경변수로 데이터 소스 선택
+
+    - db (기본): PostgreSQL + ALS 파일
+    - snapshot: CATALOG_SNAPSHOT_DIR
+    - synthetic: SYNTHETIC_MOVIES / SYNTHETIC_SEED
+    """
+    source = os.getenv("CATALOG_SOURCE", "db").lower()
+    if source == "snapshot":
+        return SnapshotCatalogSource(os.getenv("CATALOG_SNAPSHOT_DIR", "training/snapshot"))
+    if source == "synthetic":
+        return SyntheticCatalogSource(
+            n_movies=int(os.getenv("SYNTHETIC_MOVIES", "10000")),
+            seed=int(os.getenv("SYNTHETIC_SEED", "42"))
+        )
+    return DatabaseCatalogSource(db_config, als_model_path=als_path, als_data_path=als_path)
+
+
+if __name__ == "__main__":
+    # 스냅샷 생성: python -m inference.data_source --synthetic 100000 --out /tmp/catalog_100k
+    parser = argparse.ArgumentParser(description="HybridRecommender 카탈로그 스냅샷 생성")
+    parser.add_argument("--out", required=True, help="스냅샷 저장 디렉토리")
+    parser.add_argument("--synthetic", type=int, default=None, help="합성 영화 수 (미지정 시 DB에서 export)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--als-path", default="training/als_data")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        src = SyntheticCatalogSource(n_movies=args.synthetic, seed=args.seed)
+    else:
+        from dotenv import load_dotenv
+        load_dotenv()
+        src = DatabaseCatalogSource(
+            db_config={
+                'host': os.getenv("DATABASE_HOST", "localhost"),
+                'port': int(os.getenv("DATABASE_PORT", 5432)),
+                'database': os.getenv("DATABASE_NAME", "moviesir"),
+                'user': os.getenv("DATABASE_USER", "movigation"),
+                'password': os.getenv("DATABASE_PASSWORD", "")
+            },
+            als_model_path=args.als_path,
+            als_data_path=args.als_path
+        )
+    try:
+        save_snapshot(src.load(), args.out)
+    finally:
+        src.close()
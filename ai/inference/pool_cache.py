@@ -0,0 +1,146 @@
+"""
+후보 풀 캐시 (요청 내용 기반)
+
+- 같은 프로필 / 필터 / 제외 목록 요청(더블탭, 프론트 재시도)의 점수 계산을 재사용
+- 최종 조합이 아니라 점수가 매겨진 후보 풀을 저장 → 노이즈 기반 다양성 선택은 매번 새로 수행
+- 키: 모델 세대(generation) + 요청 파라미터의 정규화 JSON sha256
+- 짧은 TTL, 후보 수 기준 메모리 상한(LRU 제거), 모델 세대 변경 시 전체 무효화
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+POOL_CACHE_ENABLED = os.getenv("POOL_CACHE_ENABLED", "true").lower() == "true"
+POOL_CACHE_TTL_SECONDS = float(os.getenv("POOL_CACHE_TTL_SECONDS", "30"))
+POOL_CACHE_MAX_CANDIDATES = int(os.getenv("POOL_CACHE_MAX_CANDIDATES", "100000"))
+
+
+def _canonical(value: Any) -> Any:
+    """순서가 의미 없는 리스트(ID, 장르, OTT)는 정렬 + 중복 제거"""
+    if isinstance(value, (list, tuple, set)):
+        items = [_canonical(v) for v in value]
+        try:
+            return sorted(set(items))
+        except TypeError:
+            return items
+    if isinstance(value, dict):
+        return {k: _canonical(v) for k, v in value.items()}
+    return value
+
+
+def make_key(generation: str, kind: str, params: Dict[str, Any]) -> str:
+    """요청 파라미터의 content-addressed 키"""
+    payload = json.dumps(
+        {"generation": generation, "kind": kind, "params": _canonical(params)},
+        sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CandidatePoolCache:
+    """
+    TTL + LRU 후보 풀 캐시 (스레드 안전)
+
+    풀은 후보 dict 리스트 (또는 후보 리스트를 담은 dict)이며 호출자는 수정하지 않아야 함
+    메모리 상한은 저장된 후보 수 합계로 계산 (후보 dict 하나가 메타데이터 문자열을 참조만 함)
+    """
+
+    def __init__(self, ttl_seconds: float = 30, max_candidates: int = 100000):
+        self.ttl_seconds = ttl_seconds
+        self.max_candidates = max_candidates
+        self.generation: Optional[str] = None
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, size, pool)
+        self._total_candidates = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def set_generation(self, generation: str):
+        """모델 세대 변경 시 전체 무효화"""
+        with self._lock:
+            if generation != self.generation:
+                if self._entries:
+                    print(f"[PoolCache] Model generation changed ({self.generation} → {generation}), "
+                          f"dropping {len(self._entries)} entries")
+                self._entries.clear()
+                self._total_candidates = 0
+                self.generation = generation
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, size, pool = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._total_candidates -= size
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pool
+
+    def put(self, key: str, pool: Any, size: int):
+        if size > self.max_candidates:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_candidates -= old[1]
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, size, pool)
+            self._total_candidates += size
+
+            # 메모리 상한: 만료 항목 우선, 그다음 가장 오래 사용 안 된 항목 제거
+            if self._total_candidates > self.max_candidates:
+                now = time.monotonic()
+                for expired_key in [k for k, (exp, _, _) in self._entries.items() if exp < now]:
+                    self._total_candidates -= self._entries.pop(expired_key)[1]
+                    self.evictions += 1
+            while self._total_candidates > self.max_candidates and self._entries:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._total_candidates -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_candidates = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": True,
+                "generation": self.generation,
+                "entries": len(self._entries),
+                "candidates": self._total_candidates,
+                "max_candidates": self.max_candidates,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+def pool_size(pool: Any) -> int:
+    """메모리 상한 계산용 후보 수"""
+    if isinstance(pool, list):
+        return len(pool)
+    if isinstance(pool, dict):
+        return sum(len(v) for v in pool.values() if isinstance(v, list)) or 1
+    return 1
+
+
+def pool_cache_from_env() -> Optional[CandidatePoolCache]:
+    """POOL_CACHE_ENABLED=false면 None (캐시 없이 매번 계산)"""
+    if not POOL_CACHE_ENABLED:
+        return None
+    return CandidatePoolCache(ttl_seconds=POOL_CACHE_TTL_SECONDS, max_candidates=POOL_CACHE_MAX_CANDIDATES)
@@ -1,205 +1,132 @@
-import torch
-import pickle
 import numpy as np
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from pathlib import Path
 from sklearn.preprocessing import MinMaxScaler
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 from math import log
 from datetime import datetime
+import contextlib
 import random
+import threading
 import time
+import uuid
 from dotenv import load_dotenv
 import os
 
-"""
-Hybrid Recommendation System (SBERT + ALS) with Noise-based Diversity
-"""
+try:
+    import torch
+except ImportError:  # CPU 전용 벤치마크 / CI 환경
+    torch = None
 
+from .data_source import (
+    CatalogData,
+    DatabaseCatalogSource,
+    DatabaseConnection,  # noqa: F401 (하위 호환 import 경로)
+    SnapshotCatalogSource,
+    SyntheticCatalogSource,
+)
+from .pool_cache import make_key, pool_size
 
-class DatabaseConnection:
-    """PostgreSQL 연결 관리"""
+# _find_combination 최대 영화 수 (Track B 후보 풀 여유분 계산에도 사용)
+MAX_COMBINATION_MOVIES = 15
 
-    def __init__(self, host: str, port: int, database: str, user: str, password: str):
-        self.connection_params = {
-            'host': host,
-            'port': port,
-            'database': database,
-            'user': user,
-            'password': password,
-            'options': '-c search_path=public,b2c,b2b'
-        }
-        self.conn = None
-
-    def connect(self):
-        """DB 연결"""
-        if self.conn is None or self.conn.closed:
-            self.conn = psycopg2.connect(**self.connection_params)
-        return self.conn
-
-    def close(self):
-        """DB 연결 종료"""
-        if self.conn and not self.conn.closed:
-            self.conn.close()
+# 교체 후보 예비 목록 런타임 구간 (분) - 구간마다 상위 후보를 남겨 어떤 길이의 영화를 교체해도 후보가 있도록
+RESERVE_BAND_MINUTES = 30
 
-    def execute_query(self, query: str, params: tuple = None) -> List[dict]:
-        """쿼리 실행 및 결과 반환"""
-        conn = self.connect()
-        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute(query, params)
-            return cursor.fetchall()
+"""
+Hybrid Recommendation System (SBERT + ALS) with Noise-based Diversity
+"""
 
 
 class HybridRecommender:
     def __init__(
         self,
-        db_config: dict,
-        als_model_path: str,
-        als_data_path: str,
-        device: str = None
+        db_config: dict = None,
+        als_model_path: str = None,
+        als_data_path: str = None,
+        device: str = None,
+        data_source=None,
+        pool_cache=None
     ):
         """
         Args:
-            db_config: PostgreSQL 연결 설정
+            db_config: PostgreSQL 연결 설정 (data_source 미지정 시 사용)
             als_model_path: ALS 모델 경로 (폴더)
             als_data_path: ALS 데이터 경로 (폴더)
             device: 연산 장치 (cuda/cpu)
+            data_source: 카탈로그 데이터 소스 (inference.data_source 참고)
+                         load() -> CatalogData, close() 를 제공하는 객체
+            pool_cache: 후보 풀 캐시 (inference.pool_cache.CandidatePoolCache, 없으면 매번 계산)
         """
-        self.device = device or ('cuda' if torch.cuda.is_available() else 'cpu')
-
-        # DB 연결
-        self.db = DatabaseConnection(**db_config)
+        if device is None:
+            device = 'cuda' if torch is not None and torch.cuda.is_available() else 'cpu'
+        self.device = device
+
+        # 데이터 소스 (기본: DB + ALS 파일)
+        if data_source is None:
+            if db_config is None:
+                raise ValueError("db_config 또는 data_source 중 하나는 필요합니다")
+            data_source = DatabaseCatalogSource(db_config, als_model_path, als_data_path)
+        self.data_source = data_source
+        self.db = getattr(data_source, 'db', None)  # 하위 호환 (compare 스크립트)
 
         print("Initializing Hybrid Recommender (SBERT + ALS, Noise-based Diversity)...")
 
-        # 1. 데이터 로드 (DB에서)
-        self._load_metadata_from_db()
-        self._load_sbert_data_from_db()
-        self._load_ott_data_from_db()
+        # 단계별 소요 시간 (초) - /ready 응답에 포함
+        self.startup_timings = {}
 
-        # 2. ALS 로드 (파일에서)
-        self._load_als_data(als_data_path)
-        self._load_als_model(als_model_path)
+        # 1. 데이터 로드
+        phase_start = time.time()
+        self._load_catalog(data_source.load())
+        self.startup_timings['catalog_load'] = round(time.time() - phase_start, 3)
 
-        # 3. Pre-alignment
+        # 2. Pre-alignment
         print("Pre-aligning models...")
+        phase_start = time.time()
         self._align_models()
+        self.startup_timings['align'] = round(time.time() - phase_start, 3)
 
-        print(f"Initialization complete. Target movies: {len(self.common_movie_ids)}")
-
-    def _load_metadata_from_db(self):
-        """DB에서 영화 메타데이터 로드"""
-        print("Loading metadata from database...")
+        # 3. 모델 세대 (로드마다 새로 발급 → 이전 세대 후보 풀 캐시 무효화)
+        self.generation = uuid.uuid4().hex[:12]
+        self.pool_cache = pool_cache
+        if pool_cache is not None:
+            pool_cache.set_generation(self.generation)
 
-        query = """
-            SELECT
-                movie_id, tmdb_id, title, runtime, genres,
-                overview, poster_path, release_date,
-                vote_average, vote_count, popularity, adult
-            FROM movies
-        """
-        rows = self.db.execute_query(query)
-
-        self.metadata_map = {}
-        for row in rows:
-            movie_id = row['movie_id']
-            self.metadata_map[movie_id] = {
-                'movie_id': movie_id,
-                'tmdb_id': row['tmdb_id'],
-                'title': row['title'],
-                'runtime': row['runtime'] or 0,
-                'genres': row['genres'] or [],
-                'overview': row['overview'] or '',
-                'poster_path': row['poster_path'],
-                'release_date': str(row['release_date']) if row['release_date'] else '',
-                'vote_average': float(row['vote_average']) if row['vote_average'] else 0.0,
-                'vote_count': int(row['vote_count']) if row['vote_count'] else 0,
-                'popularity': row['popularity'] or 0,
-                'adult': row['adult'] or False
-            }
+        # recommend_batch 범위 메모 (필터 결과 / 후보 인덱스, 요청 스레드별)
+        self._batch = threading.local()
 
-        print(f"  Metadata loaded: {len(self.metadata_map):,} movies")
+        print(f"Initialization complete. Target movies: {len(self.common_movie_ids)}")
 
-    def _load_sbert_data_from_db(self):
-        """DB에서 SBERT 임베딩 로드"""
-        print("Loading SBERT embeddings from database...")
+    @classmethod
+    def from_snapshot(cls, snapshot_dir: str, **kwargs) -> "HybridRecommender":
+        """스냅샷 디렉토리에서 생성 (DB 불필요)"""
+        return cls(data_source=SnapshotCatalogSource(snapshot_dir), **kwargs)
 
-        query = """
-            SELECT mv.movie_id, mv.embedding
-            FROM movie_vectors mv
-            ORDER BY mv.movie_id
-        """
-        rows = self.db.execute_query(query)
-
-        self.sbert_movie_ids = []
-        embeddings = []
-
-        for row in rows:
-            movie_id = row['movie_id']
-            embedding = row['embedding']
-            if isinstance(embedding, str):
-                embedding = np.fromstring(embedding.strip('[]'), sep=',', dtype='float32')
-            elif isinstance(embedding, list):
-                embedding = np.array(embedding, dtype='float32')
-            else:
-                embedding = np.array(embedding, dtype='float32')
+    @classmethod
+    def from_synthetic(cls, n_movies: int = 10000, seed: int = 42, **kwargs) -> "HybridRecommender":
+        """합성 카탈로그로 생성 (벤치마크 / 프로파일링용)"""
+        return cls(data_source=SyntheticCatalogSource(n_movies=n_movies, seed=seed), **kwargs)
 
-            self.sbert_movie_ids.append(movie_id)
-            embeddings.append(embedding)
+    def _load_catalog(self, catalog: CatalogData):
+        """CatalogData → 내부 인덱스 구성"""
+        self.metadata_map = catalog.metadata_map
+        print(f"  Metadata loaded: {len(self.metadata_map):,} movies")
 
-        self.sbert_embeddings = np.array(embeddings, dtype='float32')
+        self.sbert_movie_ids = list(catalog.sbert_movie_ids)
+        self.sbert_embeddings = catalog.sbert_embeddings
         self.sbert_movie_to_idx = {mid: idx for idx, mid in enumerate(self.sbert_movie_ids)}
-
         print(f"  SBERT movies: {len(self.sbert_movie_ids):,}")
 
-    def _load_ott_data_from_db(self):
-        """DB에서 OTT 데이터 로드"""
-        print("Loading OTT data from database...")
-
-        map_query = """
-            SELECT mom.movie_id, op.provider_name
-            FROM movie_ott_map mom
-            JOIN ott_providers op ON mom.provider_id = op.provider_id
-        """
-        map_rows = self.db.execute_query(map_query)
-
-        self.movie_ott_map = {}
-        for row in map_rows:
-            movie_id = row['movie_id']
-            provider_name = row['provider_name']
-            if movie_id not in self.movie_ott_map:
-                self.movie_ott_map[movie_id] = []
-            self.movie_ott_map[movie_id].append(provider_name)
-
+        self.movie_ott_map = catalog.movie_ott_map
         print(f"  OTT data loaded: {len(self.movie_ott_map):,} movies")
 
-    def _load_als_data(self, data_path: str):
-        """ALS 매핑 데이터 로드 (movie_id → index 직접 매핑)"""
-        data_path = Path(data_path)
-        with open(data_path / 'mappings.pkl', 'rb') as f:
-            mappings = pickle.load(f)
-
-        # ALS는 item2idx를 사용 (MovieLens movie_id → index)
-        # item2idx의 key가 이미 DB의 movie_id와 동일하므로 직접 사용
-        als_item_to_idx = mappings['item2idx']
-
-        # movie_id → ALS index 매핑 (직접 사용)
-        self.als_movie_to_idx = {}
-        for movie_id, als_idx in als_item_to_idx.items():
-            # metadata_map에 존재하는 영화만 포함
-            if movie_id in self.metadata_map:
-                self.als_movie_to_idx[movie_id] = als_idx
-
+        # movie_id → ALS index 매핑 (metadata_map에 존재하는 영화만 포함)
+        self.als_movie_to_idx = {
+            movie_id: als_idx
+            for movie_id, als_idx in catalog.als_item_to_idx.items()
+            if movie_id in self.metadata_map
+        }
         print(f"  ALS movies: {len(self.als_movie_to_idx):,}")
 
-    def _load_als_model(self, model_path: str):
-        """ALS 모델 로드 (item factors)"""
-        print(f"Loading ALS model from {model_path}")
-        model_path = Path(model_path)
-
-        # ALS item factors는 numpy 배열로 저장됨
-        self.als_item_factors = np.load(model_path / 'als_item_factors.npy')
+        self.als_item_factors = catalog.als_item_factors
         print(f"  ALS item factors shape: {self.als_item_factors.shape}")
 
     def _align_models(self):
@@ -371,7 +298,25 @@ class HybridRecommender:
         min_year: int = 2000,
         allow_adult: bool = False
     ) -> List[int]:
-        """필터링 적용 (Phase 2 최적화: 인덱스 기반 set 연산)"""
+        """필터링 적용 (Phase 2 최적화: 인덱스 기반 set 연산)
+
+        recommend_batch 범위에서는 같은 조건의 결과(같은 리스트 객체)를 재사용 - 반환값을 수정하지 말 것
+        """
+        memo = getattr(self._batch, 'filters', None)
+        if memo is not None:
+            key = (tuple(preferred_genres or ()), tuple(preferred_otts or ()), min_year, allow_adult)
+            if key not in memo:
+                memo[key] = self._filter_ids(preferred_genres, preferred_otts, min_year, allow_adult)
+            return memo[key]
+        return self._filter_ids(preferred_genres, preferred_otts, min_year, allow_adult)
+
+    def _filter_ids(
+        self,
+        preferred_genres: Optional[List[str]],
+        preferred_otts: Optional[List[str]],
+        min_year: int,
+        allow_adult: bool
+    ) -> List[int]:
         # 1. 연도 필터 (인덱스 사용)
         year_filtered = set()
         for year in range(min_year, 2026):
@@ -397,6 +342,59 @@ class HybridRecommender:
 
         return list(year_filtered)
 
+    def _candidate_index(self, filtered_ids: List[int]) -> Dict[str, Any]:
+        """
+        필터된 영화 ID → 후보 배열 (movie_id, 행 인덱스, 평점 점수, ALS 보유 여부)
+
+        사용자와 무관한 값이라 recommend_batch 범위에서는 같은 필터 결과(_apply_filters 메모)마다 한 번만 계산
+        """
+        memo = getattr(self._batch, 'candidates', None)
+        if memo is not None:
+            entry = memo.get(id(filtered_ids))
+            if entry is not None and entry[0] is filtered_ids:
+                return entry[1]
+
+        # O(1) 딕셔너리 조회
+        movie_ids = []
+        indices = []
+        for mid in filtered_ids:
+            idx = self.movie_id_to_idx.get(mid)
+            if idx is not None:
+                movie_ids.append(mid)
+                indices.append(idx)
+
+        # 평점 점수 조회 (Phase 1 최적화: 사전 계산된 값 사용)
+        rating = np.array([self.rating_scores.get(mid, 0.0) for mid in movie_ids])
+        if len(rating) > 1:
+            # 평점 점수도 0~1 정규화 (블록버스터 편향 제거)
+            rating = MinMaxScaler().fit_transform(rating.reshape(-1, 1)).squeeze()
+
+        block = {
+            'movie_ids': movie_ids,
+            'movie_id_array': np.array(movie_ids, dtype=np.int64),
+            'indices': np.array(indices, dtype=np.int64),
+            'rating': rating,
+            # ALS 있는 영화 (가중치 재조정용)
+            'has_als': np.array([mid in self.als_movie_to_idx for mid in movie_ids], dtype=bool),
+            'genre_overlap': {},  # 선호 장르 조합 → 겹치는 장르 수 배열
+        }
+        if memo is not None:
+            memo[id(filtered_ids)] = (filtered_ids, block)  # 리스트 참조 유지 → id 재사용 방지
+        return block
+
+    def _genre_overlap(self, block: Dict[str, Any], preferred_genres: List[str]) -> np.ndarray:
+        """후보별 선호 장르와 겹치는 장르 수 (후보 배열에 캐시)"""
+        key = tuple(preferred_genres)
+        overlap = block['genre_overlap'].get(key)
+        if overlap is None:
+            preferred = set(preferred_genres)
+            overlap = np.array([
+                len(set(self.metadata_map.get(mid, {}).get('genres', [])) & preferred)
+                for mid in block['movie_ids']
+            ])
+            block['genre_overlap'][key] = overlap
+        return overlap
+
     def _get_top_movies(
         self,
         user_sbert_profile: np.ndarray,
@@ -427,19 +425,14 @@ class HybridRecommender:
         # 🔒 O(1) 중복 체크를 위해 set으로 변환
         exclude_set = set(exclude_ids)
 
-        # 필터된 영화들의 인덱스 (O(1) 딕셔너리 조회)
-        filtered_indices = []
-        for mid in filtered_ids:
-            idx = self.movie_id_to_idx.get(mid)
-            if idx is not None:
-                filtered_indices.append((mid, idx))
+        # 필터된 영화들의 인덱스 / 평점 점수 (배치 범위에서는 같은 필터 결과끼리 공유)
+        block = self._candidate_index(filtered_ids)
+        indices = block['indices']
 
-        if not filtered_indices:
+        if len(indices) == 0:
             return []
 
         # 벡터화 유사도 계산 (평균 유사도 방식)
-        indices = [idx for _, idx in filtered_indices]
-        
         # SBERT 유사도: (M, SBERT_dim) @ (SBERT_dim, N) = (M, N)
         # M: 필터된 영화 수, N: 사용자 프로필 영화 수
         sbert_similarities = self.target_sbert_norm[indices] @ user_sbert_profile.T
@@ -451,60 +444,39 @@ class HybridRecommender:
         sbert_scores = np.max(sbert_similarities, axis=1)  # (M,)
         als_scores = np.max(als_similarities, axis=1)  # (M,)
 
-        # MinMax 정규화
-        scaler = MinMaxScaler()
-
-        # 평점 점수 조회 (Phase 1 최적화: 사전 계산된 값 사용)
-        filtered_rating = np.array([self.rating_scores.get(mid, 0.0) for mid, _ in filtered_indices])
-
+        # MinMax 정규화 (평점 점수는 _candidate_index에서 정규화)
         if len(sbert_scores) > 1:
+            scaler = MinMaxScaler()
             norm_sbert = scaler.fit_transform(sbert_scores.reshape(-1, 1)).squeeze()
             norm_als = scaler.fit_transform(als_scores.reshape(-1, 1)).squeeze()
-            # 평점 점수도 0~1 정규화 (블록버스터 편향 제거)
-            norm_rating = scaler.fit_transform(filtered_rating.reshape(-1, 1)).squeeze()
         else:
             norm_sbert = sbert_scores
             norm_als = als_scores
-            norm_rating = filtered_rating
+        norm_sbert = norm_sbert.astype(np.float64)
+        norm_als = norm_als.astype(np.float64)
 
-        # ALS 있는 영화 ID 집합 (가중치 재조정용)
-        als_ids = set(self.als_movie_to_idx.keys())
+        # 최종 점수 (벡터화)
+        # 가중치 재조정: ALS 있으면 하이브리드(SBERT + ALS), 없으면 SBERT만 (가중치 1.0)
+        model_score = np.where(block['has_als'], sbert_weight * norm_sbert + als_weight * norm_als, norm_sbert)
 
-        # 최종 점수 계산
-        movie_scores = []
-        for i, (mid, _) in enumerate(filtered_indices):
-            # 🔒 O(1) 중복 체크
-            if mid in exclude_set:
-                continue
-
-            # 가중치 재조정: ALS 없으면 SBERT만 사용
-            if mid in als_ids:
-                # 하이브리드: SBERT + ALS
-                model_score = sbert_weight * norm_sbert[i] + als_weight * norm_als[i]
-                rec_type = "hybrid"
-            else:
-                # SBERT만: 가중치 1.0
-                model_score = norm_sbert[i]
-                rec_type = "sbert_only"
+        # 최종 점수: 모델 70% + 평점 30% (정규화된 평점 점수, 0~1 범위)
+        final_scores = model_score * 0.7 + block['rating'] * 0.3
 
-            # 정규화된 평점 점수 (0~1 범위)
-            rating_score = norm_rating[i] if isinstance(norm_rating, np.ndarray) else norm_rating
+        # 장르 가중치 부스트 (Track A만, 최대 15%)
+        if preferred_genres and len(preferred_genres) > 1:
+            genre_weight = self._genre_overlap(block, preferred_genres) / len(preferred_genres)
+            final_scores = final_scores * (1 + genre_weight * 0.15)
 
-            # 최종 점수: 모델 70% + 평점 30%
-            final_score = model_score * 0.7 + rating_score * 0.3
+        # 🔒 제외 목록 마스크 후 점수순(동점은 필터 순서 유지) 상위 top_k만 메타데이터 조회
+        candidates = np.arange(len(indices))
+        if exclude_set:
+            candidates = candidates[~np.isin(block['movie_id_array'], list(exclude_set))]
+        order = candidates[np.argsort(-final_scores[candidates], kind='stable')[:top_k]]
 
-            # 메타데이터 조회 (장르 부스트 계산에 필요)
+        movie_scores = []
+        for i in order:
+            mid = block['movie_ids'][i]
             meta = self.metadata_map.get(mid, {})
-
-            # 장르 가중치 부스트 (Track A만)
-            if preferred_genres and len(preferred_genres) > 1:
-                movie_genres = set(meta.get('genres', []))
-                overlap = len(movie_genres & set(preferred_genres))
-                if overlap > 0:
-                    genre_weight = overlap / len(preferred_genres)
-                    genre_boost = genre_weight * 0.15  # 최대 15% 부스트
-                    final_score = final_score * (1 + genre_boost)
-
             movie_scores.append({
                 'movie_id': mid,
                 'tmdb_id': meta.get('tmdb_id'),
@@ -516,14 +488,10 @@ class HybridRecommender:
                 'overview': meta.get('overview', ''),
                 'release_date': meta.get('release_date', ''),
                 'poster_path': meta.get('poster_path', ''),
-                'score': final_score,
-                'recommendation_type': rec_type  # 추가: 추천 타입
+                'score': final_scores[i],
+                'recommendation_type': 'hybrid' if block['has_als'][i] else 'sbert_only'  # 추가: 추천 타입
             })
-
-
-        # 점수순 정렬 후 상위 top_k
-        movie_scores.sort(key=lambda x: x['score'], reverse=True)
-        return movie_scores[:top_k]
+        return movie_scores
 
     def _greedy_fill(
         self,
@@ -580,7 +548,7 @@ class HybridRecommender:
         # max_movies 동적 계산 (평균 90분 기준)
         if max_movies is None:
             max_movies = max(5, (available_time // 90) + 2)
-        max_movies = min(max_movies, 15)  # 최대 15편으로 제한
+        max_movies = min(max_movies, MAX_COMBINATION_MOVIES)  # 최대 15편으로 제한
 
         print(f"  Finding combination (noisy greedy): {available_time}min, max_movies={max_movies}, candidates={len(valid_movies)}")
 
@@ -697,7 +665,49 @@ class HybridRecommender:
         
         return penalized_candidates
 
+    @staticmethod
+    def _build_reserve(
+        candidates: List[Dict[str, Any]],
+        exclude_ids: set,
+        per_band: int
+    ) -> List[Dict[str, Any]]:
+        """
+        교체 후보 예비 목록 - 런타임 구간(RESERVE_BAND_MINUTES)별 점수 상위 per_band편
 
+        조합에 쓰이지 않은 후보 풀에서 뽑으므로 추가 계산 없음
+        백엔드가 세션별로 보관했다가 재추천(recommend_single) 요청을 AI 호출 없이 처리
+        """
+        band_counts: Dict[int, int] = {}
+        reserve = []
+        for movie in candidates:  # 점수 내림차순
+            if movie['movie_id'] in exclude_ids or not movie.get('runtime'):
+                continue
+            band = movie['runtime'] // RESERVE_BAND_MINUTES
+            if band_counts.get(band, 0) >= per_band:
+                continue
+            band_counts[band] = band_counts.get(band, 0) + 1
+            reserve.append(dict(movie))  # 후보 dict는 캐시된 풀과 공유 → 복사
+        return reserve
+
+    def _cached_pool(self, kind: str, params: Dict[str, Any], build, use_cache: bool = True):
+        """
+        후보 풀 캐시 조회 → 없으면 build()로 계산 후 저장
+
+        반환된 풀은 캐시와 공유되므로 후보 dict를 수정하지 말 것 (필요 시 copy)
+        use_cache=False면 캐시를 조회 / 저장하지 않음 (워밍업 합성 요청)
+        """
+        if self.pool_cache is None or not use_cache:
+            return build()
+
+        key = make_key(self.generation, kind, params)
+        pool = self.pool_cache.get(key)
+        if pool is not None:
+            print(f"[PoolCache] hit: {kind}")
+            return pool
+
+        pool = build()
+        self.pool_cache.put(key, pool, pool_size(pool))
+        return pool
 
     def recommend(
         self,
@@ -708,7 +718,9 @@ class HybridRecommender:
         allow_adult: bool = False,
         excluded_ids_a: Optional[List[int]] = None,
         excluded_ids_b: Optional[List[int]] = None,
-        negative_movie_ids: Optional[List[int]] = None  # NEW
+        negative_movie_ids: Optional[List[int]] = None,  # NEW
+        reserve_per_band: int = 0,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         초기 추천 - 영화 조합 반환 (하이브리드: SBERT + ALS)
@@ -725,14 +737,45 @@ class HybridRecommender:
             excluded_ids_b: Track B 제외할 영화 ID (전체 이전 추천)
             allow_adult: 성인물 허용 여부
             negative_movie_ids: 부정 피드백 영화 ID (유사도 페널티)
+            reserve_per_band: 0보다 크면 트랙별 교체 후보 예비 목록('reserve') 포함
+            use_cache: False면 후보 풀 캐시 미사용 (워밍업)
 
         Returns:
             {
                 'track_a': { 'label': '...', 'movies': [...], 'total_runtime': int },
                 'track_b': { 'label': '...', 'movies': [...], 'total_runtime': int },
-                'elapsed_time': float
+                'elapsed_time': float,
+                'reserve': { 'a': [...], 'b': [...] }  # reserve_per_band > 0일 때만
             }
         """
+        result = {}
+        for key, value in self.iter_recommend(
+            user_movie_ids, available_time, preferred_genres, preferred_otts, allow_adult,
+            excluded_ids_a, excluded_ids_b, negative_movie_ids, reserve_per_band, use_cache
+        ):
+            result[key] = value
+        return result
+
+    def iter_recommend(
+        self,
+        user_movie_ids: List[int],
+        available_time: int,
+        preferred_genres: Optional[List[str]] = None,
+        preferred_otts: Optional[List[str]] = None,
+        allow_adult: bool = False,
+        excluded_ids_a: Optional[List[int]] = None,
+        excluded_ids_b: Optional[List[int]] = None,
+        negative_movie_ids: Optional[List[int]] = None,  # NEW
+        reserve_per_band: int = 0,
+        use_cache: bool = True
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        recommend()의 단계별 버전 - 결과가 정해지는 대로 (키, 값) 반환 (스트리밍 응답용)
+
+        순서: ('track_a', 트랙) → ('track_b', 트랙) → ('reserve', 예비 목록, reserve_per_band > 0일 때만)
+              → ('elapsed_time', 초)
+        Track A는 Track B 계산 전에 반환되므로 클라이언트가 첫 줄을 먼저 그릴 수 있음
+        """
         excluded_ids_a = excluded_ids_a or []
         excluded_ids_b = excluded_ids_b or []
         negative_movie_ids = negative_movie_ids or []
@@ -764,45 +807,18 @@ class HybridRecommender:
         exclude_a = list(set(user_movie_ids + excluded_ids_a))
 
         # ===== Track A: 장르 + OTT + 2000년 이상 =====
-        filtered_a = self._apply_filters(
-            preferred_genres=preferred_genres,
-            preferred_otts=preferred_otts,
-            min_year=2000,
-            allow_adult=allow_adult
-        )
-        print(f"Track A filtered: {len(filtered_a)} movies")
-
-        top_candidates_a = self._get_top_movies(
-            user_sbert_profile, user_als_profile,
-            filtered_a,
-            sbert_weight=0.7,
-            als_weight=0.3,
-            top_k=300,
-            exclude_ids=exclude_a,
-            preferred_genres=preferred_genres  # ← Track A는 장르 가중치 적용
-        )
-        print(f"Track A top candidates: {len(top_candidates_a)} movies")
-        
-        # 부정 피드백 페널티 적용
-        if negative_movie_ids:
-            top_candidates_a = self._apply_negative_penalty(top_candidates_a, negative_movie_ids)
-
-        combo_a = self._find_combination(top_candidates_a, available_time)
-
-        # 조합이 부족하면 필터 완화해서 재시도
-        if not combo_a or (combo_a and combo_a['total_runtime'] < available_time * 0.7):
-            print("Track A: Relaxing filters (removing OTT filter)...")
-            filtered_a_relaxed = self._apply_filters(
+        def build_pool_a():
+            filtered_a = self._apply_filters(
                 preferred_genres=preferred_genres,
-                preferred_otts=None,  # OTT 필터 제거
+                preferred_otts=preferred_otts,
                 min_year=2000,
                 allow_adult=allow_adult
             )
-            print(f"Track A relaxed: {len(filtered_a_relaxed)} movies")
+            print(f"Track A filtered: {len(filtered_a)} movies")
 
-            top_candidates_a_relaxed = self._get_top_movies(
+            candidates = self._get_top_movies(
                 user_sbert_profile, user_als_profile,
-                filtered_a_relaxed,
+                filtered_a,
                 sbert_weight=0.7,
                 als_weight=0.3,
                 top_k=300,
@@ -810,6 +826,53 @@ class HybridRecommender:
                 preferred_genres=preferred_genres  # ← Track A는 장르 가중치 적용
             )
 
+            # 부정 피드백 페널티 적용
+            if negative_movie_ids:
+                candidates = self._apply_negative_penalty(candidates, negative_movie_ids)
+            return candidates
+
+        top_candidates_a = self._cached_pool('recommend_a', {
+            'user_movie_ids': user_movie_ids,
+            'preferred_genres': preferred_genres,
+            'preferred_otts': preferred_otts,
+            'allow_adult': allow_adult,
+            'excluded_ids': exclude_a,
+            'negative_movie_ids': negative_movie_ids,
+        }, build_pool_a, use_cache)
+        print(f"Track A top candidates: {len(top_candidates_a)} movies")
+
+        combo_a = self._find_combination(top_candidates_a, available_time)
+
+        # 조합이 부족하면 필터 완화해서 재시도
+        if not combo_a or (combo_a and combo_a['total_runtime'] < available_time * 0.7):
+            print("Track A: Relaxing filters (removing OTT filter)...")
+
+            def build_pool_a_relaxed():
+                filtered_a_relaxed = self._apply_filters(
+                    preferred_genres=preferred_genres,
+                    preferred_otts=None,  # OTT 필터 제거
+                    min_year=2000,
+                    allow_adult=allow_adult
+                )
+                print(f"Track A relaxed: {len(filtered_a_relaxed)} movies")
+
+                return self._get_top_movies(
+                    user_sbert_profile, user_als_profile,
+                    filtered_a_relaxed,
+                    sbert_weight=0.7,
+                    als_weight=0.3,
+                    top_k=300,
+                    exclude_ids=exclude_a,
+                    preferred_genres=preferred_genres  # ← Track A는 장르 가중치 적용
+                )
+
+            top_candidates_a_relaxed = self._cached_pool('recommend_a_relaxed', {
+                'user_movie_ids': user_movie_ids,
+                'preferred_genres': preferred_genres,
+                'allow_adult': allow_adult,
+                'excluded_ids': exclude_a,
+            }, build_pool_a_relaxed, use_cache)
+
             combo_a_relaxed = self._find_combination(top_candidates_a_relaxed, available_time)
 
             # 완화된 결과가 더 나으면 사용
@@ -832,34 +895,48 @@ class HybridRecommender:
                 rec_type_label = '🔀 하이브리드' if rec_type == 'hybrid' else '📖 SBERT만'
                 print(f"  {i}. [{rec_type_label}] {movie['title']} ({movie['runtime']}분, score={movie.get('score', 0):.3f})")
 
+        yield 'track_a', track_a_result
+
         # ===== Track B: 2000년 이상 + OTT 필터 (장르만 무시) =====
-        filtered_b = self._apply_filters(
-            preferred_genres=None,
-            preferred_otts=preferred_otts,
-            min_year=2000,
-            allow_adult=allow_adult
-        )
+        # Track B 제외: 사용자 시청 기록 + 전체 이전 추천 (+ Track A 결과는 아래에서 제외)
+        exclude_b = list(set(user_movie_ids + excluded_ids_b))
 
-        # Track B 제외: 사용자 시청 기록 + 전체 이전 추천 + Track A 결과
-        exclude_b = list(set(
-            user_movie_ids +
-            excluded_ids_b +
-            [m['movie_id'] for m in track_a_result['movies']]
-        ))
-
-        top_candidates_b = self._get_top_movies(
-            user_sbert_profile, user_als_profile,
-            filtered_b,
-            sbert_weight=0.4,
-            als_weight=0.6,
-            top_k=300,
-            exclude_ids=exclude_b,
-            preferred_genres=None  # ← Track B는 장르 가중치 없음
-        )
-        
-        # 부정 피드백 페널티 적용
-        if negative_movie_ids:
-            top_candidates_b = self._apply_negative_penalty(top_candidates_b, negative_movie_ids)
+        def build_pool_b():
+            filtered_b = self._apply_filters(
+                preferred_genres=None,
+                preferred_otts=preferred_otts,
+                min_year=2000,
+                allow_adult=allow_adult
+            )
+
+            # Track A 결과는 매 요청 달라지므로 풀에서는 제외하지 않고,
+            # A 조합 최대 편수만큼 여유 있게 뽑아둔 뒤 조합 단계에서 제외
+            # (점수는 제외 목록과 무관하게 필터된 영화 전체 기준으로 정규화되므로 결과 동일)
+            candidates = self._get_top_movies(
+                user_sbert_profile, user_als_profile,
+                filtered_b,
+                sbert_weight=0.4,
+                als_weight=0.6,
+                top_k=300 + MAX_COMBINATION_MOVIES,
+                exclude_ids=exclude_b,
+                preferred_genres=None  # ← Track B는 장르 가중치 없음
+            )
+
+            # 부정 피드백 페널티 적용
+            if negative_movie_ids:
+                candidates = self._apply_negative_penalty(candidates, negative_movie_ids)
+            return candidates
+
+        pool_b = self._cached_pool('recommend_b', {
+            'user_movie_ids': user_movie_ids,
+            'preferred_otts': preferred_otts,
+            'allow_adult': allow_adult,
+            'excluded_ids': exclude_b,
+            'negative_movie_ids': negative_movie_ids,
+        }, build_pool_b, use_cache)
+
+        track_a_ids = {m['movie_id'] for m in track_a_result['movies']}
+        top_candidates_b = [m for m in pool_b if m['movie_id'] not in track_a_ids][:300]
 
         combo_b = self._find_combination(top_candidates_b, available_time)
 
@@ -877,14 +954,64 @@ class HybridRecommender:
                 rec_type_label = '🔀 하이브리드' if rec_type == 'hybrid' else '📖 SBERT만'
                 print(f"  {i}. [{rec_type_label}] {movie['title']} ({movie['runtime']}분, score={movie.get('score', 0):.3f})")
 
+        yield 'track_b', track_b_result
+
+        # 교체 후보 예비 목록 (두 트랙 조합에 쓰인 영화는 양쪽 모두에서 제외 - recommend_single과 동일)
+        # Track A는 recommend_single Track A와 같은 필터(장르 + OTT) 풀 사용
+        if reserve_per_band > 0:
+            shown_ids = track_a_ids | {m['movie_id'] for m in track_b_result['movies']}
+            reserve = {
+                'a': self._build_reserve(top_candidates_a, shown_ids, reserve_per_band),
+                'b': self._build_reserve(pool_b, shown_ids, reserve_per_band),
+            }
+            print(f"Reserve: A={len(reserve['a'])}, B={len(reserve['b'])}")
+            yield 'reserve', reserve
+
         elapsed = time.time() - start_time
         print(f"Elapsed: {elapsed:.2f}s")
 
-        return {
-            'track_a': track_a_result,
-            'track_b': track_b_result,
-            'elapsed_time': elapsed
-        }
+        yield 'elapsed_time', elapsed
+
+    @contextlib.contextmanager
+    def batch_scope(self):
+        """이 블록 안의 추천은 필터 결과 / 후보 인덱스를 공유 (같은 스레드 한정, 중첩 시 바깥 범위 사용)"""
+        if getattr(self._batch, 'filters', None) is not None:
+            yield
+            return
+        self._batch.filters = {}
+        self._batch.candidates = {}
+        try:
+            yield
+        finally:
+            self._batch.filters = None
+            self._batch.candidates = None
+
+    def recommend_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        여러 사용자 추천을 한 번에 처리 (B2B /v1/recommend/batch)
+
+        - 요청별 인자는 recommend()와 동일 (dict)
+        - 같은 필터(장르 / OTT / 성인) 조건의 필터 결과와 후보 인덱스 / 평점 배열은 한 번만 계산
+          → 사용자별로는 프로필 유사도 행렬곱과 조합 탐색만 수행
+        - 항목별 실패는 전체를 중단하지 않고 해당 항목의 error로 반환
+
+        Returns:
+            요청 순서대로 {'result': recommend() 결과} 또는 {'error': 메시지}
+        """
+        start_time = time.time()
+        results = []
+        with self.batch_scope():
+            for kwargs in requests:
+                try:
+                    results.append({'result': self.recommend(**kwargs)})
+                except Exception as e:
+                    import traceback
+                    traceback.print_exc()
+                    results.append({'error': str(e)})
+
+        print(f"Batch: {len(requests)} requests, "
+              f"{sum('error' in r for r in results)} failed, elapsed {time.time() - start_time:.2f}s")
+        return results
 
     def recommend_single(
         self,
@@ -895,7 +1022,8 @@ class HybridRecommender:
         preferred_genres: Optional[List[str]] = None,
         preferred_otts: Optional[List[str]] = None,
         allow_adult: bool = False,
-        negative_movie_ids: Optional[List[int]] = None  # NEW
+        negative_movie_ids: Optional[List[int]] = None,  # NEW
+        use_cache: bool = True
     ) -> Optional[Dict[str, Any]]:
         """
         개별 영화 재추천 - 단일 영화 반환 (하이브리드: SBERT + ALS)
@@ -912,6 +1040,7 @@ class HybridRecommender:
             preferred_otts: 구독 OTT (Track A용)
             allow_adult: 성인물 허용 여부
             negative_movie_ids: 부정 피드백 영화 ID (유사도 페널티)
+            use_cache: False면 후보 풀 캐시 미사용 (워밍업)
 
         Returns:
             { 'tmdb_id': int, 'title': str, 'runtime': int, ... } 또는 None
@@ -931,10 +1060,6 @@ class HybridRecommender:
         print(f"  Excluded set size: {len(excluded_set)}")
 
         start_time = time.time()
-        
-        # 사용자 프로필 생성
-        user_sbert_profile, user_als_profile = self._get_user_profile(user_movie_ids)
-        print(f"📊 User Profile: {len(user_movie_ids)} movies (positive feedback + onboarding)")
 
         # 런타임 범위: 대체할 영화와 비슷한 길이
         # target_runtime의 100%를 초과하지 않으면 전체 시간도 초과 안 됨
@@ -954,148 +1079,173 @@ class HybridRecommender:
         if len(user_movie_ids) > 10:
             print(f"  ... and {len(user_movie_ids) - 10} more movies")
 
+        is_track_a = track.lower() == 'a'
 
-        # 필터링
-        if track.lower() == 'a':
-            filtered = self._apply_filters(
-                preferred_genres=preferred_genres,
-                preferred_otts=preferred_otts,
-                min_year=2000,
-                allow_adult=allow_adult
-            )
-            sbert_w, als_w = 0.7, 0.3
-            use_genre_weight = preferred_genres  # ← Track A는 장르 가중치 사용
-        else:
-            filtered = self._apply_filters(
-                preferred_genres=None,
-                preferred_otts=None,
-                min_year=2000,
-                allow_adult=allow_adult
-            )
-            sbert_w, als_w = 0.4, 0.6
-            use_genre_weight = None  # ← Track B는 장르 가중치 없음
-
-        # 🚀 최적화: 3단계 런타임 Fallback (90-100 → 70-100 → 0-100)
-        # max_runtime = 100% 이하로 제한되어 있어 시간 초과 절대 방지
-        runtime_filtered = []
-        fallback_level = 0
-
-        # 1단계: 90~100% 시도
-        for mid in filtered:
-            meta = self.metadata_map.get(mid)
-            if meta:
-                runtime = meta.get('runtime', 0)
-                if min_runtime <= runtime <= max_runtime:
-                    runtime_filtered.append(mid)
-
-        print(f"[Level 0] 90-100% range: {len(runtime_filtered)} movies (target: {min_runtime}-{max_runtime}min)")
-
-        # 2단계: 70~100% 시도
-        if not runtime_filtered:
-            fallback_level = 1
-            fallback_min_70 = int(target_runtime * 0.7)
-            print(f"[Level 1] Expanding to 70-100% range ({fallback_min_70}-{max_runtime}min)...")
-            for mid in filtered:
-                meta = self.metadata_map.get(mid)
-                if meta:
-                    runtime = meta.get('runtime', 0)
-                    if fallback_min_70 <= runtime <= max_runtime:
-                        runtime_filtered.append(mid)
-            print(f"[Level 1] 70-100% range: {len(runtime_filtered)} movies")
+        # 상위 후보 계산 (런타임 필터링된 영화들만)
+        all_exclude = list(set(user_movie_ids + excluded_ids))
+        print(f"Excluding {len(all_exclude)} movies (user movies + already recommended)")
 
-        # 3단계: 0~100% 시도 (최종)
-        if not runtime_filtered:
-            fallback_level = 2
-            print(f"[Level 2] Expanding to 0-100% range (0-{max_runtime}min)...")
+        def build_pool():
+            # 필터링
+            if is_track_a:
+                filtered = self._apply_filters(
+                    preferred_genres=preferred_genres,
+                    preferred_otts=preferred_otts,
+                    min_year=2000,
+                    allow_adult=allow_adult
+                )
+                sbert_w, als_w = 0.7, 0.3
+                use_genre_weight = preferred_genres  # ← Track A는 장르 가중치 사용
+            else:
+                filtered = self._apply_filters(
+                    preferred_genres=None,
+                    preferred_otts=None,
+                    min_year=2000,
+                    allow_adult=allow_adult
+                )
+                sbert_w, als_w = 0.4, 0.6
+                use_genre_weight = None  # ← Track B는 장르 가중치 없음
+
+            # 🚀 최적화: 3단계 런타임 Fallback (90-100 → 70-100 → 0-100)
+            # max_runtime = 100% 이하로 제한되어 있어 시간 초과 절대 방지
+            runtime_filtered = []
+            fallback_level = 0
+
+            # 1단계: 90~100% 시도
             for mid in filtered:
                 meta = self.metadata_map.get(mid)
                 if meta:
                     runtime = meta.get('runtime', 0)
-                    if 0 < runtime <= max_runtime:
+                    if min_runtime <= runtime <= max_runtime:
                         runtime_filtered.append(mid)
-            print(f"[Level 2] 0-100% range: {len(runtime_filtered)} movies")
-
-        if not runtime_filtered:
-            print(f"❌ No valid movies found even with full range")
-            return None
 
-        # 상위 후보 계산 (런타임 필터링된 영화들만)
-        all_exclude = list(set(user_movie_ids + excluded_ids))
-        print(f"Excluding {len(all_exclude)} movies (user movies + already recommended)")
-
-        top_candidates = self._get_top_movies(
-            user_sbert_profile, user_als_profile,
-            runtime_filtered,  # 런타임 필터링된 영화만
-            sbert_weight=sbert_w,
-            als_weight=als_w,
-            top_k=300,
-            exclude_ids=all_exclude,
-            preferred_genres=use_genre_weight  # ← Track A일 때만 장르 가중치
-        )
-        print(f"Top candidates after scoring: {len(top_candidates)} movies")
+            print(f"[Level 0] 90-100% range: {len(runtime_filtered)} movies (target: {min_runtime}-{max_runtime}min)")
 
-        # 🔍 중복 진단: top_candidates에 excluded 영화가 있는지 확인
-        if top_candidates:
-            duplicates_in_candidates = [m['movie_id'] for m in top_candidates if m['movie_id'] in excluded_set]
-            if duplicates_in_candidates:
-                print(f"⚠️ WARNING: {len(duplicates_in_candidates)} excluded movies in top_candidates!")
-                print(f"   Duplicate IDs: {duplicates_in_candidates[:5]}")
-                print(f"   This should not happen - _get_top_movies should filter them out")
-
-        # 후보가 없으면 Fallback 시도
-        if not top_candidates and fallback_level < 2:
-            print(f"❌ No candidates after scoring")
-            print(f"   - Runtime filtered: {len(runtime_filtered)}")
-            print(f"   - Excluded: {len(all_exclude)}")
-            print(f"   - Hint: All runtime-matching movies might be excluded already")
-            print(f"   - Retrying with expanded runtime range...")
-            
-            # Level 1 시도
-            if fallback_level == 0:
+            # 2단계: 70~100% 시도
+            if not runtime_filtered:
                 fallback_level = 1
                 fallback_min_70 = int(target_runtime * 0.7)
-                runtime_filtered = []
+                print(f"[Level 1] Expanding to 70-100% range ({fallback_min_70}-{max_runtime}min)...")
                 for mid in filtered:
                     meta = self.metadata_map.get(mid)
                     if meta:
                         runtime = meta.get('runtime', 0)
                         if fallback_min_70 <= runtime <= max_runtime:
                             runtime_filtered.append(mid)
-                print(f"[Level 1 Retry] 70-100% range: {len(runtime_filtered)} movies")
-                
-                top_candidates = self._get_top_movies(
-                    user_sbert_profile, user_als_profile,
-                    runtime_filtered,
-                    sbert_weight=sbert_w,
-                    als_weight=als_w,
-                    top_k=300,
-                    exclude_ids=all_exclude,
-                    preferred_genres=use_genre_weight
-                )
-                print(f"Top candidates after Level 1: {len(top_candidates)} movies")
+                print(f"[Level 1] 70-100% range: {len(runtime_filtered)} movies")
 
-            # Level 2 시도
-            if not top_candidates and fallback_level == 1:
+            # 3단계: 0~100% 시도 (최종)
+            if not runtime_filtered:
                 fallback_level = 2
-                runtime_filtered = []
+                print(f"[Level 2] Expanding to 0-100% range (0-{max_runtime}min)...")
                 for mid in filtered:
                     meta = self.metadata_map.get(mid)
                     if meta:
                         runtime = meta.get('runtime', 0)
                         if 0 < runtime <= max_runtime:
                             runtime_filtered.append(mid)
-                print(f"[Level 2 Retry] 0-100% range: {len(runtime_filtered)} movies")
+                print(f"[Level 2] 0-100% range: {len(runtime_filtered)} movies")
 
-                top_candidates = self._get_top_movies(
-                    user_sbert_profile, user_als_profile,
-                    runtime_filtered,
-                    sbert_weight=sbert_w,
-                    als_weight=als_w,
-                    top_k=300,
-                    exclude_ids=all_exclude,
-                    preferred_genres=use_genre_weight
-                )
-                print(f"Top candidates after Level 2: {len(top_candidates)} movies")
+            if not runtime_filtered:
+                return {'candidates': [], 'fallback_level': fallback_level, 'runtime_filtered': 0}
+
+            top_candidates = self._get_top_movies(
+                user_sbert_profile, user_als_profile,
+                runtime_filtered,  # 런타임 필터링된 영화만
+                sbert_weight=sbert_w,
+                als_weight=als_w,
+                top_k=300,
+                exclude_ids=all_exclude,
+                preferred_genres=use_genre_weight  # ← Track A일 때만 장르 가중치
+            )
+            print(f"Top candidates after scoring: {len(top_candidates)} movies")
+
+            # 후보가 없으면 Fallback 시도
+            if not top_candidates and fallback_level < 2:
+                print(f"❌ No candidates after scoring")
+                print(f"   - Runtime filtered: {len(runtime_filtered)}")
+                print(f"   - Excluded: {len(all_exclude)}")
+                print(f"   - Hint: All runtime-matching movies might be excluded already")
+                print(f"   - Retrying with expanded runtime range...")
+
+                # Level 1 시도
+                if fallback_level == 0:
+                    fallback_level = 1
+                    fallback_min_70 = int(target_runtime * 0.7)
+                    runtime_filtered = []
+                    for mid in filtered:
+                        meta = self.metadata_map.get(mid)
+                        if meta:
+                            runtime = meta.get('runtime', 0)
+                            if fallback_min_70 <= runtime <= max_runtime:
+                                runtime_filtered.append(mid)
+                    print(f"[Level 1 Retry] 70-100% range: {len(runtime_filtered)} movies")
+
+                    top_candidates = self._get_top_movies(
+                        user_sbert_profile, user_als_profile,
+                        runtime_filtered,
+                        sbert_weight=sbert_w,
+                        als_weight=als_w,
+                        top_k=300,
+                        exclude_ids=all_exclude,
+                        preferred_genres=use_genre_weight
+                    )
+                    print(f"Top candidates after Level 1: {len(top_candidates)} movies")
+
+                # Level 2 시도
+                if not top_candidates and fallback_level == 1:
+                    fallback_level = 2
+                    runtime_filtered = []
+                    for mid in filtered:
+                        meta = self.metadata_map.get(mid)
+                        if meta:
+                            runtime = meta.get('runtime', 0)
+                            if 0 < runtime <= max_runtime:
+                                runtime_filtered.append(mid)
+                    print(f"[Level 2 Retry] 0-100% range: {len(runtime_filtered)} movies")
+
+                    top_candidates = self._get_top_movies(
+                        user_sbert_profile, user_als_profile,
+                        runtime_filtered,
+                        sbert_weight=sbert_w,
+                        als_weight=als_w,
+                        top_k=300,
+                        exclude_ids=all_exclude,
+                        preferred_genres=use_genre_weight
+                    )
+                    print(f"Top candidates after Level 2: {len(top_candidates)} movies")
+
+            return {
+                'candidates': top_candidates,
+                'fallback_level': fallback_level,
+                'runtime_filtered': len(runtime_filtered)
+            }
+
+        # Track B는 장르/OTT 필터를 쓰지 않으므로 캐시 키에서도 제외
+        pool = self._cached_pool('recommend_single', {
+            'user_movie_ids': user_movie_ids,
+            'target_runtime': target_runtime,
+            'track': 'a' if is_track_a else 'b',
+            'preferred_genres': preferred_genres if is_track_a else None,
+            'preferred_otts': preferred_otts if is_track_a else None,
+            'allow_adult': allow_adult,
+            'excluded_ids': all_exclude,
+            'negative_movie_ids': negative_movie_ids,
+        }, build_pool, use_cache)
+        top_candidates = pool['candidates']
+        fallback_level = pool['fallback_level']
+
+        if not pool['runtime_filtered']:
+            print(f"❌ No valid movies found even with full range")
+            return None
+
+        # 🔍 중복 진단: top_candidates에 excluded 영화가 있는지 확인
+        if top_candidates:
+            duplicates_in_candidates = [m['movie_id'] for m in top_candidates if m['movie_id'] in excluded_set]
+            if duplicates_in_candidates:
+                print(f"⚠️ WARNING: {len(duplicates_in_candidates)} excluded movies in top_candidates!")
+                print(f"   Duplicate IDs: {duplicates_in_candidates[:5]}")
+                print(f"   This should not happen - _get_top_movies should filter them out")
 
         # 노이즈 기반 다양성 선택 (점수에 랜덤 노이즈 적용)
         if top_candidates:
@@ -1118,8 +1268,9 @@ class HybridRecommender:
                 noisy_candidates.append((noisy_score, movie))
 
             # 노이즈 적용된 점수로 정렬 후 최고점 선택
+            # (후보 dict는 캐시된 풀과 공유되므로 복사 후 메타데이터 추가)
             noisy_candidates.sort(key=lambda x: x[0], reverse=True)
-            _, selected = noisy_candidates[0]
+            selected = dict(noisy_candidates[0][1])
 
             # 🔍 최종 중복 체크 (디버깅)
             if selected['movie_id'] in excluded_set:
@@ -1153,12 +1304,80 @@ class HybridRecommender:
             # top_candidates가 비어있음
             elapsed = time.time() - start_time
             print(f"❌ No candidates after scoring")
-            print(f"   - Runtime filtered: {len(runtime_filtered)}")
+            print(f"   - Runtime filtered: {pool['runtime_filtered']}")
             print(f"   - Excluded: {len(all_exclude)}")
             print(f"   - Hint: All runtime-matching movies might be excluded already")
             print(f"Elapsed: {elapsed:.2f}s")
             return None
 
+    def warm_up(self, iterations: int = 1) -> Dict[str, float]:
+        """
+        트래픽을 받기 전 워밍업
+
+        - 대형 행렬 전체를 한 번씩 읽어 페이지 폴트를 미리 발생 (mmap 스냅샷 포함)
+        - 합성 요청으로 recommend / recommend_single의 모든 경로 실행
+          (Track A/B, 필터 완화, 부정 피드백 페널티, 런타임 Fallback, 빈 프로필)
+          → BLAS 스레드 풀 / 첫 호출 할당 비용을 실제 요청 전에 소모
+        - 후보 풀 캐시는 사용하지 않음 (합성 요청으로 캐시를 채우지 않도록, use_cache=False)
+          → 백그라운드 스레드에서 실제 요청과 동시에 실행되므로 공유 상태(pool_cache, 전역 stdout)는 건드리지 않음
+
+        Returns:
+            단계별 소요 시간 (초)
+        """
+        timings = {}
+
+        # 1. 행렬 페이지 터치
+        phase_start = time.time()
+        checksum = 0.0
+        for matrix in (self.sbert_embeddings, self.als_item_factors, self.target_sbert_matrix,
+                       self.target_sbert_norm, self.target_als_matrix):
+            checksum += float(np.sum(matrix))
+        timings['touch_matrices'] = round(time.time() - phase_start, 3)
+
+        # 2. 합성 요청
+        genres = sorted(self.movies_by_genre, key=lambda g: len(self.movies_by_genre[g]), reverse=True)
+        otts = sorted(self.movies_by_ott, key=lambda o: len(self.movies_by_ott[o]), reverse=True)
+        popular_ids = sorted(self.common_movie_ids, key=lambda mid: self.rating_scores.get(mid, 0.0), reverse=True)
+        user_ids = popular_ids[:20]
+        excluded_ids = popular_ids[20:220]
+        negative_ids = popular_ids[220:225]
+
+        recommend_calls = [
+            # 일반 경로: 장르 + OTT 필터, 제외 목록, 부정 피드백
+            dict(user_movie_ids=user_ids, available_time=180, preferred_genres=genres[:2],
+                 preferred_otts=otts[:2], excluded_ids_a=excluded_ids, excluded_ids_b=excluded_ids,
+                 negative_movie_ids=negative_ids),
+            # 필터 완화 경로: 가장 작은 장르 + OTT 하나, 긴 가용 시간
+            dict(user_movie_ids=user_ids, available_time=600, preferred_genres=genres[-1:],
+                 preferred_otts=otts[-1:]),
+            # 빈 프로필 / 필터 없음
+            dict(user_movie_ids=[], available_time=120),
+        ]
+        single_calls = [
+            dict(user_movie_ids=user_ids, target_runtime=120, excluded_ids=excluded_ids, track='a',
+                 preferred_genres=genres[:2], preferred_otts=otts[:2], negative_movie_ids=negative_ids),
+            dict(user_movie_ids=user_ids, target_runtime=120, excluded_ids=excluded_ids, track='b'),
+            # 런타임 Fallback 경로 (짧은 런타임)
+            dict(user_movie_ids=user_ids, target_runtime=45, excluded_ids=[], track='a',
+                 preferred_genres=genres[-1:]),
+        ]
+
+        print(f"[WarmUp] Running {len(recommend_calls) + len(single_calls)} synthetic requests x {iterations}")
+        phase_start = time.time()
+        for _ in range(iterations):
+            for kwargs in recommend_calls:
+                self.recommend(**kwargs, use_cache=False)
+        timings['recommend'] = round(time.time() - phase_start, 3)
+
+        phase_start = time.time()
+        for _ in range(iterations):
+            for kwargs in single_calls:
+                self.recommend_single(**kwargs, use_cache=False)
+        timings['recommend_single'] = round(time.time() - phase_start, 3)
+
+        print(f"Warm-up complete: {timings} (checksum={checksum:.1f})")
+        return timings
+
     def close(self):
         """리소스 정리"""
-        self.db.close()
+        self.data_source.close()
@@ -0,0 +1,44 @@
+"""
+orjson 기반 JSON 응답 (numpy 스칼라 / 배열 직접 직렬화)
+
+추천 결과는 numpy.float32 점수, numpy.int64 ID 등이 섞인 중첩 dict
+→ 이전에는 convert_numpy_types()로 전체를 재귀 복사한 뒤 Pydantic 모델로 다시 검증
+→ FastJSONResponse는 orjson(OPT_SERIALIZE_NUMPY)이 numpy 타입을 그대로 인코딩, 복사 / 재검증 없음
+
+orjson 미설치 시 json.dumps + numpy default로 같은 결과 (느리지만 동작)
+측정: python -m benchmarks.serialization_bench
+"""
+import json
+from typing import Any
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY if orjson is not None else 0
+
+
+def _default(obj: Any) -> Any:
+    """orjson이 직접 처리하지 못하는 numpy 값 (비연속 배열, object dtype 등)"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """numpy 값이 섞인 dict를 그대로 받는 JSON 응답 (response_model 검증 생략용)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,158 @@
+"""
+요청 단위 샘플링 프로파일러 (디버그 전용)
+
+- 게이트웨이가 X-Profile-Request-Id + X-Profile-Secret(PROFILING_SECRET) 헤더를 붙인 요청만 프로파일링
+  (PROFILING_ENABLED=true + PROFILING_SECRET 설정 시에만, 기본 비활성 → AI 포트에 직접 접근해도 프로파일링 / 조회 불가)
+- 헤더가 없는 요청은 nullcontext만 거치므로 오버헤드 없음
+- 결과(collapsed stack + 함수별 통계)는 메모리 링 버퍼에 보관, request_id로 조회
+"""
+import hmac
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, List, Optional
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_SECRET = os.getenv("PROFILING_SECRET", "")  # 게이트웨이 AI_PROFILING_SECRET과 같은 값
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", "50"))
+
+
+class SamplingProfiler:
+    """대상 스레드의 콜 스택을 일정 간격으로 샘플링"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005, max_depth: int = 64):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.started_at = None
+        self.duration = 0.0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.time() - self.started_at
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+
+            # 루트 → 리프 순서 (flamegraph collapsed 포맷)
+            self.samples[";".join(reversed(stack))] += 1
+            self.sample_count += 1
+
+    def collapsed(self) -> str:
+        """flamegraph.pl / speedscope 호환 collapsed stack 텍스트"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+    def top_functions(self, limit: int = 30) -> List[Dict[str, Any]]:
+        """함수별 self / total 샘플 수"""
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+
+        for stack, count in self.samples.items():
+            frames = stack.split(";")
+            self_counts[frames[-1]] += count
+            for name in set(frames):
+                total_counts[name] += count
+
+        total = max(self.sample_count, 1)
+        return [
+            {
+                "function": name,
+                "self_samples": self_counts[name],
+                "total_samples": count,
+                "self_pct": round(self_counts[name] * 100 / total, 1),
+                "total_pct": round(count * 100 / total, 1),
+            }
+            for name, count in total_counts.most_common(limit)
+        ]
+
+    def report(self, request_id: str, label: str) -> Dict[str, Any]:
+        return {
+            "request_id": request_id,
+            "label": label,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 2),
+            "interval_ms": self.interval * 1000,
+            "sample_count": self.sample_count,
+            "top_functions": self.top_functions(),
+            "collapsed": self.collapsed(),
+        }
+
+
+class ProfileStore:
+    """최근 프로파일 결과를 보관하는 고정 크기 링 버퍼"""
+
+    def __init__(self, max_entries: int = 50):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, request_id: str, report: Dict[str, Any]):
+        with self._lock:
+            self._entries[request_id] = report
+            self._entries.move_to_end(request_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._entries.get(request_id)
+
+
+profile_store = ProfileStore(max_entries=PROFILE_BUFFER_SIZE)
+
+
+@contextmanager
+def _profiled(request_id: str, label: str):
+    profiler = SamplingProfiler(threading.get_ident(), interval=PROFILE_INTERVAL_MS / 1000)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        profile_store.put(request_id, profiler.report(request_id, label))
+        print(f"[Profile] {label} request_id={request_id}: {profiler.sample_count} samples, {profiler.duration * 1000:.1f}ms")
+
+
+def is_authorized(secret: Optional[str]) -> bool:
+    """게이트웨이 공유 비밀 확인 (PROFILING_ENABLED + PROFILING_SECRET 설정 시에만 True)"""
+    if not PROFILING_ENABLED or not PROFILING_SECRET or not secret:
+        return False
+    return hmac.compare_digest(secret.encode(), PROFILING_SECRET.encode())
+
+
+def profile_request(request_id: Optional[str], label: str, secret: Optional[str] = None):
+    """
+    request_id가 있고 공유 비밀이 맞을 때만 현재 스레드를 프로파일링하는 컨텍스트 매니저
+
+    Args:
+        request_id: 게이트웨이가 발급한 프로파일 ID (X-Profile-Request-Id)
+        label: 프로파일 라벨 (엔드포인트 경로 등)
+        secret: 게이트웨이 공유 비밀 (X-Profile-Secret) - 틀리면 프로파일링 없이 처리
+    """
+    if not request_id or not is_authorized(secret):
+        return nullcontext()
+    return _profiled(request_id, label)
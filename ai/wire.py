@@ -0,0 +1,84 @@
+"""
+게이트웨이 ↔ AI 서비스 compact 전송 형식 (msgpack)
+
+요청에 Accept: application/x-msgpack 이 있으면 영화 표시용 필드(제목, 줄거리, 포스터 등) 없이
+[movie_id, score, runtime, recommendation_type] 배열만 msgpack으로 반환
+(/recommend_single은 JSON 응답과 같은 모양이 되도록 fallback_level / fallback_info를 함께 전달)
+→ 표시용 필드는 게이트웨이가 자체 영화 카탈로그 캐시로 채움 (backend/domains/b2b/wire.py)
+→ 응답 크기와 JSON 직렬화 비용 제거
+
+msgpack 미설치 시 wants_compact()가 False → 기존 JSON 응답
+
+Accept: application/x-ndjson 이면 /recommend를 NDJSON 스트리밍으로 반환 (한 줄에 프레임 하나)
+  {"type": "track", "track": "track_a", "data": {...}}  ← Track A 조합이 정해지는 즉시
+  {"type": "track", "track": "track_b", "data": {...}}
+  {"type": "meta", "elapsed_time": ..., "reserve": ...}  ← 마지막 프레임
+  {"type": "error", "message": ...}                      ← 도중 실패 시 (meta 대신)
+"""
+from typing import Any, Dict, List, Optional
+
+from json_response import _default, dumps
+
+try:
+    import msgpack
+except ImportError:  # 선택 의존성
+    msgpack = None
+
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# compact 영화 항목의 필드 순서 (응답의 "fields"로도 전달)
+COMPACT_FIELDS = ["movie_id", "score", "runtime", "recommendation_type"]
+
+# recommend_single 결과에만 있는 필드 (영화 항목과 별도로 전달)
+SINGLE_EXTRA_FIELDS = ["fallback_level", "fallback_info"]
+
+
+def wants_compact(accept: Optional[str]) -> bool:
+    return msgpack is not None and bool(accept) and MSGPACK_MEDIA_TYPE in accept
+
+
+def wants_stream(accept: Optional[str]) -> bool:
+    return bool(accept) and NDJSON_MEDIA_TYPE in accept
+
+
+def ndjson(frame: Dict[str, Any]) -> bytes:
+    """NDJSON 한 줄 (numpy 값은 orjson이 직접 인코딩)"""
+    return dumps(frame) + b"\n"
+
+
+def compact_movie(movie: Dict[str, Any]) -> List[Any]:
+    return [movie["movie_id"], movie.get("score"), movie.get("runtime", 0), movie.get("recommendation_type")]
+
+
+def compact_movies(movies: List[Dict[str, Any]]) -> List[List[Any]]:
+    return [compact_movie(movie) for movie in movies]
+
+
+def compact_recommend(result: Dict[str, Any]) -> Dict[str, Any]:
+    """recommender.recommend() 결과 → compact 응답"""
+    body = {
+        "fields": COMPACT_FIELDS,
+        "elapsed_time": result.get("elapsed_time", 0),
+    }
+    for track in ("track_a", "track_b"):
+        body[track] = {
+            "label": result[track]["label"],
+            "movies": compact_movies(result[track]["movies"]),
+            "total_runtime": result[track]["total_runtime"],
+        }
+    if result.get("reserve") is not None:
+        body["reserve"] = {track: compact_movies(movies) for track, movies in result["reserve"].items()}
+    return body
+
+
+def compact_single(movie: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """recommender.recommend_single() 결과 → compact 응답 (없으면 movie: None)"""
+    body = {"fields": COMPACT_FIELDS, "movie": compact_movie(movie) if movie else None}
+    if movie:
+        body.update({field: movie[field] for field in SINGLE_EXTRA_FIELDS if field in movie})
+    return body
+
+
+def pack(body: Any) -> bytes:
+    return msgpack.packb(body, default=_default, use_bin_type=True)
@@ -3,6 +3,8 @@
 import os
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from sqlalchemy.orm import DeclarativeBase
@@ -56,6 +58,65 @@ def get_db():
         db.close()
 
 
+# ======================================================
+# 비동기 엔진 (asyncpg) - async 엔드포인트용
+# ======================================================
+# async def 엔드포인트에서 동기 Session을 쓰면 이벤트 루프가 DB I/O 동안 멈춤
+# → 추천 / External API 경로는 AsyncSession 사용
+# DATABASE_URL에서 드라이버만 asyncpg로 바꿔 사용 (ASYNC_DATABASE_URL로 직접 지정 가능)
+# PostgreSQL이 아닌 DATABASE_URL(테스트용 sqlite 등)은 비동기 엔진을 만들지 않음 → async 경로 사용 시 RuntimeError
+def _to_async_url(url: str) -> str:
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "postgresql":
+        return ""
+    query = dict(parsed.query)
+    # libpq 전용 옵션 → asyncpg 옵션
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return parsed.set(drivername="postgresql+asyncpg", query=query).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "") or _to_async_url(DATABASE_URL)
+
+async_engine = None
+AsyncSessionLocal = None
+
+if ASYNC_DATABASE_URL:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        echo=False,
+        pool_size=int(os.getenv("ASYNC_DB_POOL_SIZE", "20")),
+        max_overflow=int(os.getenv("ASYNC_DB_MAX_OVERFLOW", "20")),
+        pool_pre_ping=True,
+        connect_args={
+            "server_settings": {"search_path": "public,b2c,b2b"}
+        }
+    )
+
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False,  # 커밋 후에도 ORM 객체 속성 접근 가능 (lazy load 불가)
+    )
+else:
+    print(f"[DB] Async engine disabled: DATABASE_URL is not PostgreSQL ({make_url(DATABASE_URL).get_backend_name()})")
+
+
+def async_session():
+    """AsyncSession 생성 (비동기 엔진이 없으면 RuntimeError)"""
+    if AsyncSessionLocal is None:
+        raise RuntimeError(
+            "비동기 DB 엔진이 없습니다. DATABASE_URL이 PostgreSQL이 아니면 "
+            "ASYNC_DATABASE_URL(postgresql+asyncpg://...)을 지정하세요."
+        )
+    return AsyncSessionLocal()
+
+
+async def get_async_db():
+    async with async_session() as db:
+        yield db
+
+
 # ======================================================
 # 초기 DB 테이블 생성 함수
 # ======================================================
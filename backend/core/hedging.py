@@ -0,0 +1,104 @@
+"""
+Hedged request 정책 (꼬리 지연 완화)
+
+첫 시도가 관측된 p95(quantile) 안에 응답하지 않으면 다른 복제본에 같은 요청을 한 번 더 보내고
+먼저 성공한 응답을 사용, 나머지는 취소 (GC 일시 정지 / BLAS 경합 등 일시적인 느린 복제본 회피)
+
+- 지연 기준: 경로별 최근 window건 성공 응답 시간의 quantile (min_delay_ms ~ max_delay_ms로 제한)
+  표본이 min_samples건 미만이면 hedge하지 않음
+- 예산: 요청마다 budget_ratio 토큰 적립, hedge 1건에 1토큰 (최대 burst 토큰)
+  → 전체 hedge는 요청 수의 budget_ratio(기본 5%) 이하, 장애로 모든 요청이 느려져도 부하가 배로 늘지 않음
+- stats(): 요청 / hedge / hedge 승리 / 예산 부족 건수, 경로별 현재 지연 기준 (/metrics/ai-pool)
+
+멱등한 읽기 요청(추천 조회)에만 사용
+"""
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+from backend.core.replica_pool import percentile
+
+
+class HedgePolicy:
+    def __init__(
+        self,
+        name: str,
+        budget_ratio: float = 0.05,
+        quantile: float = 0.95,
+        min_delay_ms: float = 20.0,
+        max_delay_ms: float = 5000.0,
+        window: int = 500,
+        min_samples: int = 50,
+        burst: float = 10.0
+    ):
+        self.name = name
+        self.budget_ratio = budget_ratio
+        self.quantile = quantile
+        self.min_delay_ms = min_delay_ms
+        self.max_delay_ms = max_delay_ms
+        self.window = window
+        self.min_samples = min_samples
+        self.burst = burst
+
+        self._latencies: Dict[str, deque] = {}
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0  # hedge가 먼저 성공한 건수
+        self.budget_exhausted = 0
+
+    def record_latency(self, key: str, elapsed_ms: float):
+        """성공 응답 시간 기록 (지연 기준 계산용)"""
+        with self._lock:
+            samples = self._latencies.get(key)
+            if samples is None:
+                samples = self._latencies[key] = deque(maxlen=self.window)
+            samples.append(elapsed_ms)
+
+    def delay(self, key: str) -> Optional[float]:
+        """hedge까지 기다릴 시간 (초), 표본 부족이면 None"""
+        with self._lock:
+            samples = self._latencies.get(key)
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            threshold = percentile(samples, self.quantile)
+        return min(self.max_delay_ms, max(self.min_delay_ms, threshold)) / 1000
+
+    def on_request(self):
+        """요청 1건 - 예산 토큰 적립"""
+        with self._lock:
+            self.requests += 1
+            self._tokens = min(self.burst, self._tokens + self.budget_ratio)
+
+    def try_acquire(self) -> bool:
+        """hedge 1건 예산 사용 (부족하면 False)"""
+        with self._lock:
+            if self._tokens < 1:
+                self.budget_exhausted += 1
+                return False
+            self._tokens -= 1
+            self.hedges += 1
+            return True
+
+    def record_win(self, hedged: bool):
+        if hedged:
+            with self._lock:
+                self.hedge_wins += 1
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_rate": round(self.hedges / self.requests, 4) if self.requests else None,
+            "hedge_wins": self.hedge_wins,
+            "win_rate": round(self.hedge_wins / self.hedges, 3) if self.hedges else None,
+            "budget_exhausted": self.budget_exhausted,
+            "budget_ratio": self.budget_ratio,
+            "delay_ms": {
+                key: round(delay * 1000, 1)
+                for key in list(self._latencies)
+                if (delay := self.delay(key)) is not None
+            },
+        }
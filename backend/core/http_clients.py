@@ -0,0 +1,188 @@
+"""
+서비스 간 HTTP 클라이언트 레지스트리 (앱 수명 동안 재사용)
+- 업스트림별 httpx 클라이언트 1개 (keep-alive 커넥션 풀 공유)
+- 업스트림별 타임아웃 (connect / read / write / pool 분리)
+- HTTP2_ENABLED=true면 HTTP/2 사용 (h2 패키지 필요, 없으면 HTTP/1.1)
+- 앱 종료 시 close_all() (main.py lifespan)
+- stats(): 풀 사용률 (활성/유휴 커넥션, 요청 수, 에러 수)
+
+사용:
+    client = http_clients.get_async("ai")
+    response = await client.post(f"{AI_SERVICE_URL}/recommend", json=payload)
+"""
+import os
+import threading
+from typing import Dict
+
+import httpx
+
+# 커넥션 풀 (업스트림별)
+HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100"))
+HTTP_POOL_MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
+
+
+def _timeout(prefix: str, connect: float, read: float, pool: float) -> httpx.Timeout:
+    """{prefix}_CONNECT_TIMEOUT / _READ_TIMEOUT / _POOL_TIMEOUT 환경변수로 덮어쓰기 가능"""
+    read = float(os.getenv(f"{prefix}_READ_TIMEOUT", str(read)))
+    return httpx.Timeout(
+        connect=float(os.getenv(f"{prefix}_CONNECT_TIMEOUT", str(connect))),
+        read=read,
+        write=read,
+        pool=float(os.getenv(f"{prefix}_POOL_TIMEOUT", str(pool))),
+    )
+
+
+# 업스트림별 타임아웃
+UPSTREAM_TIMEOUTS = {
+    "ai": _timeout("AI_HTTP", connect=2.0, read=30.0, pool=5.0),  # AI 서비스 (/recommend 등)
+    "b2b_api": _timeout("B2B_HTTP", connect=2.0, read=30.0, pool=5.0),  # B2C → /v1 (B2C_TRANSPORT=http)
+    "oauth": _timeout("OAUTH_HTTP", connect=5.0, read=10.0, pool=5.0),  # Google / GitHub OAuth
+}
+
+
+def _http2_available() -> bool:
+    if not HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        print("[HttpClients] HTTP2_ENABLED=true but 'h2' is not installed - using HTTP/1.1")
+        return False
+
+
+class _UpstreamStats:
+    """업스트림별 요청 카운터 (event hook으로 갱신)"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0  # 5xx 응답 (연결 실패는 호출자 예외로 처리)
+        self._lock = threading.Lock()
+
+    def on_request(self, request=None):
+        with self._lock:
+            self.requests += 1
+
+    def on_response(self, response):
+        if response.status_code >= 500:
+            with self._lock:
+                self.errors += 1
+
+
+class HttpClientRegistry:
+    """업스트림 이름 → 공유 httpx 클라이언트 (동기 / 비동기 각각 지연 생성)"""
+
+    def __init__(self):
+        self.limits = httpx.Limits(
+            max_connections=HTTP_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        )
+        self.http2 = _http2_available()
+        self._async: Dict[str, httpx.AsyncClient] = {}
+        self._sync: Dict[str, httpx.Client] = {}
+        self._stats: Dict[str, _UpstreamStats] = {}
+        self._lock = threading.Lock()
+
+    def _upstream_stats(self, name: str) -> _UpstreamStats:
+        if name not in self._stats:
+            self._stats[name] = _UpstreamStats()
+        return self._stats[name]
+
+    def _timeout(self, name: str) -> httpx.Timeout:
+        return UPSTREAM_TIMEOUTS.get(name, httpx.Timeout(10.0, connect=5.0))
+
+    def get_async(self, name: str) -> httpx.AsyncClient:
+        client = self._async.get(name)
+        if client is not None and not client.is_closed:
+            return client
+
+        with self._lock:
+            client = self._async.get(name)
+            if client is None or client.is_closed:
+                stats = self._upstream_stats(name)
+
+                async def on_request(request):
+                    stats.on_request(request)
+
+                async def on_response(response):
+                    stats.on_response(response)
+
+                client = httpx.AsyncClient(
+                    timeout=self._timeout(name),
+                    limits=self.limits,
+                    http2=self.http2,
+                    event_hooks={"request": [on_request], "response": [on_response]},
+                )
+                self._async[name] = client
+            return client
+
+    def get_sync(self, name: str) -> httpx.Client:
+        client = self._sync.get(name)
+        if client is not None and not client.is_closed:
+            return client
+
+        with self._lock:
+            client = self._sync.get(name)
+            if client is None or client.is_closed:
+                stats = self._upstream_stats(name)
+                client = httpx.Client(
+                    timeout=self._timeout(name),
+                    limits=self.limits,
+                    http2=self.http2,
+                    event_hooks={"request": [stats.on_request], "response": [stats.on_response]},
+                )
+                self._sync[name] = client
+            return client
+
+    async def close_all(self):
+        """앱 종료 시 모든 커넥션 정리"""
+        with self._lock:
+            async_clients, self._async = list(self._async.values()), {}
+            sync_clients, self._sync = list(self._sync.values()), {}
+        for client in async_clients:
+            await client.aclose()
+        for client in sync_clients:
+            client.close()
+
+    @staticmethod
+    def _pool_stats(client) -> dict:
+        """httpcore 커넥션 풀 상태 (활성 = 요청 처리 중, 유휴 = keep-alive 대기)"""
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        idle = sum(1 for conn in connections if conn.is_idle())
+        return {
+            "connections": len(connections),
+            "active": len(connections) - idle,
+            "idle": idle,
+        }
+
+    def stats(self) -> dict:
+        """업스트림별 풀 사용률 + 요청 카운터"""
+        result = {}
+        for name, stats in list(self._stats.items()):
+            pools = {}
+            for kind, clients in (("async", self._async), ("sync", self._sync)):
+                client = clients.get(name)
+                if client is not None and not client.is_closed:
+                    pool = self._pool_stats(client)
+                    pool["utilization"] = round(pool["active"] / self.limits.max_connections, 3)
+                    pools[kind] = pool
+            result[name] = {
+                "requests": stats.requests,
+                "server_errors": stats.errors,
+                "pools": pools,
+            }
+        return {
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "upstreams": result,
+        }
+
+
+# 싱글톤
+http_clients = HttpClientRegistry()
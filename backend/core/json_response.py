@@ -0,0 +1,52 @@
+"""
+orjson 기반 JSON 응답
+
+- 핫 엔드포인트(/api/v2/recommend, /v1/recommend, /v1/recommend_single)는 AI 서비스 응답 dict를
+  response_model로 다시 검증하지 않고 FastJSONResponse로 바로 반환 (스키마는 문서용으로만 유지)
+- 앱 기본 응답 클래스로도 사용 (jsonable_encoder 이후 렌더링만 orjson)
+- numpy 스칼라 / 배열은 OPT_SERIALIZE_NUMPY로 직접 인코딩 (backend에는 numpy 의존성 없음)
+- orjson 미설치 시 json.dumps로 같은 결과
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY if orjson is not None else 0
+
+
+def _default(obj: Any) -> Any:
+    """DB / numpy 값 중 orjson(또는 json)이 직접 처리하지 못하는 타입"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    # numpy 스칼라 / 배열 (import 없이 판별)
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """검증 없이 dict를 바로 직렬화하는 JSON 응답"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
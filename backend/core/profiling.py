@@ -0,0 +1,111 @@
+"""
+요청 단위 프로파일링 모듈 (External API 디버그용)
+- 어드민 API Key + X-Debug-Profile 헤더가 있는 요청만 샘플링
+- 게이트웨이 구간 프로파일은 여기 링 버퍼에, AI 구간은 AI 서비스 링 버퍼에 저장
+- AI 서비스 프로파일링 / 조회는 AI_PROFILING_SECRET(AI 서비스 PROFILING_SECRET과 같은 값)을 X-Profile-Secret으로 전달
+- 헤더가 없는 요청은 아무 작업도 하지 않음
+"""
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Optional
+
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", "50"))
+AI_PROFILING_SECRET = os.getenv("AI_PROFILING_SECRET", "")
+
+
+def new_profile_request_id() -> str:
+    """프로파일 조회용 request_id 발급"""
+    return uuid.uuid4().hex
+
+
+def ai_profile_headers(profile_id: Optional[str] = None) -> dict:
+    """AI 서비스 프로파일링 / 프로파일 조회 헤더 (공유 비밀 + 프로파일 ID)"""
+    headers = {"X-Profile-Secret": AI_PROFILING_SECRET}
+    if profile_id:
+        headers["X-Profile-Request-Id"] = profile_id
+    return headers
+
+
+class SamplingProfiler:
+    """
+    특정 스레드의 스택 샘플러
+
+    async 엔드포인트에서는 이벤트 루프 스레드를 샘플링하므로
+    같은 시간에 처리 중인 다른 코루틴 스택이 섞일 수 있음
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval_ms / 1000
+        self.samples = Counter()
+        self.sample_count = 0
+        self._started_at = 0.0
+        self._elapsed = 0.0
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._loop, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._started_at = time.time()
+        self._sampler.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+        self._elapsed = time.time() - self._started_at
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None and len(names) < 64:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.samples[";".join(reversed(names))] += 1
+                self.sample_count += 1
+
+    def report(self, request_id: str, label: str) -> dict:
+        leaf_counts = Counter()
+        for stack, count in self.samples.items():
+            leaf_counts[stack.rsplit(";", 1)[-1]] += count
+
+        return {
+            "request_id": request_id,
+            "label": label,
+            "duration_ms": round(self._elapsed * 1000, 2),
+            "sample_count": self.sample_count,
+            "top_functions": [
+                {"function": name, "self_samples": count}
+                for name, count in leaf_counts.most_common(30)
+            ],
+            "collapsed": "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()),
+        }
+
+
+class ProfileRingBuffer:
+    """최근 N개 프로파일 결과 보관 (가장 오래된 항목부터 제거)"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, request_id: str, report: dict):
+        with self._lock:
+            self._items[request_id] = report
+            if len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def get(self, request_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._items.get(request_id)
+
+
+profile_buffer = ProfileRingBuffer(PROFILE_BUFFER_SIZE)
@@ -1,15 +1,60 @@
 """
 Rate Limiting 모듈 (Redis 기반)
-- 일일 API 호출 제한
+- 일일 API 호출 제한 (플랜별 PLAN_LIMITS)
+- 초당 burst 제한 (플랜별 PLAN_BURST_LIMITS)
 - API Key별 사용량 추적
+
+hit()은 서버 측 Lua 스크립트 1회 호출로 burst / 일일 한도 확인 + 증가 + 만료 설정
+→ Redis 왕복 1회, INCR 후 EXPIRE 전에 죽어 만료 없는 키가 남는 경우 없음
+→ 남은 호출 수 / 초기화 시각을 함께 반환 (meta.remaining_quota, X-RateLimit-* 헤더)
+
+한도 초과 호출은 카운트하지 않음 (burst 초과 시 일일 한도도 차감하지 않음)
+
+배치 요청(/v1/recommend/batch)은 cost=항목 수로 한 번에 차감
+→ 남은 한도만큼만 부분 허용 (granted), burst는 HTTP 요청 1건으로 계산
 """
 import redis.asyncio as aioredis
-from datetime import date
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Optional
+import math
 import os
+import time
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 redis_client = None
 
+# KEYS[1]: 일일 카운터, KEYS[2]: 초당 burst 카운터 (burst 제한 없으면 "")
+# ARGV: 일일 한도, 일일 만료 시각(epoch), burst 한도 (0이면 제한 없음), 차감 건수
+# 반환: {허용 여부, 거부 사유(0: 없음, 1: 일일, 2: burst), 일일 카운트, burst 카운트, 허용 건수}
+_HIT_SCRIPT = """
+local daily_limit = tonumber(ARGV[1])
+local burst_limit = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+
+local burst = 0
+if burst_limit > 0 then
+    burst = tonumber(redis.call('GET', KEYS[2]) or '0')
+    if burst >= burst_limit then
+        return {0, 2, tonumber(redis.call('GET', KEYS[1]) or '0'), burst, 0}
+    end
+end
+
+local count = tonumber(redis.call('GET', KEYS[1]) or '0')
+if count >= daily_limit then
+    return {0, 1, count, burst, 0}
+end
+
+local granted = math.min(cost, daily_limit - count)
+count = redis.call('INCRBY', KEYS[1], granted)
+redis.call('EXPIREAT', KEYS[1], ARGV[2])
+if burst_limit > 0 then
+    burst = redis.call('INCR', KEYS[2])
+    redis.call('EXPIRE', KEYS[2], 2)
+end
+return {1, 0, count, burst, granted}
+"""
+_hit_script = None
+
 
 async def get_redis():
     """Redis 클라이언트 반환 (싱글톤)"""
@@ -19,6 +64,104 @@ async def get_redis():
     return redis_client
 
 
+def _daily_key(api_key_id: str) -> str:
+    return f"rate_limit:{api_key_id}:{date.today()}"
+
+
+def _next_midnight() -> int:
+    """일일 카운터 초기화 시각 (epoch초, 서버 로컬 자정)"""
+    return int(datetime.combine(date.today() + timedelta(days=1), dt_time.min).timestamp())
+
+
+class RateLimitResult:
+    """hit() 결과 - 응답 meta / X-RateLimit-* 헤더용"""
+
+    def __init__(
+        self,
+        allowed: bool,
+        limit: int,
+        count: int,
+        reset: int,
+        burst_limit: Optional[int] = None,
+        burst_count: int = 0,
+        exceeded: Optional[str] = None,
+        granted: int = 1
+    ):
+        self.allowed = allowed
+        self.limit = limit
+        self.count = count
+        self.reset = reset
+        self.burst_limit = burst_limit
+        self.burst_count = burst_count
+        self.exceeded = exceeded  # "daily" | "burst" | None
+        self.granted = granted  # 차감된 건수 (배치 요청은 요청 건수보다 적을 수 있음)
+
+    @property
+    def remaining(self) -> int:
+        """이번 호출을 반영한 남은 일일 호출 수"""
+        return max(0, self.limit - self.count)
+
+    @property
+    def retry_after(self) -> int:
+        """거부된 경우 다시 시도할 수 있을 때까지 (초)"""
+        if self.exceeded == "burst":
+            return 1
+        return max(1, self.reset - math.floor(time.time()))
+
+    def headers(self) -> dict:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(self.reset),
+        }
+        if self.burst_limit:
+            headers["X-RateLimit-Burst-Limit"] = str(self.burst_limit)
+            headers["X-RateLimit-Burst-Remaining"] = str(max(0, self.burst_limit - self.burst_count))
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+
+async def hit(
+    api_key_id: str,
+    daily_limit: int,
+    burst_limit: Optional[int] = None,
+    cost: int = 1
+) -> RateLimitResult:
+    """
+    호출 cost건 차감 (burst / 일일 한도 확인, Redis 왕복 1회)
+
+    Args:
+        api_key_id: API 키 ID
+        daily_limit: 일일 허용 호출 수
+        burst_limit: 초당 허용 호출 수 (None이면 burst 제한 없음)
+        cost: 차감 건수 (배치 항목 수) - 남은 한도가 부족하면 남은 만큼만 차감 (result.granted)
+    """
+    global _hit_script
+    redis = await get_redis()
+    if _hit_script is None:
+        # EVALSHA 사용, 스크립트 캐시가 비어 있으면(Redis 재시작) 자동으로 EVAL
+        _hit_script = redis.register_script(_HIT_SCRIPT)
+
+    now = int(time.time())
+    reset = _next_midnight()
+    burst_key = f"rate_burst:{api_key_id}:{now}" if burst_limit else ""
+    allowed, reason, count, burst_count, granted = await _hit_script(
+        keys=[_daily_key(api_key_id), burst_key],
+        args=[daily_limit, reset, burst_limit or 0, cost]
+    )
+    return RateLimitResult(
+        allowed=bool(allowed),
+        limit=daily_limit,
+        count=int(count),
+        reset=reset,
+        burst_limit=burst_limit,
+        burst_count=int(burst_count),
+        exceeded={1: "daily", 2: "burst"}.get(int(reason)),
+        granted=int(granted)
+    )
+
+
 async def check_rate_limit(api_key_id: str, daily_limit: int) -> bool:
     """
     일일 Rate Limit 체크
@@ -31,22 +174,13 @@ async def check_rate_limit(api_key_id: str, daily_limit: int) -> bool:
         True: 호출 가능
         False: 한도 초과
     """
-    redis = await get_redis()
-    key = f"rate_limit:{api_key_id}:{date.today()}"
-
-    count = await redis.incr(key)
-    if count == 1:
-        # 첫 호출 시 24시간 만료 설정
-        await redis.expire(key, 86400)
-
-    return count <= daily_limit
+    return (await hit(api_key_id, daily_limit)).allowed
 
 
 async def get_current_usage(api_key_id: str) -> int:
     """현재 일일 사용량 조회"""
     redis = await get_redis()
-    key = f"rate_limit:{api_key_id}:{date.today()}"
-    count = await redis.get(key)
+    count = await redis.get(_daily_key(api_key_id))
     return int(count) if count else 0
 
 
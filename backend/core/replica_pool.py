@@ -0,0 +1,310 @@
+"""
+업스트림 복제본 풀 (AI 서비스 여러 대 부하 분산)
+
+- 라우팅: 처리 중 요청 수(outstanding)가 가장 적은 복제본 (같으면 무작위)
+- 능동 헬스 체크: 백그라운드 스레드가 probe_interval초마다 GET {url}/health
+  - 응답 200 + ready != false 이면 정상 (모델 로딩 / 워밍업 중인 복제본은 제외)
+  - 연속 unhealthy_threshold회 실패하면 제외, 1회 성공하면 복귀
+- 복제본별 서킷 브레이커
+  - closed: 연속 failure_threshold회 실패(연결 오류 / 타임아웃 / 5xx) → open
+  - open: open_seconds 동안 요청 보내지 않음 (즉시 다른 복제본 / 503)
+  - half_open: open_seconds 경과 후 시험 요청 1건만 허용 → 성공하면 closed, 실패하면 다시 open
+- p99 제외: 최근 latency_window건의 p99가 eject_p99_ms를 넘으면 eject_seconds 동안 제외
+  (표본 min_samples건 이상일 때만, 마지막 남은 복제본은 제외하지 않음)
+- 선택 가능한 복제본이 없으면 브레이커가 open이 아닌 복제본으로 대체 (헬스 / p99 무시),
+  그것도 없으면 None → 호출자가 즉시 503
+- stats(): 복제본별 상태 (/metrics/ai-pool)
+
+사용:
+    replica = ai_pool.choose()
+    replica_start = ai_pool.begin(replica)
+    ok = False
+    try:
+        response = await client.post(f"{replica.url}/recommend", json=payload)
+        ok = response.status_code < 500
+    finally:
+        ai_pool.complete(replica, replica_start, ok)
+"""
+import math
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, List, Optional
+
+import httpx
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def percentile(values, q: float) -> Optional[float]:
+    """q(0~1) 분위수 (nearest-rank), 값이 없으면 None"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Replica:
+    """복제본 1대의 상태 (ReplicaPool의 lock으로 보호)"""
+
+    def __init__(self, url: str, latency_window: int):
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+
+        # 헬스 체크
+        self.healthy = True  # 첫 probe 전에는 정상으로 간주
+        self.probe_failures = 0
+        self.last_probe_error: Optional[str] = None
+
+        # 서킷 브레이커
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+
+        # p99 제외
+        self.latencies_ms: deque = deque(maxlen=latency_window)
+        self.ejected_until = 0.0
+
+        self.requests = 0
+        self.failures = 0
+        self.ejections = 0
+        self.breaker_opens = 0
+
+    def snapshot(self, now: float) -> dict:
+        return {
+            "url": self.url,
+            "outstanding": self.outstanding,
+            "healthy": self.healthy,
+            "breaker": self.state,
+            "ejected": self.ejected_until > now,
+            "p99_ms": percentile(self.latencies_ms, 0.99),
+            "samples": len(self.latencies_ms),
+            "requests": self.requests,
+            "failures": self.failures,
+            "breaker_opens": self.breaker_opens,
+            "ejections": self.ejections,
+            "last_probe_error": self.last_probe_error,
+        }
+
+
+class ReplicaPool:
+    def __init__(
+        self,
+        name: str,
+        urls: List[str],
+        health_path: str = "/health",
+        probe_interval: float = 5.0,
+        probe_timeout: float = 2.0,
+        unhealthy_threshold: int = 2,
+        failure_threshold: int = 5,
+        open_seconds: float = 10.0,
+        latency_window: int = 200,
+        min_samples: int = 50,
+        eject_p99_ms: Optional[float] = None,
+        eject_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            urls: 복제본 base URL 목록 (1개 이상)
+            eject_p99_ms: p99 제외 기준 (None이면 p99 제외 없음)
+        """
+        if not urls:
+            raise ValueError("ReplicaPool requires at least one url")
+
+        self.name = name
+        self.replicas = [Replica(url, latency_window) for url in urls]
+        self.health_path = health_path
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.unhealthy_threshold = unhealthy_threshold
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.min_samples = min_samples
+        self.eject_p99_ms = eject_p99_ms
+        self.eject_seconds = eject_seconds
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._prober: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+        self.no_replica = 0  # 선택 가능한 복제본이 없어 거절한 요청 수
+
+    # ==================== 선택 ====================
+
+    def _breaker_allows(self, replica: Replica, now: float) -> bool:
+        """lock 보유 상태에서 호출 - open 시간이 지났으면 half_open으로 전환"""
+        if replica.state == OPEN and now - replica.opened_at >= self.open_seconds:
+            replica.state = HALF_OPEN
+            replica.trial_in_flight = False
+        if replica.state == OPEN:
+            return False
+        if replica.state == HALF_OPEN:
+            return not replica.trial_in_flight
+        return True
+
+    @staticmethod
+    def _least_outstanding(candidates: List[Replica]) -> Replica:
+        fewest = min(r.outstanding for r in candidates)
+        return random.choice([r for r in candidates if r.outstanding == fewest])
+
+    def choose(self, exclude: Optional[List[Replica]] = None) -> Optional[Replica]:
+        """요청을 보낼 복제본 (없으면 None)"""
+        self._ensure_prober()
+        now = self._clock()
+        with self._lock:
+            allowed = [
+                r for r in self.replicas
+                if (not exclude or r not in exclude) and self._breaker_allows(r, now)
+            ]
+            available = [r for r in allowed if r.healthy and r.ejected_until <= now]
+            candidates = available or allowed
+            if not candidates:
+                self.no_replica += 1
+                return None
+            return self._least_outstanding(candidates)
+
+    def begin(self, replica: Replica) -> float:
+        """요청 시작 - complete()에 넘길 시작 시각 반환"""
+        with self._lock:
+            replica.outstanding += 1
+            replica.requests += 1
+            if replica.state == HALF_OPEN:
+                replica.trial_in_flight = True
+        return self._clock()
+
+    def complete(self, replica: Replica, started: float, ok: bool):
+        """요청 종료 - 브레이커 / 지연 시간 갱신"""
+        elapsed_ms = (self._clock() - started) * 1000
+        with self._lock:
+            replica.outstanding = max(0, replica.outstanding - 1)
+            if ok:
+                replica.latencies_ms.append(elapsed_ms)
+                replica.consecutive_failures = 0
+                if replica.state == HALF_OPEN:
+                    print(f"[ReplicaPool:{self.name}] {replica.url} recovered (breaker closed)")
+                replica.state = CLOSED
+                replica.trial_in_flight = False
+                return
+
+            replica.failures += 1
+            replica.consecutive_failures += 1
+            if replica.state == HALF_OPEN or replica.consecutive_failures >= self.failure_threshold:
+                self._open(replica)
+
+    def cancel(self, replica: Replica):
+        """요청 취소 (hedge에서 진 시도) - 브레이커 / 지연 시간에 반영하지 않음"""
+        with self._lock:
+            replica.outstanding = max(0, replica.outstanding - 1)
+            replica.trial_in_flight = False
+
+    def _open(self, replica: Replica):
+        """lock 보유 상태에서 호출"""
+        if replica.state != OPEN:
+            replica.breaker_opens += 1
+            print(f"[ReplicaPool:{self.name}] {replica.url} breaker open "
+                  f"({replica.consecutive_failures} consecutive failures)")
+        replica.state = OPEN
+        replica.opened_at = self._clock()
+        replica.trial_in_flight = False
+
+    # ==================== p99 제외 ====================
+
+    def evaluate_latency(self):
+        """p99 기준 초과 복제본 제외 / 기간이 끝난 복제본 복귀 (probe 주기마다)"""
+        if self.eject_p99_ms is None:
+            return
+        now = self._clock()
+        with self._lock:
+            for replica in self.replicas:
+                if replica.ejected_until and replica.ejected_until <= now:
+                    # 복귀 - 제외 전 표본으로 다시 제외되지 않게 비움
+                    replica.ejected_until = 0.0
+                    replica.latencies_ms.clear()
+
+            for replica in self.replicas:
+                if replica.ejected_until > now or len(replica.latencies_ms) < self.min_samples:
+                    continue
+                p99 = percentile(replica.latencies_ms, 0.99)
+                if p99 <= self.eject_p99_ms:
+                    continue
+                remaining = [
+                    r for r in self.replicas
+                    if r is not replica and r.ejected_until <= now and r.healthy and r.state != OPEN
+                ]
+                if not remaining:
+                    continue  # 마지막 남은 복제본은 제외하지 않음
+                replica.ejected_until = now + self.eject_seconds
+                replica.ejections += 1
+                print(f"[ReplicaPool:{self.name}] {replica.url} ejected for {self.eject_seconds}s "
+                      f"(p99 {p99:.0f}ms > {self.eject_p99_ms:.0f}ms)")
+
+    # ==================== 헬스 체크 ====================
+
+    def record_probe(self, replica: Replica, ok: bool, error: Optional[str] = None):
+        with self._lock:
+            if ok:
+                if not replica.healthy:
+                    print(f"[ReplicaPool:{self.name}] {replica.url} healthy")
+                replica.healthy = True
+                replica.probe_failures = 0
+                replica.last_probe_error = None
+                return
+
+            replica.probe_failures += 1
+            replica.last_probe_error = error
+            if replica.healthy and replica.probe_failures >= self.unhealthy_threshold:
+                replica.healthy = False
+                print(f"[ReplicaPool:{self.name}] {replica.url} unhealthy: {error}")
+
+    def probe_all(self, client: httpx.Client):
+        for replica in self.replicas:
+            try:
+                response = client.get(f"{replica.url}{self.health_path}", timeout=self.probe_timeout)
+                if response.status_code != 200:
+                    self.record_probe(replica, False, f"HTTP {response.status_code}")
+                elif response.json().get("ready") is False:
+                    self.record_probe(replica, False, "not ready")
+                else:
+                    self.record_probe(replica, True)
+            except (httpx.HTTPError, ValueError) as e:
+                self.record_probe(replica, False, type(e).__name__)
+
+    def _run_prober(self):
+        with httpx.Client() as client:
+            while not self._stopped.is_set():
+                self.probe_all(client)
+                self.evaluate_latency()
+                self._stopped.wait(self.probe_interval)
+
+    def _ensure_prober(self):
+        if self._prober is None and self.probe_interval > 0:
+            with self._lock:
+                if self._prober is None:
+                    self._prober = threading.Thread(
+                        target=self._run_prober, name=f"replica-probe-{self.name}", daemon=True
+                    )
+                    self._prober.start()
+
+    def stop(self):
+        """헬스 체크 스레드 종료 (다음 choose()에서 재시작)"""
+        self._stopped.set()
+        if self._prober is not None:
+            self._prober.join(timeout=self.probe_timeout + 1)
+        with self._lock:
+            self._prober = None
+            self._stopped.clear()
+
+    def stats(self) -> dict:
+        now = self._clock()
+        with self._lock:
+            return {
+                "replicas": [replica.snapshot(now) for replica in self.replicas],
+                "no_replica": self.no_replica,
+            }
@@ -0,0 +1,238 @@
+"""
+Write-behind 배치 기록기 (요청 경로에서 DB 쓰기 제거)
+- submit()은 메모리 큐에 추가만 함 (DB 왕복 / 커밋 없음)
+- 백그라운드 스레드가 flush_interval초마다 또는 batch_size건이 쌓이면 한 트랜잭션으로 기록
+  (write_batch에서 Core insert()로 다건 INSERT → psycopg2 insertmanyvalues로 multi-row VALUES)
+- 큐 상한(max_size)
+  - backpressure: 동기 호출자는 timeout초까지 빈 자리를 기다림 (flusher를 즉시 깨움)
+  - overflow: 그래도 가득 차면 overflow 정책 적용
+    - "drop_newest": 새 이벤트 버림
+    - "drop_oldest": 가장 오래된 이벤트 버리고 새 이벤트 추가
+- 배치 기록 실패 시 (클라이언트가 보낸 잘못된 ID, 큐에 있는 동안 삭제된 사용자 / 키의 FK 위반 등)
+  → 롤백 후 건별 SAVEPOINT로 다시 기록, 실패한 이벤트만 버림 (나머지 이벤트는 기록)
+- flush 중 예외가 나도 백그라운드 스레드는 계속 동작 (스레드가 죽어 있으면 다음 submit()에서 재시작)
+- 종료 시 stop_all() (main.py lifespan) → 남은 이벤트 모두 기록
+- stats(): 큐 길이, 기록 / 버림 / 실패 건수
+
+사용:
+    class ClickWriter(WriteBehindQueue):
+        def write_batch(self, db, items):
+            db.execute(insert(MovieClick), items)
+
+    click_writer = ClickWriter("clicks")
+    click_writer.submit({...})
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from backend.core.db import SessionLocal
+
+OVERFLOW_POLICIES = ("drop_newest", "drop_oldest")
+
+# 등록된 기록기 (stop_all / stats_all 대상)
+_registry: Dict[str, "WriteBehindQueue"] = {}
+
+
+class WriteBehindQueue:
+    """
+    write-behind 기록기 기본 클래스 - write_batch()를 구현해서 사용
+
+    write_batch()는 백그라운드 스레드의 Session으로 호출되며 커밋은 이 클래스가 함
+    커밋 후 후처리(캐시 무효화 등)는 after_commit()에서
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_size: int = 500,
+        flush_interval: float = 0.2,
+        max_size: int = 10000,
+        overflow: str = "drop_newest"
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}")
+
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self.overflow = overflow
+
+        self._items: deque = deque()
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.blocked = 0
+        self.last_flush_ms = 0.0
+
+        _registry[name] = self
+
+    # ==================== 구현 ====================
+
+    def write_batch(self, db: Session, items: List[Any]):
+        """items를 한 번에 기록 (커밋은 호출자)"""
+        raise NotImplementedError
+
+    def after_commit(self, items: List[Any]):
+        """커밋 후 후처리 (기본: 없음)"""
+
+    # ==================== 큐 ====================
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._stopped.is_set() or (self._thread is not None and self._thread.is_alive()):
+                return
+            if self._thread is not None:
+                print(f"[WriteBehind:{self.name}] Flusher thread died, restarting")
+            self._thread = threading.Thread(target=self._run, name=f"write-behind-{self.name}", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                while self.flush() >= self.batch_size:
+                    pass  # 밀린 이벤트는 interval을 기다리지 않고 연속 기록
+            except Exception as e:
+                # 롤백 / close 실패 등 → 스레드는 유지하고 다음 주기에 다시 기록
+                print(f"[WriteBehind:{self.name}] Flush error: {e}")
+
+    def submit(self, item: Any, timeout: float = 0) -> bool:
+        """
+        이벤트 추가 - 큐에 들어갔으면 True
+
+        Args:
+            timeout: 큐가 가득 찼을 때 기다릴 최대 시간 (초)
+                     스레드풀의 동기 엔드포인트만 사용, async 엔드포인트는 0 (이벤트 루프 차단 방지)
+        """
+        self._ensure_started()
+        with self._not_full:
+            if len(self._items) >= self.max_size and timeout > 0:
+                self.blocked += 1
+                self._wakeup.set()
+                deadline = time.monotonic() + timeout
+                while len(self._items) >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._not_full.wait(remaining)
+
+            if len(self._items) >= self.max_size:
+                self.dropped += 1
+                if self.overflow == "drop_newest":
+                    print(f"[WriteBehind:{self.name}] Queue full ({self.max_size}), dropped new event")
+                    return False
+                self._items.popleft()
+                print(f"[WriteBehind:{self.name}] Queue full ({self.max_size}), dropped oldest event")
+
+            self._items.append(item)
+            full = len(self._items) >= self.batch_size
+        if full:
+            self._wakeup.set()
+        return True
+
+    def flush(self) -> int:
+        """큐의 이벤트를 최대 batch_size건 기록 - 기록한 건수 반환"""
+        with self._flush_lock:
+            with self._not_full:
+                count = min(len(self._items), self.batch_size)
+                items = [self._items.popleft() for _ in range(count)]
+                self._not_full.notify_all()
+            if not items:
+                return 0
+
+            start = time.perf_counter()
+            db = SessionLocal()
+            try:
+                self.write_batch(db, items)
+                db.commit()
+                written = items
+            except Exception as e:
+                db.rollback()
+                print(f"[WriteBehind:{self.name}] Batch write failed, retrying {len(items)} events one by one: {e}")
+                written = self._write_each(db, items)
+            finally:
+                db.close()
+
+            self.written += len(written)
+            self.last_flush_ms = round((time.perf_counter() - start) * 1000, 2)
+            if written:
+                try:
+                    self.after_commit(written)
+                except Exception as e:
+                    print(f"[WriteBehind:{self.name}] after_commit failed: {e}")
+            return len(items)
+
+    def _write_each(self, db: Session, items: List[Any]) -> List[Any]:
+        """이벤트별 SAVEPOINT로 기록 - 실패한 이벤트만 버리고 기록된 이벤트 반환"""
+        written = []
+        try:
+            for item in items:
+                try:
+                    with db.begin_nested():
+                        self.write_batch(db, [item])
+                    written.append(item)
+                except Exception as e:
+                    self.failed += 1
+                    # DB 오류 원문만 (SQL / 파라미터 반복 출력 방지)
+                    print(f"[WriteBehind:{self.name}] Dropped event: {str(getattr(e, 'orig', e)).strip()}")
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            self.failed += len(written)
+            print(f"[WriteBehind:{self.name}] Flush failed, dropped {len(written)} events: {e}")
+            return []
+        return written
+
+    def drain(self):
+        """큐가 빌 때까지 기록"""
+        while self.flush():
+            pass
+
+    def stop(self):
+        """백그라운드 스레드 종료 + 남은 이벤트 기록"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.drain()
+        # 같은 프로세스에서 앱이 다시 시작되면 (테스트 등) 다음 submit()에서 재시작
+        with self._lock:
+            self._thread = None
+            self._stopped.clear()
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self._items),
+            "max_size": self.max_size,
+            "overflow": self.overflow,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "blocked": self.blocked,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+def stop_all():
+    """등록된 모든 기록기 종료 (남은 이벤트 기록)"""
+    for queue in list(_registry.values()):
+        queue.stop()
+
+
+def stats_all() -> dict:
+    return {name: queue.stats() for name, queue in _registry.items()}
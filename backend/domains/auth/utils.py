@@ -7,9 +7,11 @@ from typing import Optional
 from jose import jwt
 from jose.exceptions import ExpiredSignatureError
 from fastapi import Cookie, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from backend.core.db import get_db
+from backend.core.db import get_db, get_async_db
 from backend.domains.user.models import User
 
 # ======================================================
@@ -82,10 +84,8 @@ def get_current_user_optional(
         return None
 
 
-def get_current_user(
-    access_token: Optional[str] = Cookie(None),  # HttpOnly 쿠키에서 자동 추출
-    db: Session = Depends(get_db),
-) -> User:
+def _decode_user_id(access_token: Optional[str]) -> str:
+    """쿠키의 access token 검증 후 user_id 반환 (실패 시 401)"""
     # -----------------------------
     # 토큰 존재 여부 확인
     # -----------------------------
@@ -118,11 +118,10 @@ def get_current_user(
             detail="토큰에 유저 정보가 없습니다.",
         )
 
-    # -----------------------------
-    # DB에서 유저 조회
-    # -----------------------------
-    user = db.query(User).filter(User.user_id == user_id).first()
+    return user_id
+
 
+def _check_user(user: Optional[User]) -> User:
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -136,3 +135,27 @@ def get_current_user(
         )
 
     return user
+
+
+def get_current_user(
+    access_token: Optional[str] = Cookie(None),  # HttpOnly 쿠키에서 자동 추출
+    db: Session = Depends(get_db),
+) -> User:
+    user_id = _decode_user_id(access_token)
+
+    # -----------------------------
+    # DB에서 유저 조회
+    # -----------------------------
+    user = db.query(User).filter(User.user_id == user_id).first()
+    return _check_user(user)
+
+
+async def get_current_user_async(
+    access_token: Optional[str] = Cookie(None),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """get_current_user의 async 버전 (async 엔드포인트용)"""
+    user_id = _decode_user_id(access_token)
+
+    result = await db.execute(select(User).where(User.user_id == user_id))
+    return _check_user(result.scalars().first())
@@ -4,15 +4,18 @@ B2B 인증 의존성 모듈
 - API Key 인증 (External API용)
 """
 import hashlib
-from fastapi import Depends, HTTPException, Header
+from fastapi import Depends, HTTPException, Header, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from jose import jwt, JWTError
+from typing import Optional
 import os
 
-from backend.core.db import get_db
-from backend.core.rate_limit import check_rate_limit
-from .models import Company, ApiKey
+from backend.core.db import get_db, get_async_db
+from backend.core.rate_limit import RateLimitResult, hit
+from . import key_cache
+from .models import Company
 
 # JWT 설정
 B2B_JWT_SECRET = os.getenv("B2B_JWT_SECRET_KEY", "b2b-dev-secret-key")
@@ -62,29 +65,54 @@ PLAN_LIMITS = {
     "ENTERPRISE": 100000,
 }
 
+# 플랜별 초당 burst 한도 (B2C 내부 호출은 제외)
+PLAN_BURST_LIMITS = {
+    "BASIC": 5,
+    "PRO": 20,
+    "ENTERPRISE": 100,
+}
+
 
 # ==================== External API 인증 (API Key) ====================
 
-async def verify_api_key(
-    x_api_key: str = Header(..., alias="X-API-Key"),
-    db: Session = Depends(get_db)
-) -> ApiKey:
+class ApiPrincipal:
     """
-    External API Key 인증
+    인증이 끝난 호출 주체 (External API 키 / B2C 내부 호출 공용)
 
-    - Header: X-API-Key: sk-moviesir-xxxx
-    - Rate Limit 체크 포함
-    - 일일 한도는 회사 플랜 기준으로 동적 적용
+    ApiKey와 같은 key_id / company_id / daily_limit 속성을 가지므로
+    게이트웨이 로직에서 ApiKey 대신 사용 가능
     """
-    # API 키 해시
-    hashed_key = hashlib.sha256(x_api_key.encode()).hexdigest()
 
-    api_key = db.query(ApiKey).filter(
-        ApiKey.access_key == hashed_key,
-        ApiKey.is_active == True
-    ).first()
+    def __init__(
+        self,
+        key_id: int,
+        company_id: int,
+        daily_limit: int,
+        internal: bool = False,
+        plan_type: Optional[str] = None,
+        is_admin: bool = False,
+        burst_limit: Optional[int] = None
+    ):
+        self.key_id = key_id
+        self.company_id = company_id
+        self.daily_limit = daily_limit
+        self.internal = internal
+        self.plan_type = plan_type
+        self.is_admin = is_admin
+        self.burst_limit = burst_limit
+        self.rate_limit: Optional[RateLimitResult] = None  # enforce_rate_limit() 결과
+
+
+async def _find_active_key(db: AsyncSession, raw_key: str) -> ApiPrincipal:
+    """
+    활성 API 키 + 회사 플랜 조회 (key_cache: 로컬 LRU → Redis → DB)
+
+    정상 상태에서는 DB 조회 없음, 일일 한도는 회사 플랜 기준으로 동적 적용
+    """
+    hashed_key = hashlib.sha256(raw_key.encode()).hexdigest()
+    record = await key_cache.resolve(db, hashed_key)
 
-    if not api_key:
+    if not record or not record["is_active"]:
         raise HTTPException(
             status_code=401,
             detail={
@@ -92,23 +120,100 @@ async def verify_api_key(
                 "message": "Invalid or inactive API Key"
             }
         )
+    return ApiPrincipal(
+        record["key_id"],
+        record["company_id"],
+        PLAN_LIMITS.get(record["plan_type"], 1000),
+        plan_type=record["plan_type"],
+        is_admin=record["is_admin"],
+        burst_limit=PLAN_BURST_LIMITS.get(record["plan_type"], 5)
+    )
+
+
+async def enforce_rate_limit(principal: ApiPrincipal, cost: int = 1) -> RateLimitResult:
+    """
+    호출 cost건 차감 (burst + 일일 한도, Redis 왕복 1회)
+
+    결과는 principal.rate_limit에 저장 (응답 meta.remaining_quota용)
+    배치 요청은 남은 한도만큼만 차감될 수 있음 (result.granted < cost, 한 건도 못 하면 429)
+
+    Raises:
+        HTTPException: 429 (X-RateLimit-* / Retry-After 헤더 포함)
+    """
+    result = await hit(str(principal.key_id), principal.daily_limit, principal.burst_limit, cost)
+    principal.rate_limit = result
+
+    if not result.allowed:
+        if result.exceeded == "burst":
+            detail = {
+                "code": "BURST_LIMIT_EXCEEDED",
+                "message": f"Burst limit ({principal.burst_limit}/s) exceeded",
+                "limit": principal.burst_limit
+            }
+        else:
+            detail = {
+                "code": "RATE_LIMIT_EXCEEDED",
+                "message": f"Daily limit ({principal.daily_limit}) exceeded",
+                "limit": principal.daily_limit
+            }
+        raise HTTPException(status_code=429, detail=detail, headers=result.headers())
+    return result
+
+
+async def verify_api_key(
+    response: Response,
+    x_api_key: str = Header(..., alias="X-API-Key"),
+    db: AsyncSession = Depends(get_async_db)
+) -> ApiPrincipal:
+    """
+    External API Key 인증
 
-    # 회사 플랜 기준 일일 한도 (동적 적용)
-    company = db.query(Company).filter(Company.company_id == api_key.company_id).first()
-    daily_limit = PLAN_LIMITS.get(company.plan_type, 1000) if company else api_key.daily_limit
+    - Header: X-API-Key: sk-moviesir-xxxx
+    - Rate Limit 체크 포함 (응답에 X-RateLimit-* 헤더)
+    - 일일 한도는 회사 플랜 기준으로 동적 적용
+    """
+    api_key = await _find_active_key(db, x_api_key)
 
     # Rate Limit 체크
-    if not await check_rate_limit(str(api_key.key_id), daily_limit):
+    result = await enforce_rate_limit(api_key)
+    response.headers.update(result.headers())
+
+    return api_key
+
+
+async def authenticate_api_key(
+    x_api_key: str = Header(..., alias="X-API-Key"),
+    db: AsyncSession = Depends(get_async_db)
+) -> ApiPrincipal:
+    """
+    External API Key 인증만 (Rate Limit 차감은 엔드포인트에서)
+
+    - 배치 요청: 본문의 항목 수만큼 enforce_rate_limit(principal, cost=n)
+    """
+    return await _find_active_key(db, x_api_key)
+
+
+def require_admin_key(api_key: ApiPrincipal) -> None:
+    """어드민 회사의 API Key인지 확인 (디버그 기능 전용)"""
+    if not api_key.is_admin:
         raise HTTPException(
-            status_code=429,
+            status_code=403,
             detail={
-                "code": "RATE_LIMIT_EXCEEDED",
-                "message": f"Daily limit ({daily_limit}) exceeded",
-                "limit": daily_limit
+                "code": "ADMIN_KEY_REQUIRED",
+                "message": "This feature requires an admin API Key"
             }
         )
 
-    # API 키에 동적 한도 설정 (응답용)
-    api_key.daily_limit = daily_limit
 
+async def verify_admin_api_key(
+    x_api_key: str = Header(..., alias="X-API-Key"),
+    db: AsyncSession = Depends(get_async_db)
+) -> ApiPrincipal:
+    """
+    어드민 API Key 인증 (디버그 조회용)
+
+    - Rate Limit 차감 없음
+    """
+    api_key = await _find_active_key(db, x_api_key)
+    require_admin_key(api_key)
     return api_key
@@ -1,28 +1,39 @@
 """
 B2B External API Router
 - /v1/recommend: 영화 추천 API
+- /v1/recommend/batch: 다수 사용자 일괄 추천 (항목별 한도 차감 / 결과)
+- /v1/recommend 스트리밍 (Accept: application/x-ndjson | text/event-stream): 트랙별로 먼저 전송
+- Idempotency-Key 헤더: 같은 키 재시도는 저장된 응답 반환 (한도 차감 / AI 재계산 없음, idempotency.py)
 - API Key 인증 + Rate Limiting
 - 사용량 로깅
 """
+import os
 import time
 import httpx
-import os
+from collections import Counter
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Header, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from datetime import datetime
 
-from backend.core.db import get_db
-from backend.core.rate_limit import get_remaining_quota
-from .dependencies import verify_api_key
-from .models import ApiKey, ApiLog, ApiUsage
-from sqlalchemy import and_
+from backend.core.http_clients import http_clients
+from backend.core.json_response import FastJSONResponse
+from backend.core.profiling import SamplingProfiler, ai_profile_headers, new_profile_request_id, profile_buffer
+from backend.core.rate_limit import RateLimitResult
+from .dependencies import (
+    ApiPrincipal,
+    authenticate_api_key,
+    enforce_rate_limit,
+    require_admin_key,
+    verify_admin_api_key,
+)
+from . import idempotency, wire
+from .gateway import ai_pool, forward_to_ai, record_usage, stream_from_ai
 
 router = APIRouter(prefix="/v1", tags=["External API"])
 
-# AI 서비스 URL
-AI_SERVICE_URL = os.getenv("AI_SERVICE_URL", "http://localhost:8001")
+# /v1/recommend/batch 최대 항목 수 (AI 서비스 응답 시간은 항목 수에 비례 → AI_HTTP_READ_TIMEOUT 고려)
+RECOMMEND_BATCH_MAX_ITEMS = int(os.getenv("RECOMMEND_BATCH_MAX_ITEMS", "50"))
 
 
 # ==================== Request/Response Schemas ====================
@@ -37,6 +48,7 @@ class RecommendRequest(BaseModel):
     excluded_ids_a: List[int] = []  # 트랙 A 제외할 영화 ID
     excluded_ids_b: List[int] = []  # 트랙 B 제외할 영화 ID
     negative_movie_ids: Optional[List[int]] = None  # 부정 피드백 영화 ID (optional)
+    include_reserve: bool = False  # 교체 후보 예비 목록 포함 (recommend_single 대신 클라이언트에서 교체)
     client_user_id: Optional[str] = None  # 클라이언트측 사용자 ID (추적용)
 
 
@@ -66,19 +78,156 @@ class RecommendResponse(BaseModel):
     meta: dict
 
 
+class BatchRecommendRequest(BaseModel):
+    """일괄 추천 요청 (사용자별 추천 요청 목록)"""
+    items: List[RecommendRequest]
+
+
+class BatchRecommendResponse(BaseModel):
+    """일괄 추천 응답 - data.results는 요청 순서대로 항목별 data 또는 error"""
+    success: bool = True
+    data: dict
+    meta: dict
+
+
 class ErrorResponse(BaseModel):
     """에러 응답"""
     success: bool = False
     error: dict
 
 
+def _ai_recommend_payload(request: RecommendRequest) -> dict:
+    """AI 서비스 /recommend 요청 본문"""
+    return {
+        "user_movie_ids": request.user_movie_ids,
+        "available_time": request.available_time,
+        "preferred_genres": request.preferred_genres,
+        "preferred_otts": request.preferred_otts,
+        "allow_adult": request.allow_adult,
+        "excluded_ids_a": request.excluded_ids_a,
+        "excluded_ids_b": request.excluded_ids_b,
+        "negative_movie_ids": request.negative_movie_ids or [],  # Optional
+        "include_reserve": request.include_reserve
+    }
+
+
+def _recommend_data(ai_result: dict, include_reserve: bool) -> dict:
+    """/v1/recommend 응답 data"""
+    return {
+        "track_a": ai_result.get("track_a"),
+        "track_b": ai_result.get("track_b"),
+        "algorithm": "hybrid",
+        **({"reserve": ai_result.get("reserve")} if include_reserve else {})
+    }
+
+
+async def _charge(
+    api_key: ApiPrincipal,
+    idempotent: idempotency.IdempotentRequest,
+    cost: int = 1
+) -> RateLimitResult:
+    """한도 차감 (멱등성 키 확인 뒤 → 저장된 응답 재사용 시 차감 없음, 429면 처리 중 표시 해제)"""
+    try:
+        return await enforce_rate_limit(api_key, cost=cost)
+    except HTTPException:
+        await idempotent.release()
+        raise
+
+
 # ==================== Endpoints ====================
 
+async def _next_frame(frames) -> dict:
+    """다음 AI 프레임 (meta / error 없이 스트림이 끝나면 503)"""
+    try:
+        return await frames.__anext__()
+    except StopAsyncIteration:
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "code": "AI_SERVICE_ERROR",
+                "message": "AI service stream ended unexpectedly"
+            }
+        )
+
+
+async def _stream_recommend(
+    request: RecommendRequest,
+    api_key: ApiPrincipal,
+    media_type: str,
+    start_time: float
+) -> StreamingResponse:
+    """
+    /v1/recommend 스트리밍 응답
+
+    프레임 (NDJSON 한 줄 / SSE 이벤트 하나):
+      {"type": "track", "track": "track_a", "data": {...}}  ← 트랙 조합이 정해지는 즉시
+      {"type": "track", "track": "track_b", "data": {...}}
+      {"type": "meta", "data": {algorithm, latency_ms, remaining_quota, daily_limit, reserve?}}  ← 마지막
+      {"type": "error", "error": {"code", "message"}}  ← 도중 실패 시 (meta 대신)
+
+    첫 프레임을 받은 뒤 응답 시작 → 연결 실패 / 복제본 없음 / 빈 응답은 일반 JSON 오류 응답(503/504)
+    응답 시작 후 실패는 error 프레임으로 알리고 실제 상태 코드로 사용량 기록
+    """
+    frames = stream_from_ai("/recommend", _ai_recommend_payload(request))
+    try:
+        first = await _next_frame(frames)
+    except Exception as e:
+        status_code = e.status_code if isinstance(e, HTTPException) else 500
+        await record_usage(api_key.key_id, "/v1/recommend", status_code, int((time.time() - start_time) * 1000))
+        raise
+
+    async def body():
+        status_code = 200
+        frame = first
+        try:
+            while True:
+                if frame["type"] == "track":
+                    yield wire.encode_frame(media_type, frame)
+                elif frame["type"] == "meta":
+                    yield wire.encode_frame(media_type, {"type": "meta", "data": {
+                        "algorithm": "hybrid",
+                        "latency_ms": int((time.time() - start_time) * 1000),
+                        "remaining_quota": api_key.rate_limit.remaining,
+                        "daily_limit": api_key.daily_limit,
+                        **({"reserve": frame.get("reserve")} if request.include_reserve else {})
+                    }})
+                    return
+                else:
+                    status_code = 500
+                    yield wire.encode_frame(media_type, {"type": "error", "error": {
+                        "code": "AI_SERVICE_ERROR",
+                        "message": "AI service failed while generating recommendations"
+                    }})
+                    return
+                frame = await _next_frame(frames)
+        except HTTPException as e:
+            status_code = e.status_code
+            yield wire.encode_frame(media_type, {"type": "error", "error": e.detail})
+        except Exception as e:
+            print(f"[External] Stream failed: {e}")
+            status_code = 500
+            yield wire.encode_frame(media_type, {"type": "error", "error": {
+                "code": "INTERNAL_ERROR",
+                "message": "Recommendation stream failed"
+            }})
+        finally:
+            await frames.aclose()
+            await record_usage(api_key.key_id, "/v1/recommend", status_code, int((time.time() - start_time) * 1000))
+
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={**api_key.rate_limit.headers(), "Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/recommend", response_model=RecommendResponse)
 async def external_recommend(
     request: RecommendRequest,
-    api_key: ApiKey = Depends(verify_api_key),
-    db: Session = Depends(get_db)
+    api_key: ApiPrincipal = Depends(authenticate_api_key),
+    x_debug_profile: Optional[str] = Header(None, alias="X-Debug-Profile"),
+    accept: Optional[str] = Header(None),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """
     영화 추천 API
@@ -86,6 +235,10 @@ async def external_recommend(
     - X-API-Key 헤더 필수
     - 일일 호출 제한 적용
     - 사용량 로깅
+    - Idempotency-Key: 같은 키 재시도 / 동시 요청은 처음 요청의 응답을 그대로 반환
+      (한도 차감 / 사용량 기록 / AI 호출 없음, 스트리밍 / 디버그 프로파일링 요청에는 미적용)
+    - Accept: application/x-ndjson 또는 text/event-stream 이면 스트리밍 (_stream_recommend)
+      → Track A를 Track B 계산 전에 먼저 전송, 마지막 meta 프레임에 사용량 정보 (디버그 프로파일링과 함께 사용 불가)
 
     Returns:
         track_a: 장르 맞춤 추천
@@ -93,110 +246,160 @@ async def external_recommend(
     """
     start_time = time.time()
     status_code = 200
-    error_detail = None
+
+    # 디버그 프로파일링은 어드민 키만 (한도 차감 전에 확인)
+    if x_debug_profile:
+        require_admin_key(api_key)
+
+    stream_type = wire.stream_media_type(accept)
+    idempotent = await idempotency.begin(
+        api_key.key_id, "/v1/recommend",
+        None if stream_type or x_debug_profile else idempotency_key,
+        request.model_dump(mode="json")
+    )
+    if idempotent.replay is not None:
+        return idempotent.replay_response()
+    await _charge(api_key, idempotent)
+
+    if stream_type and not x_debug_profile:
+        return await _stream_recommend(request, api_key, stream_type, start_time)
+
+    # 디버그 프로파일링 (어드민 키 + X-Debug-Profile 헤더일 때만)
+    profile_id = None
+    profiler = None
+    if x_debug_profile:
+        profile_id = new_profile_request_id()
+        profiler = SamplingProfiler().start()
+    ai_headers = ai_profile_headers(profile_id) if profile_id else None
 
     try:
         # AI 서비스 호출
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            ai_response = await client.post(
-                f"{AI_SERVICE_URL}/recommend",
-                json={
-                    "user_movie_ids": request.user_movie_ids,
-                    "available_time": request.available_time,
-                    "preferred_genres": request.preferred_genres,
-                    "preferred_otts": request.preferred_otts,
-                    "allow_adult": request.allow_adult,
-                    "excluded_ids_a": request.excluded_ids_a,
-                    "excluded_ids_b": request.excluded_ids_b,
-                    "negative_movie_ids": request.negative_movie_ids or []  # Optional
-                }
-            )
+        ai_result = await forward_to_ai("/recommend", _ai_recommend_payload(request), headers=ai_headers)
+
+        response_time_ms = int((time.time() - start_time) * 1000)
 
-        if ai_response.status_code != 200:
-            status_code = 503
-            error_detail = "AI service unavailable"
-            raise HTTPException(
-                status_code=503,
-                detail={
-                    "code": "AI_SERVICE_UNAVAILABLE",
-                    "message": "AI recommendation service is temporarily unavailable"
+        # AI 응답 dict를 RecommendResponse로 다시 검증하지 않고 바로 직렬화 (스키마는 문서용)
+        # 직접 Response를 반환하면 의존성의 응답 헤더가 합쳐지지 않으므로 X-RateLimit-* 헤더를 직접 설정
+        return await idempotent.complete(FastJSONResponse(
+            {
+                "success": True,
+                "data": _recommend_data(ai_result, request.include_reserve),
+                "meta": {
+                    "latency_ms": response_time_ms,
+                    "remaining_quota": api_key.rate_limit.remaining,  # 현재 호출 반영
+                    "daily_limit": api_key.daily_limit,
+                    **({"profile_request_id": profile_id} if profile_id else {})
                 }
-            )
+            },
+            headers=api_key.rate_limit.headers()
+        ))
 
-        ai_result = ai_response.json()
+    except HTTPException as e:
+        status_code = e.status_code
+        raise
+
+    finally:
+        await idempotent.release()  # 저장 전에 실패한 경우만 (재시도 시 다시 처리)
+        if profiler:
+            profiler.stop()
+            profile_buffer.put(profile_id, profiler.report(profile_id, "/v1/recommend"))
+
+        # 사용량 로깅 (개별 로그는 배치 기록, 일별 집계는 Redis 카운터) - 응답 지연 없음
         response_time_ms = int((time.time() - start_time) * 1000)
+        await record_usage(api_key.key_id, "/v1/recommend", status_code, response_time_ms)
 
-        # 남은 할당량 조회
-        remaining = await get_remaining_quota(str(api_key.key_id), api_key.daily_limit)
 
-        return RecommendResponse(
-            success=True,
-            data={
-                "track_a": ai_result.get("track_a"),
-                "track_b": ai_result.get("track_b"),
-                "algorithm": "hybrid"
-            },
-            meta={
-                "latency_ms": response_time_ms,
-                "remaining_quota": remaining - 1,  # 현재 호출 반영
-                "daily_limit": api_key.daily_limit
-            }
-        )
+@router.post("/recommend/batch", response_model=BatchRecommendResponse)
+async def external_recommend_batch(
+    request: BatchRecommendRequest,
+    api_key: ApiPrincipal = Depends(authenticate_api_key),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    일괄 영화 추천 API (기내 엔터테인먼트 등 다수 사용자)
 
-    except httpx.TimeoutException:
-        status_code = 504
-        error_detail = "AI service timeout"
+    - X-API-Key 헤더 필수, 최대 RECOMMEND_BATCH_MAX_ITEMS건
+    - 일일 한도는 항목 수만큼 한 번에 차감 (Redis 왕복 1회)
+      → 남은 한도를 넘는 뒤쪽 항목은 RATE_LIMIT_EXCEEDED (한 건도 안 되면 429)
+    - AI 서비스는 /recommend_batch 1회 호출 (같은 필터 조건끼리 후보 계산 공유)
+    - 항목별 결과 / 오류를 요청 순서대로 반환, 사용량은 처리된 항목마다 기록
+    - Idempotency-Key: 같은 키 재시도는 처음 응답 그대로 (항목 수만큼 다시 차감하지 않음)
+
+    Returns:
+        data.results[i]: {index, success, client_user_id, data(track_a, track_b, ...) 또는 error}
+    """
+    start_time = time.time()
+    count = len(request.items)
+    if not 0 < count <= RECOMMEND_BATCH_MAX_ITEMS:
         raise HTTPException(
-            status_code=504,
+            status_code=400,
             detail={
-                "code": "AI_SERVICE_TIMEOUT",
-                "message": "AI service request timed out"
+                "code": "INVALID_BATCH_SIZE",
+                "message": f"items must contain 1 to {RECOMMEND_BATCH_MAX_ITEMS} requests"
             }
         )
 
-    except httpx.RequestError as e:
-        status_code = 503
-        error_detail = str(e)
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "code": "AI_SERVICE_ERROR",
-                "message": "Failed to connect to AI service"
-            }
+    idempotent = await idempotency.begin(
+        api_key.key_id, "/v1/recommend/batch", idempotency_key, request.model_dump(mode="json")
+    )
+    if idempotent.replay is not None:
+        return idempotent.replay_response()
+    rate_limit = await _charge(api_key, idempotent, cost=count)
+    granted = rate_limit.granted
+    statuses = [200] * granted  # 처리된 항목별 사용량 기록용
+
+    try:
+        ai_result = await forward_to_ai(
+            "/recommend_batch",
+            {"items": [_ai_recommend_payload(item) for item in request.items[:granted]]}
         )
+        outcomes = ai_result["results"]
+
+        results = []
+        for index, item in enumerate(request.items):
+            entry = {"index": index, "client_user_id": item.client_user_id}
+            if index >= granted:
+                entry.update(success=False, error={
+                    "code": "RATE_LIMIT_EXCEEDED",
+                    "message": f"Daily limit ({api_key.daily_limit}) exceeded"
+                })
+            elif "error" in outcomes[index]:
+                statuses[index] = 500
+                entry.update(success=False, error={
+                    "code": "RECOMMENDATION_FAILED",
+                    "message": "Failed to generate recommendations for this item"
+                })
+            else:
+                entry.update(success=True, data=_recommend_data(outcomes[index]["data"], item.include_reserve))
+            results.append(entry)
+
+        succeeded = sum(1 for entry in results if entry["success"])
+        return await idempotent.complete(FastJSONResponse(
+            {
+                "success": True,
+                "data": {"results": results},
+                "meta": {
+                    "latency_ms": int((time.time() - start_time) * 1000),
+                    "items": count,
+                    "succeeded": succeeded,
+                    "failed": count - succeeded,
+                    "remaining_quota": rate_limit.remaining,
+                    "daily_limit": api_key.daily_limit
+                }
+            },
+            headers=rate_limit.headers()
+        ))
+
+    except HTTPException as e:
+        statuses = [e.status_code] * granted
+        raise
 
     finally:
-        # 사용량 로깅 (개별 로그)
+        await idempotent.release()
+        # 항목별 사용량 (상태 코드별로 모아 기록, 응답 시간은 배치 전체 기준)
         response_time_ms = int((time.time() - start_time) * 1000)
-        log = ApiLog(
-            key_id=api_key.key_id,
-            endpoint="/v1/recommend",
-            status_code=status_code,
-            process_time_ms=response_time_ms,
-            created_at=datetime.utcnow()
-        )
-        db.add(log)
-
-        # 일별 집계 업데이트 (Dashboard용)
-        today = datetime.utcnow().date()
-        usage = db.query(ApiUsage).filter(
-            and_(ApiUsage.key_id == api_key.key_id, ApiUsage.usage_date == today)
-        ).first()
-
-        if usage:
-            usage.request_count = (usage.request_count or 0) + 1
-            if status_code >= 400:
-                usage.error_count = (usage.error_count or 0) + 1
-        else:
-            usage = ApiUsage(
-                key_id=api_key.key_id,
-                usage_date=today,
-                request_count=1,
-                error_count=1 if status_code >= 400 else 0
-            )
-            db.add(usage)
-
-        db.commit()
+        for status_code, items in Counter(statuses).items():
+            await record_usage(api_key.key_id, "/v1/recommend/batch", status_code, response_time_ms, count=items)
 
 
 class RecommendSingleRequest(BaseModel):
@@ -222,8 +425,9 @@ class RecommendSingleResponse(BaseModel):
 @router.post("/recommend_single", response_model=RecommendSingleResponse)
 async def external_recommend_single(
     request: RecommendSingleRequest,
-    api_key: ApiKey = Depends(verify_api_key),
-    db: Session = Depends(get_db)
+    api_key: ApiPrincipal = Depends(authenticate_api_key),
+    x_debug_profile: Optional[str] = Header(None, alias="X-Debug-Profile"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """
     개별 영화 재추천 API
@@ -231,112 +435,123 @@ async def external_recommend_single(
     - X-API-Key 헤더 필수
     - 일일 호출 제한 적용
     - 사용량 로깅
+    - Idempotency-Key: /v1/recommend와 동일 (디버그 프로파일링 요청에는 미적용)
 
     Returns:
         단일 영화 정보 (movie_id, title, runtime, ...)
     """
     start_time = time.time()
     status_code = 200
-    error_detail = None
+
+    # 디버그 프로파일링은 어드민 키만 (한도 차감 전에 확인)
+    if x_debug_profile:
+        require_admin_key(api_key)
+
+    idempotent = await idempotency.begin(
+        api_key.key_id, "/v1/recommend_single",
+        None if x_debug_profile else idempotency_key,
+        request.model_dump(mode="json")
+    )
+    if idempotent.replay is not None:
+        return idempotent.replay_response()
+    await _charge(api_key, idempotent)
+
+    # 디버그 프로파일링 (어드민 키 + X-Debug-Profile 헤더일 때만)
+    profile_id = None
+    profiler = None
+    if x_debug_profile:
+        profile_id = new_profile_request_id()
+        profiler = SamplingProfiler().start()
+    ai_headers = ai_profile_headers(profile_id) if profile_id else None
 
     try:
         # AI 서비스 호출
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            ai_response = await client.post(
-                f"{AI_SERVICE_URL}/recommend_single",
-                json={
-                    "user_movie_ids": request.user_movie_ids,
-                    "target_runtime": request.target_runtime,
-                    "excluded_ids": request.excluded_ids,
-                    "track": request.track,
-                    "preferred_genres": request.preferred_genres,
-                    "preferred_otts": request.preferred_otts,
-                    "allow_adult": request.allow_adult,
-                    "negative_movie_ids": request.negative_movie_ids or []  # Optional
-                }
-            )
+        ai_result = await forward_to_ai(
+            "/recommend_single",
+            {
+                "user_movie_ids": request.user_movie_ids,
+                "target_runtime": request.target_runtime,
+                "excluded_ids": request.excluded_ids,
+                "track": request.track,
+                "preferred_genres": request.preferred_genres,
+                "preferred_otts": request.preferred_otts,
+                "allow_adult": request.allow_adult,
+                "negative_movie_ids": request.negative_movie_ids or []  # Optional
+            },
+            headers=ai_headers
+        )
+
+        response_time_ms = int((time.time() - start_time) * 1000)
 
-        if ai_response.status_code != 200:
-            status_code = 503
-            error_detail = "AI service unavailable"
-            raise HTTPException(
-                status_code=503,
-                detail={
-                    "code": "AI_SERVICE_UNAVAILABLE",
-                    "message": "AI recommendation service is temporarily unavailable"
+        return await idempotent.complete(FastJSONResponse(
+            {
+                "success": True,
+                "data": ai_result,
+                "meta": {
+                    "latency_ms": response_time_ms,
+                    "remaining_quota": api_key.rate_limit.remaining,
+                    "daily_limit": api_key.daily_limit,
+                    **({"profile_request_id": profile_id} if profile_id else {})
                 }
-            )
+            },
+            headers=api_key.rate_limit.headers()
+        ))
+
+    except HTTPException as e:
+        status_code = e.status_code
+        raise
 
-        ai_result = ai_response.json()
+    finally:
+        await idempotent.release()
+        if profiler:
+            profiler.stop()
+            profile_buffer.put(profile_id, profiler.report(profile_id, "/v1/recommend_single"))
+
+        # 사용량 로깅 (개별 로그는 배치 기록, 일별 집계는 Redis 카운터) - 응답 지연 없음
         response_time_ms = int((time.time() - start_time) * 1000)
+        await record_usage(api_key.key_id, "/v1/recommend_single", status_code, response_time_ms)
 
-        # 남은 할당량 조회
-        remaining = await get_remaining_quota(str(api_key.key_id), api_key.daily_limit)
 
-        return RecommendSingleResponse(
-            success=True,
-            data=ai_result,
-            meta={
-                "latency_ms": response_time_ms,
-                "remaining_quota": remaining - 1,
-                "daily_limit": api_key.daily_limit
-            }
-        )
+@router.get("/debug/profiles/{request_id}")
+async def get_debug_profile(
+    request_id: str,
+    api_key: ApiPrincipal = Depends(verify_admin_api_key)
+):
+    """
+    요청 프로파일 조회 (어드민 API Key 전용)
 
-    except httpx.TimeoutException:
-        status_code = 504
-        error_detail = "AI service timeout"
-        raise HTTPException(
-            status_code=504,
-            detail={
-                "code": "AI_SERVICE_TIMEOUT",
-                "message": "AI service request timed out"
-            }
-        )
+    - gateway: 백엔드 External API 구간 샘플링 결과
+    - ai: AI 서비스(HybridRecommender) 구간 샘플링 결과
+    """
+    gateway_profile = profile_buffer.get(request_id)
+
+    # 프로파일은 요청을 처리한 복제본에만 있음 → 찾을 때까지 순서대로 조회
+    ai_profile = None
+    for replica in ai_pool.replicas:
+        try:
+            ai_response = await http_clients.get_async("ai").get(
+                f"{replica.url}/debug/profiles/{request_id}", headers=ai_profile_headers(), timeout=5.0
+            )
+            if ai_response.status_code == 200:
+                ai_profile = ai_response.json()
+                break
+        except httpx.HTTPError as e:
+            print(f"[Profile] AI profile fetch failed ({replica.url}): {e}")
 
-    except httpx.RequestError as e:
-        status_code = 503
-        error_detail = str(e)
+    if gateway_profile is None and ai_profile is None:
         raise HTTPException(
-            status_code=503,
+            status_code=404,
             detail={
-                "code": "AI_SERVICE_ERROR",
-                "message": "Failed to connect to AI service"
+                "code": "PROFILE_NOT_FOUND",
+                "message": "Profile not found or already evicted"
             }
         )
 
-    finally:
-        # 사용량 로깅 (개별 로그)
-        response_time_ms = int((time.time() - start_time) * 1000)
-        log = ApiLog(
-            key_id=api_key.key_id,
-            endpoint="/v1/recommend_single",
-            status_code=status_code,
-            process_time_ms=response_time_ms,
-            created_at=datetime.utcnow()
-        )
-        db.add(log)
-
-        # 일별 집계 업데이트 (Dashboard용)
-        today = datetime.utcnow().date()
-        usage = db.query(ApiUsage).filter(
-            and_(ApiUsage.key_id == api_key.key_id, ApiUsage.usage_date == today)
-        ).first()
-
-        if usage:
-            usage.request_count = (usage.request_count or 0) + 1
-            if status_code >= 400:
-                usage.error_count = (usage.error_count or 0) + 1
-        else:
-            usage = ApiUsage(
-                key_id=api_key.key_id,
-                usage_date=today,
-                request_count=1,
-                error_count=1 if status_code >= 400 else 0
-            )
-            db.add(usage)
-
-        db.commit()
+    return {
+        "request_id": request_id,
+        "gateway": gateway_profile,
+        "ai": ai_profile
+    }
 
 
 @router.get("/health")
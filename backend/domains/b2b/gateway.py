@@ -0,0 +1,437 @@
+"""
+External API 게이트웨이 공통 로직
+- AI 서비스 호출 (/v1/recommend, /v1/recommend_single 공용, 복제본 풀 부하 분산 + 선택적 hedging)
+- AI 서비스 NDJSON 스트리밍 호출 (/v1/recommend 스트리밍 모드)
+- 사용량 로깅 (ApiLog write-behind 배치 기록 + ApiUsage 일별 집계는 Redis 카운터)
+- B2C 내부 호출용 인증 완료 principal
+
+B2C 무비서는 기본적으로 이 모듈을 프로세스 내부에서 직접 호출 (B2C_TRANSPORT=inprocess)
+→ 백엔드 자기 자신으로의 HTTP 왕복, API 키 해시/키/회사 조회가 요청마다 발생하지 않음
+사용량은 External API / 내부 호출 모두 요청마다 커밋하지 않고 모아서 기록
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import anyio
+import anyio.from_thread
+import httpx
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from backend.core.db import SessionLocal
+from backend.core.http_clients import http_clients
+from backend.core.hedging import HedgePolicy
+from backend.core.replica_pool import ReplicaPool
+from backend.core.write_behind import WriteBehindQueue
+from backend.utils.cache import TTLCache
+from .dependencies import PLAN_LIMITS, ApiPrincipal, enforce_rate_limit
+from . import wire
+from .models import ApiKey, ApiLog, Company
+from .usage_counter import usage_counter
+
+# AI 서비스 URL (AI_SERVICE_URLS: 복제본 여러 대, 쉼표 구분 - 없으면 AI_SERVICE_URL 1대)
+AI_SERVICE_URL = os.getenv("AI_SERVICE_URL", "http://localhost:8001")
+AI_SERVICE_URLS = [url.strip() for url in os.getenv("AI_SERVICE_URLS", AI_SERVICE_URL).split(",") if url.strip()]
+
+# 복제본 풀 (헬스 체크 / 서킷 브레이커 / p99 제외)
+AI_POOL_PROBE_INTERVAL = float(os.getenv("AI_POOL_PROBE_INTERVAL", "5"))
+AI_POOL_FAILURE_THRESHOLD = int(os.getenv("AI_POOL_FAILURE_THRESHOLD", "5"))
+AI_POOL_OPEN_SECONDS = float(os.getenv("AI_POOL_OPEN_SECONDS", "10"))
+AI_POOL_EJECT_P99_MS = float(os.getenv("AI_POOL_EJECT_P99_MS", "5000"))  # 0이면 p99 제외 안 함
+AI_POOL_EJECT_SECONDS = float(os.getenv("AI_POOL_EJECT_SECONDS", "30"))
+
+# Hedged request (복제본 2대 이상일 때만)
+AI_HEDGE_ENABLED = os.getenv("AI_HEDGE_ENABLED", "false").lower() == "true"
+AI_HEDGE_BUDGET = float(os.getenv("AI_HEDGE_BUDGET", "0.05"))  # 추가 부하 상한 (요청 대비 비율)
+AI_HEDGE_QUANTILE = float(os.getenv("AI_HEDGE_QUANTILE", "0.95"))
+AI_HEDGE_MIN_DELAY_MS = float(os.getenv("AI_HEDGE_MIN_DELAY_MS", "20"))
+
+# 내부 principal 재조회 주기 (키 비활성화 / 플랜 변경 반영)
+INTERNAL_PRINCIPAL_TTL = int(os.getenv("INTERNAL_PRINCIPAL_TTL", "300"))
+
+# 배치 사용량 기록
+USAGE_BATCH_SIZE = int(os.getenv("USAGE_BATCH_SIZE", "100"))
+USAGE_FLUSH_INTERVAL = float(os.getenv("USAGE_FLUSH_INTERVAL", "5"))
+USAGE_QUEUE_MAX = int(os.getenv("USAGE_QUEUE_MAX", "50000"))
+
+
+class InternalTransportUnavailable(Exception):
+    """내부 호출 불가 (B2C 키 미설정 / 이벤트 루프 워커 스레드 밖) → HTTP 경로로 대체"""
+
+
+# ==================== AI 서비스 호출 ====================
+
+ai_pool = ReplicaPool(
+    "ai",
+    AI_SERVICE_URLS,
+    probe_interval=AI_POOL_PROBE_INTERVAL,
+    failure_threshold=AI_POOL_FAILURE_THRESHOLD,
+    open_seconds=AI_POOL_OPEN_SECONDS,
+    eject_p99_ms=AI_POOL_EJECT_P99_MS or None,
+    eject_seconds=AI_POOL_EJECT_SECONDS
+)
+ai_hedge = HedgePolicy(
+    "ai",
+    budget_ratio=AI_HEDGE_BUDGET,
+    quantile=AI_HEDGE_QUANTILE,
+    min_delay_ms=AI_HEDGE_MIN_DELAY_MS
+)
+
+
+def _no_replica_error() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail={
+            "code": "AI_SERVICE_UNAVAILABLE",
+            "message": "AI recommendation service is temporarily unavailable"
+        }
+    )
+
+
+def _transport_error(e: httpx.HTTPError) -> HTTPException:
+    """httpx 예외 → 504 (타임아웃) / 503 (연결 실패)"""
+    if isinstance(e, httpx.TimeoutException):
+        return HTTPException(
+            status_code=504,
+            detail={
+                "code": "AI_SERVICE_TIMEOUT",
+                "message": "AI service request timed out"
+            }
+        )
+    return HTTPException(
+        status_code=503,
+        detail={
+            "code": "AI_SERVICE_ERROR",
+            "message": "Failed to connect to AI service"
+        }
+    )
+
+
+def _invalid_response_error() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail={
+            "code": "AI_SERVICE_ERROR",
+            "message": "Invalid response from AI service"
+        }
+    )
+
+
+async def _attempt(path: str, payload: Dict[str, Any], headers: Optional[dict], attempted: list) -> httpx.Response:
+    """
+    least-outstanding 복제본에 POST 1회 (attempted에 있는 복제본 제외)
+
+    연결 실패(요청이 전송되지 않음)는 다른 복제본으로 한 번 더 시도
+    선택 가능한 복제본이 없으면(모두 브레이커 open) 기다리지 않고 즉시 503
+    """
+    client = http_clients.get_async("ai")
+    tries = 0
+    while True:
+        replica = ai_pool.choose(exclude=attempted)
+        if replica is None:
+            raise _no_replica_error()
+        attempted.append(replica)
+        tries += 1
+
+        started = ai_pool.begin(replica)
+        ok = False
+        cancelled = False
+        try:
+            response = await client.post(f"{replica.url}{path}", json=payload, headers=headers)
+            ok = response.status_code < 500
+            if ok:
+                ai_hedge.record_latency(path, (time.monotonic() - started) * 1000)
+            return response
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        except (httpx.ConnectError, httpx.ConnectTimeout):
+            if tries >= min(2, len(ai_pool.replicas)):
+                raise
+        finally:
+            if cancelled:
+                ai_pool.cancel(replica)
+            else:
+                ai_pool.complete(replica, started, ok)
+
+
+async def _post_to_pool(path: str, payload: Dict[str, Any], headers: Optional[dict]) -> httpx.Response:
+    """
+    AI 복제본 풀에 POST (AI_HEDGE_ENABLED면 hedged request)
+
+    첫 시도가 경로별 p95 안에 응답하지 않고 예산이 남아 있으면 다른 복제본에 한 번 더 보내고
+    먼저 성공한(5xx가 아닌) 응답 사용, 진 쪽은 취소
+    """
+    attempted = []
+    if not AI_HEDGE_ENABLED or len(ai_pool.replicas) < 2:
+        return await _attempt(path, payload, headers, attempted)
+
+    ai_hedge.on_request()
+    delay = ai_hedge.delay(path)
+    primary = asyncio.ensure_future(_attempt(path, payload, headers, attempted))
+    tasks = {primary: False}
+    try:
+        if delay is not None:
+            await asyncio.wait({primary}, timeout=delay)
+        if primary.done() or delay is None or not ai_hedge.try_acquire():
+            return await primary
+
+        tasks[asyncio.ensure_future(_attempt(path, payload, headers, attempted))] = True
+        pending = set(tasks)
+        failed = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None and task.result().status_code < 500:
+                    ai_hedge.record_win(tasks[task])
+                    return task.result()
+                failed = task
+        return failed.result()  # 둘 다 실패 - 마지막 실패(예외 또는 5xx 응답) 전달
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def forward_to_ai(path: str, payload: Dict[str, Any], headers: Optional[dict] = None) -> dict:
+    """
+    AI 서비스 호출 (복제본 풀)
+
+    Raises:
+        HTTPException: 503 (AI 서비스 오류/연결 실패/사용 가능한 복제본 없음), 504 (타임아웃)
+    """
+    try:
+        ai_response = await _post_to_pool(path, payload, wire.request_headers(headers))
+    except (httpx.TimeoutException, httpx.RequestError) as e:
+        raise _transport_error(e)
+
+    if ai_response.status_code != 200:
+        raise _no_replica_error()
+
+    # AI_WIRE_FORMAT=msgpack: compact 응답을 카탈로그 캐시로 채워 JSON 응답과 같은 dict로
+    if wire.is_compact(ai_response):
+        return await wire.decode(ai_response)
+    return ai_response.json()
+
+
+async def stream_from_ai(path: str, payload: Dict[str, Any]) -> AsyncIterator[dict]:
+    """
+    AI 서비스 NDJSON 스트리밍 호출 (복제본 풀, 재시도 / hedge 없음)
+
+    AI 서비스 프레임(ai/wire.py)을 dict로 하나씩 반환: track(track_a, track_b) → meta 또는 error
+    NDJSON을 지원하지 않는 AI 서비스(JSON 응답)는 같은 프레임으로 나눠서 반환
+
+    마지막 프레임은 항상 meta 또는 error - 깨진 줄 / meta 없이 끝난 스트림은 503
+    복제본 풀 집계: meta로 끝나면 성공, error 프레임 / 깨진 스트림은 실패, 마지막 프레임 전 중단은 취소
+
+    Raises:
+        HTTPException: 503 / 504 (forward_to_ai와 동일) - 첫 프레임 전에 발생하면 일반 오류 응답 가능
+    """
+    replica = ai_pool.choose()
+    if replica is None:
+        raise _no_replica_error()
+
+    client = http_clients.get_async("ai")
+    started = ai_pool.begin(replica)
+    ok = False
+    finished = False  # 마지막 프레임(meta / error)까지 받음 → 이후 aclose()는 취소가 아님
+    cancelled = False
+    try:
+        async with client.stream(
+            "POST", f"{replica.url}{path}", json=payload, headers={"Accept": wire.NDJSON_MEDIA_TYPE}
+        ) as response:
+            if response.status_code != 200:
+                ok = response.status_code < 500
+                raise _no_replica_error()
+
+            if response.headers.get("content-type", "").startswith(wire.NDJSON_MEDIA_TYPE):
+                async for line in response.aiter_lines():
+                    if line:
+                        frame = json.loads(line)
+                        if not isinstance(frame, dict):
+                            raise _invalid_response_error()
+                        # 결과는 마지막 프레임을 넘기기 전에 결정 (소비자가 받자마자 aclose()할 수 있음)
+                        if frame.get("type") in ("meta", "error"):
+                            finished = True
+                            ok = frame["type"] == "meta"
+                        yield frame
+                        if finished:
+                            break
+                if not finished:
+                    raise _invalid_response_error()
+            else:
+                result = json.loads(await response.aread())
+                if not isinstance(result, dict):
+                    raise _invalid_response_error()
+                for track in ("track_a", "track_b"):
+                    yield {"type": "track", "track": track, "data": result.get(track)}
+                finished = ok = True
+                yield {"type": "meta", "elapsed_time": result.get("elapsed_time", 0), "reserve": result.get("reserve")}
+    except (httpx.TimeoutException, httpx.RequestError) as e:
+        raise _transport_error(e)
+    except ValueError:
+        # JSON이 아닌 줄
+        raise _invalid_response_error()
+    except (asyncio.CancelledError, GeneratorExit):
+        # 마지막 프레임 전 클라이언트 연결 종료 → 스트림 중단 (복제본 장애로 집계하지 않음)
+        cancelled = not finished
+        raise
+    finally:
+        if cancelled:
+            ai_pool.cancel(replica)
+        else:
+            ai_pool.complete(replica, started, ok)
+
+
+# ==================== 사용량 기록 ====================
+
+class UsageBatcher(WriteBehindQueue):
+    """
+    호출 로그(ApiLog) 배치 기록기 (External API / B2C 내부 호출 공용)
+
+    - record()는 메모리 큐에 추가만 함 (요청 경로에서 DB 왕복 / 커밋 없음)
+    - USAGE_BATCH_SIZE건이 쌓이거나 USAGE_FLUSH_INTERVAL초마다 백그라운드 스레드가 다건 INSERT
+    - 일별 집계(ApiUsage)는 usage_counter (Redis 카운터 → ON CONFLICT upsert)
+    - 종료 시 write_behind.stop_all() (main.py lifespan)
+    """
+
+    def record(self, key_id: int, endpoint: str, status_code: int, process_time_ms: int):
+        self.submit({
+            "key_id": key_id,
+            "endpoint": endpoint,
+            "status_code": status_code,
+            "process_time_ms": process_time_ms,
+            "created_at": datetime.utcnow()
+        })
+
+    def write_batch(self, db: Session, logs: List[dict]):
+        db.execute(insert(ApiLog), logs)
+
+
+usage_batcher = UsageBatcher(
+    "api_usage",
+    batch_size=USAGE_BATCH_SIZE,
+    flush_interval=USAGE_FLUSH_INTERVAL,
+    max_size=USAGE_QUEUE_MAX,
+    overflow="drop_oldest"
+)
+
+
+async def record_usage(key_id: int, endpoint: str, status_code: int, process_time_ms: int, count: int = 1):
+    """호출 count건 기록 (배치 요청은 항목 수) - 로그는 배치 큐, 일별 집계는 Redis 카운터"""
+    for _ in range(count):
+        usage_batcher.record(key_id, endpoint, status_code, process_time_ms)
+    await usage_counter.incr(key_id, status_code, count)
+
+
+# ==================== 내부 principal ====================
+
+# B2C 키 principal (키 없음 / 비활성도 None으로 캐시 → TTL 동안 재조회하지 않음)
+_internal_principal_cache = TTLCache("internal_principal", maxsize=1, ttl=INTERNAL_PRINCIPAL_TTL, cache_none=True)
+
+
+def _load_internal_principal() -> Optional[ApiPrincipal]:
+    """B2C_API_KEY로 키 / 회사 플랜 조회 (verify_api_key와 같은 기준)"""
+    raw_key = os.getenv("B2C_API_KEY", "")
+    if not raw_key:
+        return None
+
+    hashed_key = hashlib.sha256(raw_key.encode()).hexdigest()
+    db = SessionLocal()
+    try:
+        api_key = db.query(ApiKey).filter(
+            ApiKey.access_key == hashed_key,
+            ApiKey.is_active == True
+        ).first()
+        if not api_key:
+            print("[Gateway] B2C_API_KEY is invalid or inactive")
+            return None
+
+        company = db.query(Company).filter(Company.company_id == api_key.company_id).first()
+        daily_limit = PLAN_LIMITS.get(company.plan_type, 1000) if company else api_key.daily_limit
+        return ApiPrincipal(
+            api_key.key_id, api_key.company_id, daily_limit, internal=True,
+            plan_type=company.plan_type if company else None,
+            is_admin=bool(company and company.is_admin)
+        )
+    finally:
+        db.close()
+
+
+def get_internal_principal() -> Optional[ApiPrincipal]:
+    """B2C 내부 호출용 principal (INTERNAL_PRINCIPAL_TTL초 캐시)"""
+    try:
+        return _internal_principal_cache.get_or_load("b2c", _load_internal_principal)
+    except Exception as e:
+        print(f"[Gateway] Internal principal lookup failed: {e}")
+        _internal_principal_cache.set("b2c", None)  # 다음 TTL까지 HTTP 경로 사용
+        return None
+
+
+async def get_internal_principal_async() -> Optional[ApiPrincipal]:
+    """async 경로용 - 캐시가 유효하면 바로 반환, 재조회(TTL 만료)만 스레드풀에서 실행"""
+    hit, principal = _internal_principal_cache.lookup("b2c")
+    if hit:
+        return principal
+    return await anyio.to_thread.run_sync(get_internal_principal)
+
+
+# ==================== 내부 호출 ====================
+
+async def call_internal(principal: ApiPrincipal, endpoint: str, payload: Dict[str, Any]) -> dict:
+    """
+    인증 완료 principal로 External API 로직 실행
+
+    - Rate Limit 체크는 HTTP 경로와 동일 (한도 초과 시 429, 로그 미기록)
+    - 사용량은 record_usage()로 기록
+
+    Args:
+        endpoint: "/v1/recommend" 또는 "/v1/recommend_single"
+    """
+    await enforce_rate_limit(principal)
+
+    start_time = time.time()
+    status_code = 200
+    try:
+        return await forward_to_ai(endpoint[len("/v1"):], payload)
+    except HTTPException as e:
+        status_code = e.status_code
+        raise
+    finally:
+        await record_usage(principal.key_id, endpoint, status_code, int((time.time() - start_time) * 1000))
+
+
+def _in_worker_thread() -> bool:
+    """
+    anyio 워커 스레드(이벤트 루프로 돌아갈 수 있는 스레드)인지
+
+    anyio.from_thread.run()이 같은 스레드 로컬 토큰으로 판별 (anyio 4.x 공통)
+    → 호출 전에 확인해야 call_internal 안에서 난 RuntimeError와 구분됨
+    """
+    return hasattr(anyio.from_thread.threadlocals, "current_token")
+
+
+def call_internal_from_thread(endpoint: str, payload: Dict[str, Any]) -> dict:
+    """
+    동기 코드(B2C sync 엔드포인트의 스레드풀)에서 call_internal 실행
+
+    한도 차감 / AI 호출이 시작된 뒤의 오류는 그대로 전파 (HTTP 경로로 다시 보내면 이중 차감)
+
+    Raises:
+        InternalTransportUnavailable: B2C 키 없음 / 이벤트 루프 워커 스레드가 아님 (호출 전에만)
+        HTTPException: 한도 초과, AI 서비스 오류
+    """
+    if not _in_worker_thread():
+        raise InternalTransportUnavailable("Not running in an event loop worker thread")
+
+    principal = get_internal_principal()
+    if principal is None:
+        raise InternalTransportUnavailable("B2C_API_KEY is not set or inactive")
+
+    return anyio.from_thread.run(call_internal, principal, endpoint, payload)
@@ -0,0 +1,209 @@
+"""
+External API 멱등성 키 (Idempotency-Key 헤더)
+
+파트너 SDK는 타임아웃 시 같은 요청을 재시도 → 재시도마다 한도 차감 / 사용량 기록 / AI 재계산
+Idempotency-Key를 보내면 (API 키 + 엔드포인트별로 구분)
+1. 처음 요청: Redis에 처리 중 표시 (SET NX, IDEMPOTENCY_LOCK_TTL초) → 한도 차감 + AI 호출
+   → 성공 응답(본문 + X-RateLimit-* 헤더)을 IDEMPOTENCY_TTL초 동안 저장
+2. 처리 중에 같은 키로 들어온 요청
+   - 같은 워커: 처음 요청의 Future를 기다림 (Redis 폴링 없음)
+   - 다른 워커: 완료 응답이 저장될 때까지 Redis 폴링 (최대 IDEMPOTENCY_WAIT초, 넘으면 409)
+3. 완료 후 재시도: 저장된 응답 그대로 반환 (한도 차감 / 사용량 기록 / AI 호출 없음, Idempotent-Replayed: true)
+
+- 본문이 다른 요청에 같은 키를 재사용하면 422 (요청 본문 해시 비교)
+- 실패 응답(4xx / 5xx)은 저장하지 않음 → 처리 중 표시 삭제, 재시도하면 다시 처리
+- 처리 중 워커가 죽으면 IDEMPOTENCY_LOCK_TTL초 뒤 표시가 만료되어 다시 처리 가능
+- Redis 장애 시 멱등성 없이 처리 (fail-open)
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Response
+
+from backend.core.rate_limit import get_redis
+
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", "600"))  # 완료 응답 보관 (초)
+IDEMPOTENCY_LOCK_TTL = int(os.getenv("IDEMPOTENCY_LOCK_TTL", "60"))  # 처리 중 표시 (AI_HTTP_READ_TIMEOUT보다 길게)
+IDEMPOTENCY_WAIT = float(os.getenv("IDEMPOTENCY_WAIT", "30"))  # 처리 중인 같은 키 대기 (초)
+IDEMPOTENCY_POLL_INTERVAL = 0.05  # 다른 워커가 처리 중일 때 Redis 조회 간격 (초)
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# 처리 중 표시가 아직 내 것일 때만 삭제 (만료 후 다른 요청이 잡은 표시는 유지)
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+_release_script = None
+
+# 이 워커에서 처리 중인 키 → (본문 해시, 완료 시 저장 레코드 / 실패 시 None을 받는 Future)
+_inflight: Dict[str, Tuple[str, asyncio.Future]] = {}
+
+
+def _fingerprint(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def _error(status_code: int, code: str, message: str) -> HTTPException:
+    return HTTPException(status_code=status_code, detail={"code": code, "message": message})
+
+
+class IdempotentRequest:
+    """
+    Idempotency-Key 요청 1건 (begin() 결과)
+
+    - replay가 있으면 replay_response()를 그대로 반환
+    - 없으면 처리 후 complete(response), 실패 / 예외 경로에서는 release() (완료 후에는 무시)
+    - 헤더가 없으면 모든 메서드가 아무것도 하지 않음
+    """
+
+    def __init__(self, redis_key: Optional[str] = None, fingerprint: Optional[str] = None):
+        self.redis_key = redis_key
+        self.fingerprint = fingerprint
+        self.replay: Optional[dict] = None  # 저장된 응답 {"fingerprint", "body", "headers"}
+        self.token: Optional[str] = None  # 내가 잡은 처리 중 표시 값 (release용)
+        self.done = False
+        self._future: Optional[asyncio.Future] = None
+
+    def replay_response(self) -> Response:
+        return Response(
+            content=self.replay["body"],
+            media_type="application/json",
+            headers={**self.replay["headers"], REPLAYED_HEADER: "true"}
+        )
+
+    async def complete(self, response: Response) -> Response:
+        """성공 응답 저장 + 같은 워커에서 기다리는 요청에 전달"""
+        if self.redis_key is None or self.done:
+            return response
+        self.done = True
+        record = {
+            "state": "done",
+            "fingerprint": self.fingerprint,
+            "body": response.body.decode("utf-8"),
+            "headers": {k: v for k, v in response.headers.items() if k.startswith("x-ratelimit-")}
+        }
+        try:
+            redis = await get_redis()
+            await redis.set(self.redis_key, json.dumps(record, ensure_ascii=False), ex=IDEMPOTENCY_TTL)
+        except Exception as e:
+            print(f"[Idempotency] Redis store failed: {e}")
+        self._resolve(record)
+        return response
+
+    async def release(self):
+        """처리 중 표시 삭제 (실패 응답은 저장하지 않음 → 재시도 시 다시 처리)"""
+        global _release_script
+        if self.redis_key is None or self.done:
+            return
+        self.done = True
+        if self.token is not None:
+            try:
+                redis = await get_redis()
+                if _release_script is None:
+                    _release_script = redis.register_script(_RELEASE_SCRIPT)
+                await _release_script(keys=[self.redis_key], args=[self.token])
+            except Exception as e:
+                print(f"[Idempotency] Redis release failed: {e}")
+        self._resolve(None)
+
+    def _resolve(self, record: Optional[dict]):
+        if self._future is None:
+            return
+        if _inflight.get(self.redis_key, (None, None))[1] is self._future:
+            del _inflight[self.redis_key]
+        if not self._future.done():
+            self._future.set_result(record)
+
+    async def _acquire(self):
+        """처리 중 표시를 잡거나(self.token) 저장된 응답을 찾을 때까지 (self.replay)"""
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT
+        while True:
+            # 같은 워커에서 처리 중 → Future 대기
+            entry = _inflight.get(self.redis_key)
+            if entry is not None:
+                self._check_fingerprint(entry[0])
+                try:
+                    record = await asyncio.wait_for(
+                        asyncio.shield(entry[1]), max(0.0, deadline - time.monotonic())
+                    )
+                except asyncio.TimeoutError:
+                    raise self._in_progress()
+                if record is not None:
+                    self.replay = record
+                    return
+                continue  # 처음 요청 실패 → 다시 시도 (이 요청이 처리할 수 있음)
+
+            try:
+                redis = await get_redis()
+                token = json.dumps({"state": "pending", "fingerprint": self.fingerprint, "id": uuid.uuid4().hex})
+                if await redis.set(self.redis_key, token, nx=True, ex=IDEMPOTENCY_LOCK_TTL):
+                    # 이 워커의 다음 같은 키 요청은 Redis 대신 이 Future를 기다림
+                    self.token = token
+                    self._future = asyncio.get_running_loop().create_future()
+                    _inflight[self.redis_key] = (self.fingerprint, self._future)
+                    return
+                raw = await redis.get(self.redis_key)
+            except Exception as e:
+                print(f"[Idempotency] Redis unavailable, processing without idempotency: {e}")
+                return
+            # 같은 워커가 await 사이에 처리 중 표시를 잡았으면 Future로 대기
+            if self.redis_key in _inflight:
+                continue
+
+            if raw is not None:
+                record = json.loads(raw)
+                self._check_fingerprint(record["fingerprint"])
+                if record["state"] == "done":
+                    self.replay = record
+                    return
+            if time.monotonic() >= deadline:
+                raise self._in_progress()
+            await asyncio.sleep(IDEMPOTENCY_POLL_INTERVAL)
+
+    def _check_fingerprint(self, fingerprint: str):
+        if fingerprint != self.fingerprint:
+            raise _error(
+                422, "IDEMPOTENCY_KEY_REUSED",
+                "Idempotency-Key was already used with a different request body"
+            )
+
+    def _in_progress(self) -> HTTPException:
+        return _error(
+            409, "IDEMPOTENCY_IN_PROGRESS",
+            "A request with this Idempotency-Key is still being processed"
+        )
+
+
+async def begin(api_key_id: int, path: str, key: Optional[str], payload: Any) -> IdempotentRequest:
+    """
+    Idempotency-Key 요청 시작 (키 없으면 비활성 IdempotentRequest)
+
+    Args:
+        api_key_id: 호출한 API 키 (키 공간은 API 키 + 엔드포인트별)
+        path: 엔드포인트 경로
+        key: Idempotency-Key 헤더 값
+        payload: 요청 본문 (같은 키에 다른 본문이면 422)
+
+    Raises:
+        HTTPException: 400 (키 형식), 409 (처리 중 대기 시간 초과), 422 (다른 본문으로 재사용)
+    """
+    if key is None:
+        return IdempotentRequest()
+    if not 0 < len(key) <= IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise _error(
+            400, "INVALID_IDEMPOTENCY_KEY",
+            f"Idempotency-Key must be 1 to {IDEMPOTENCY_KEY_MAX_LENGTH} characters"
+        )
+
+    request = IdempotentRequest(f"idempotency:{api_key_id}:{path}:{key}", _fingerprint(payload))
+    await request._acquire()
+    return request
@@ -0,0 +1,185 @@
+"""
+API 키 조회 캐시 (External API 인증 경로에서 DB 조회 제거)
+
+키 해시 → {key_id, company_id, plan_type, is_admin, is_active}
+
+조회 순서
+1. 워커 로컬 LRU (utils.cache.TTLCache, API_KEY_LOCAL_TTL초)
+2. Redis api_key:{hash} (API_KEY_CACHE_TTL초, 모든 워커 공유)
+3. DB (키 + 회사 조인 1회) → Redis / 로컬에 저장
+
+- 비활성 키도 캐시 (반복되는 비활성 키 호출도 DB까지 가지 않음), 존재하지 않는 키는 캐시하지 않음
+  (임의 키로 캐시를 채우는 것 방지)
+- 키 비활성화 / 활성화 / 삭제 커밋 후 invalidate_key(), 회사 삭제 커밋 후 invalidate_keys()
+  (회사 정보 수정은 이름 / 이메일만 바꿈 → 캐시 항목에 없으므로 무효화 불필요)
+  - Redis 항목 삭제 + 버전 증가 + api_key_invalidate 채널 발행 → 각 워커가 로컬 항목 삭제
+  - 버전: 무효화 직전에 DB에서 읽은 이전 값이 Redis에 다시 저장되지 않게 함 (저장 시 버전 비교)
+  - 발행을 놓쳐도(구독 재연결 등) 로컬 항목은 API_KEY_LOCAL_TTL초 안에 만료
+- Redis 장애 / REDIS_URL 미설정 시 로컬 캐시 + DB 조회 (fail-open)
+"""
+import json
+import os
+import threading
+import time
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.rate_limit import get_redis
+from backend.utils.cache import TTLCache
+from backend.utils.redis import get_redis_client
+from .models import ApiKey, Company
+
+API_KEY_CACHE_TTL = int(os.getenv("API_KEY_CACHE_TTL", "600"))  # Redis, 10분
+API_KEY_LOCAL_TTL = int(os.getenv("API_KEY_LOCAL_TTL", "30"))  # 워커 로컬, 무효화 발행 유실 시 최대 지연
+API_KEY_LOCAL_SIZE = int(os.getenv("API_KEY_LOCAL_SIZE", "10000"))
+
+INVALIDATE_CHANNEL = "api_key_invalidate"
+
+_local = TTLCache("api_keys", maxsize=API_KEY_LOCAL_SIZE, ttl=API_KEY_LOCAL_TTL)
+
+# 버전이 조회 시점과 같을 때만 저장 (그 사이 무효화됐으면 저장하지 않음)
+_PUT_IF_VERSION_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '') == ARGV[2] then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+def _key(hashed_key: str) -> str:
+    return f"api_key:{hashed_key}"
+
+
+def _version_key(hashed_key: str) -> str:
+    return f"api_key_ver:{hashed_key}"
+
+
+def _redis_enabled() -> bool:
+    return bool(os.getenv("REDIS_URL"))
+
+
+# ==================== 조회 ====================
+
+async def _load(db: AsyncSession, hashed_key: str) -> Optional[dict]:
+    """키 + 회사 조회 (is_active 조건 없이, 비활성 여부도 캐시)"""
+    result = await db.execute(
+        select(
+            ApiKey.key_id,
+            ApiKey.company_id,
+            ApiKey.is_active,
+            Company.plan_type,
+            Company.is_admin
+        )
+        .outerjoin(Company, Company.company_id == ApiKey.company_id)
+        .where(ApiKey.access_key == hashed_key)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    return {
+        "key_id": row.key_id,
+        "company_id": row.company_id,
+        "plan_type": row.plan_type,
+        "is_admin": bool(row.is_admin),
+        "is_active": bool(row.is_active),
+    }
+
+
+async def resolve(db: AsyncSession, hashed_key: str) -> Optional[dict]:
+    """키 해시 → 캐시된 키 정보 (없는 키면 None)"""
+    _ensure_listener()
+
+    hit, record = _local.lookup(hashed_key)
+    if hit:
+        return record
+
+    redis = None
+    version = ""
+    if _redis_enabled():
+        try:
+            redis = await get_redis()
+            cached, version = await redis.mget(_key(hashed_key), _version_key(hashed_key))
+            version = version or ""
+            if cached is not None:
+                record = json.loads(cached)
+                _local.set(hashed_key, record)
+                return record
+        except Exception as e:
+            print(f"[KeyCache] Redis get failed: {e}")
+            redis = None
+
+    record = await _load(db, hashed_key)
+    if record is None:
+        return None
+
+    if redis is not None:
+        try:
+            stored = await redis.eval(
+                _PUT_IF_VERSION_SCRIPT, 2, _key(hashed_key), _version_key(hashed_key),
+                json.dumps(record), version, API_KEY_CACHE_TTL
+            )
+            if not stored:
+                return record  # 조회 중 무효화됨 - 이번 요청만 사용하고 캐시하지 않음
+        except Exception as e:
+            print(f"[KeyCache] Redis put failed: {e}")
+    _local.set(hashed_key, record)
+    return record
+
+
+# ==================== 무효화 ====================
+
+def invalidate_key(hashed_key: str):
+    """키 변경 커밋 후 호출 (모든 워커에서 즉시 반영)"""
+    invalidate_keys([hashed_key])
+
+
+def invalidate_keys(hashed_keys: List[str]):
+    for hashed_key in hashed_keys:
+        _local.delete(hashed_key)
+    if not hashed_keys or not _redis_enabled():
+        return
+
+    try:
+        pipe = get_redis_client().pipeline()
+        for hashed_key in hashed_keys:
+            pipe.delete(_key(hashed_key))
+            pipe.incr(_version_key(hashed_key))
+            pipe.expire(_version_key(hashed_key), API_KEY_CACHE_TTL)
+            pipe.publish(INVALIDATE_CHANNEL, hashed_key)
+        pipe.execute()
+    except Exception as e:
+        print(f"[KeyCache] Invalidate failed ({len(hashed_keys)} keys): {e}")
+
+
+# ==================== 워커 간 무효화 구독 ====================
+
+_listener: Optional[threading.Thread] = None
+_listener_lock = threading.Lock()
+
+
+def _listen():
+    while True:
+        try:
+            pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATE_CHANNEL)
+            # (재)구독 전에 발행된 무효화는 받지 못함 → 로컬 캐시 비움
+            _local.clear()
+            for message in pubsub.listen():
+                if message.get("type") == "message":
+                    _local.delete(message["data"])
+        except Exception as e:
+            print(f"[KeyCache] Invalidation listener error, reconnecting: {e}")
+            time.sleep(1)
+
+
+def _ensure_listener():
+    global _listener
+    if _listener is not None or not _redis_enabled():
+        return
+    with _listener_lock:
+        if _listener is None:
+            _listener = threading.Thread(target=_listen, name="api-key-invalidation", daemon=True)
+            _listener.start()
@@ -5,7 +5,7 @@ B2B 도메인 SQLAlchemy 모델
 from datetime import datetime
 from sqlalchemy import (
     Column, Integer, BigInteger, String, Boolean, Date,
-    DateTime, ForeignKey, Text
+    DateTime, ForeignKey, Text, UniqueConstraint
 )
 from sqlalchemy.orm import relationship
 from backend.core.db import Base
@@ -53,9 +53,12 @@ class ApiKey(Base):
 
 
 class ApiUsage(Base):
-    """일별 사용량 집계 테이블"""
+    """일별 사용량 집계 테이블 (usage_counter가 ON CONFLICT로 누적)"""
     __tablename__ = "api_usage"
-    __table_args__ = {"schema": "b2b"}
+    __table_args__ = (
+        UniqueConstraint("key_id", "usage_date", name="uq_api_usage_key_date"),
+        {"schema": "b2b"},
+    )
 
     usage_id = Column(BigInteger, primary_key=True, autoincrement=True)
     key_id = Column(Integer, ForeignKey("b2b.api_keys.key_id", ondelete="CASCADE"))
@@ -5,7 +5,6 @@ B2B 도메인 서비스 레이어
 import os
 import secrets
 import hashlib
-import httpx
 import resend
 from datetime import datetime, timedelta, date
 from typing import List, Optional, Tuple
@@ -13,6 +12,8 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, and_
 from jose import jwt
 
+from backend.core.http_clients import http_clients
+from backend.domains.movie.ott_registry import get_user_provider_ids, ott_registry
 from backend.utils.password import hash_password, verify_password
 
 # Resend 설정
@@ -25,6 +26,7 @@ GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET", "")
 GITHUB_CLIENT_ID = os.getenv("GITHUB_CLIENT_ID", "")
 GITHUB_CLIENT_SECRET = os.getenv("GITHUB_CLIENT_SECRET", "")
+from . import key_cache
 from .models import Company, ApiKey, ApiLog, ApiUsage
 from .schemas import (
     CompanyRegister, CompanyResponse, ApiKeyCreate, ApiKeyResponse,
@@ -214,7 +216,8 @@ def delete_company(db: Session, company_id: int) -> bool:
     if not company:
         raise ValueError("회사를 찾을 수 없습니다")
 
-    # API 키 삭제 (CASCADE로 api_logs도 삭제됨)
+    # API 키 삭제 (CASCADE로 api_logs도 삭제됨), 인증 캐시는 커밋 후 무효화
+    hashed_keys = [row[0] for row in db.query(ApiKey.access_key).filter(ApiKey.company_id == company_id).all()]
     db.query(ApiKey).filter(ApiKey.company_id == company_id).delete()
 
     # api_usage 삭제
@@ -223,6 +226,7 @@ def delete_company(db: Session, company_id: int) -> bool:
     # 회사 삭제
     db.delete(company)
     db.commit()
+    key_cache.invalidate_keys(hashed_keys)
 
     return True
 
@@ -270,8 +274,10 @@ def deactivate_api_key(db: Session, company_id: int, key_id: int) -> bool:
     if not api_key:
         return False
 
+    hashed_key = api_key.access_key
     api_key.is_active = False
     db.commit()
+    key_cache.invalidate_key(hashed_key)
     return True
 
 
@@ -284,8 +290,10 @@ def activate_api_key(db: Session, company_id: int, key_id: int) -> bool:
     if not api_key:
         return False
 
+    hashed_key = api_key.access_key
     api_key.is_active = True
     db.commit()
+    key_cache.invalidate_key(hashed_key)
     return True
 
 
@@ -298,8 +306,10 @@ def delete_api_key(db: Session, company_id: int, key_id: int) -> bool:
     if not api_key:
         return False
 
+    hashed_key = api_key.access_key
     db.delete(api_key)
     db.commit()
+    key_cache.invalidate_key(hashed_key)
     return True
 
 
@@ -598,36 +608,36 @@ def get_recent_logs(
 async def google_oauth_callback(db: Session, code: str, redirect_uri: str) -> Tuple[Company, str]:
     """Google OAuth 콜백 처리"""
     # 1. code를 access token으로 교환
-    async with httpx.AsyncClient() as client:
-        token_response = await client.post(
-            "https://oauth2.googleapis.com/token",
-            data={
-                "code": code,
-                "client_id": GOOGLE_CLIENT_ID,
-                "client_secret": GOOGLE_CLIENT_SECRET,
-                "redirect_uri": redirect_uri,
-                "grant_type": "authorization_code",
-            },
-        )
+    client = http_clients.get_async("oauth")
+    token_response = await client.post(
+        "https://oauth2.googleapis.com/token",
+        data={
+            "code": code,
+            "client_id": GOOGLE_CLIENT_ID,
+            "client_secret": GOOGLE_CLIENT_SECRET,
+            "redirect_uri": redirect_uri,
+            "grant_type": "authorization_code",
+        },
+    )
 
-        if token_response.status_code != 200:
-            raise ValueError("Google 인증에 실패했습니다")
+    if token_response.status_code != 200:
+        raise ValueError("Google 인증에 실패했습니다")
 
-        token_data = token_response.json()
-        access_token = token_data.get("access_token")
+    token_data = token_response.json()
+    access_token = token_data.get("access_token")
 
-        # 2. access token으로 사용자 정보 조회
-        user_response = await client.get(
-            "https://www.googleapis.com/oauth2/v2/userinfo",
-            headers={"Authorization": f"Bearer {access_token}"},
-        )
+    # 2. access token으로 사용자 정보 조회
+    user_response = await client.get(
+        "https://www.googleapis.com/oauth2/v2/userinfo",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
 
-        if user_response.status_code != 200:
-            raise ValueError("Google 사용자 정보를 가져올 수 없습니다")
+    if user_response.status_code != 200:
+        raise ValueError("Google 사용자 정보를 가져올 수 없습니다")
 
-        user_data = user_response.json()
-        email = user_data.get("email")
-        name = user_data.get("name", email.split("@")[0])
+    user_data = user_response.json()
+    email = user_data.get("email")
+    name = user_data.get("name", email.split("@")[0])
 
     # 3. 기존 회원인지 확인
     company = db.query(Company).filter(Company.manager_email == email).first()
@@ -659,62 +669,62 @@ async def google_oauth_callback(db: Session, code: str, redirect_uri: str) -> Tu
 async def github_oauth_callback(db: Session, code: str, redirect_uri: str) -> Tuple[Company, str]:
     """GitHub OAuth 콜백 처리"""
     # 1. code를 access token으로 교환
-    async with httpx.AsyncClient() as client:
-        token_response = await client.post(
-            "https://github.com/login/oauth/access_token",
-            data={
-                "code": code,
-                "client_id": GITHUB_CLIENT_ID,
-                "client_secret": GITHUB_CLIENT_SECRET,
-                "redirect_uri": redirect_uri,
-            },
-            headers={"Accept": "application/json"},
-        )
+    client = http_clients.get_async("oauth")
+    token_response = await client.post(
+        "https://github.com/login/oauth/access_token",
+        data={
+            "code": code,
+            "client_id": GITHUB_CLIENT_ID,
+            "client_secret": GITHUB_CLIENT_SECRET,
+            "redirect_uri": redirect_uri,
+        },
+        headers={"Accept": "application/json"},
+    )
+
+    if token_response.status_code != 200:
+        raise ValueError("GitHub 인증에 실패했습니다")
 
-        if token_response.status_code != 200:
-            raise ValueError("GitHub 인증에 실패했습니다")
+    token_data = token_response.json()
+    access_token = token_data.get("access_token")
 
-        token_data = token_response.json()
-        access_token = token_data.get("access_token")
+    if not access_token:
+        error = token_data.get("error_description", "알 수 없는 오류")
+        raise ValueError(f"GitHub 인증 실패: {error}")
 
-        if not access_token:
-            error = token_data.get("error_description", "알 수 없는 오류")
-            raise ValueError(f"GitHub 인증 실패: {error}")
+    # 2. access token으로 사용자 정보 조회
+    user_response = await client.get(
+        "https://api.github.com/user",
+        headers={
+            "Authorization": f"Bearer {access_token}",
+            "Accept": "application/vnd.github.v3+json",
+        },
+    )
+
+    if user_response.status_code != 200:
+        raise ValueError("GitHub 사용자 정보를 가져올 수 없습니다")
+
+    user_data = user_response.json()
 
-        # 2. access token으로 사용자 정보 조회
-        user_response = await client.get(
-            "https://api.github.com/user",
+    # 이메일 가져오기 (public이 아닐 수 있음)
+    email = user_data.get("email")
+    if not email:
+        # 이메일 API 별도 호출
+        email_response = await client.get(
+            "https://api.github.com/user/emails",
             headers={
                 "Authorization": f"Bearer {access_token}",
                 "Accept": "application/vnd.github.v3+json",
             },
         )
+        if email_response.status_code == 200:
+            emails = email_response.json()
+            primary_email = next((e for e in emails if e.get("primary")), None)
+            email = primary_email.get("email") if primary_email else None
 
-        if user_response.status_code != 200:
-            raise ValueError("GitHub 사용자 정보를 가져올 수 없습니다")
-
-        user_data = user_response.json()
-
-        # 이메일 가져오기 (public이 아닐 수 있음)
-        email = user_data.get("email")
-        if not email:
-            # 이메일 API 별도 호출
-            email_response = await client.get(
-                "https://api.github.com/user/emails",
-                headers={
-                    "Authorization": f"Bearer {access_token}",
-                    "Accept": "application/vnd.github.v3+json",
-                },
-            )
-            if email_response.status_code == 200:
-                emails = email_response.json()
-                primary_email = next((e for e in emails if e.get("primary")), None)
-                email = primary_email.get("email") if primary_email else None
-
-        if not email:
-            raise ValueError("GitHub 이메일을 가져올 수 없습니다. GitHub 설정에서 이메일을 공개로 설정해주세요.")
+    if not email:
+        raise ValueError("GitHub 이메일을 가져올 수 없습니다. GitHub 설정에서 이메일을 공개로 설정해주세요.")
 
-        name = user_data.get("name") or user_data.get("login", email.split("@")[0])
+    name = user_data.get("name") or user_data.get("login", email.split("@")[0])
 
     # 3. 기존 회원인지 확인
     company = db.query(Company).filter(Company.manager_email == email).first()
@@ -924,7 +934,6 @@ def get_b2c_users(
 def get_b2c_user_detail(db: Session, user_id: str) -> Optional[dict]:
     """B2C 사용자 상세 정보 조회 (어드민 전용)"""
     from backend.domains.user.models import User
-    from backend.domains.movie.models import OttProvider
     from uuid import UUID
 
     try:
@@ -936,15 +945,15 @@ def get_b2c_user_detail(db: Session, user_id: str) -> Optional[dict]:
     if not user:
         return None
 
-    # OTT 구독 정보 (로고 포함)
+    # OTT 구독 정보 (로고 포함) - provider 사전 사용 (구독마다 provider 조회하지 않음)
     ott_list = []
-    if hasattr(user, 'ott_subscriptions') and user.ott_subscriptions:
-        for sub in user.ott_subscriptions:
-            if sub.provider:
-                ott_list.append({
-                    "provider_name": sub.provider.provider_name,
-                    "logo_path": sub.provider.logo_path
-                })
+    for provider_id in get_user_provider_ids(db, str(user_uuid)):
+        provider = ott_registry.get(provider_id)
+        if provider:
+            ott_list.append({
+                "provider_name": provider["provider_name"],
+                "logo_path": provider["logo_path"]
+            })
 
     # 추천 횟수 (b2c.recommendation_sessions에서 조회)
     from sqlalchemy import text
@@ -1056,7 +1065,7 @@ def activate_b2c_user(db: Session, user_id: str) -> bool:
 def get_b2c_user_activities(db: Session, user_id: str, limit: int = 20) -> dict:
     """B2C 사용자 최근 활동 조회 (어드민 전용)"""
     from backend.domains.recommendation.models import RecommendationSession, UserMovieFeedback
-    from backend.domains.movie.models import Movie, OttProvider
+    from backend.domains.movie.models import Movie
     from uuid import UUID
     from sqlalchemy import text
 
@@ -1103,11 +1112,7 @@ def get_b2c_user_activities(db: Session, user_id: str, limit: int = 20) -> dict:
             if ":" in feedback_type:
                 try:
                     provider_id = int(feedback_type.split(":")[1])
-                    provider = db.query(OttProvider).filter(
-                        OttProvider.provider_id == provider_id
-                    ).first()
-                    if provider:
-                        ott_name = provider.provider_name
+                    ott_name = ott_registry.name(provider_id) or ott_name
                 except (ValueError, IndexError):
                     pass
             description = f"'{movie_title}' {ott_name} 링크 클릭"
@@ -1140,7 +1145,7 @@ def get_b2c_user_activities(db: Session, user_id: str, limit: int = 20) -> dict:
 def get_b2c_live_activities(db: Session, limit: int = 15) -> dict:
     """B2C 전체 유저 실시간 활동 피드 (어드민 전용)"""
     from backend.domains.recommendation.models import RecommendationSession, UserMovieFeedback
-    from backend.domains.movie.models import Movie, OttProvider
+    from backend.domains.movie.models import Movie
     from backend.domains.user.models import User
 
     activities = []
@@ -1204,11 +1209,7 @@ def get_b2c_live_activities(db: Session, limit: int = 15) -> dict:
             if ":" in feedback_type:
                 try:
                     provider_id = int(feedback_type.split(":")[1])
-                    provider = db.query(OttProvider).filter(
-                        OttProvider.provider_id == provider_id
-                    ).first()
-                    if provider:
-                        ott_name = provider.provider_name
+                    ott_name = ott_registry.name(provider_id) or ott_name
                 except (ValueError, IndexError):
                     pass
             description = f"'{movie_title}' {ott_name} 클릭"
@@ -1311,7 +1312,7 @@ def get_unified_live_feed(db: Session, company_id: int, limit: int = 20) -> dict
     - 모든 시간은 KST로 통일하여 반환
     """
     from backend.domains.recommendation.models import RecommendationSession, UserMovieFeedback
-    from backend.domains.movie.models import Movie, OttProvider
+    from backend.domains.movie.models import Movie
     from backend.domains.user.models import User
 
     items = []
@@ -1426,11 +1427,7 @@ def get_unified_live_feed(db: Session, company_id: int, limit: int = 20) -> dict
                 if ":" in feedback_type:
                     try:
                         provider_id = int(feedback_type.split(":")[1])
-                        provider = db.query(OttProvider).filter(
-                            OttProvider.provider_id == provider_id
-                        ).first()
-                        if provider:
-                            ott_name = provider.provider_name
+                        ott_name = ott_registry.name(provider_id) or ott_name
                     except (ValueError, IndexError):
                         pass
                 description = f"'{movie_title}' {ott_name} 클릭"
@@ -0,0 +1,240 @@
+"""
+API 일별 사용량 카운터 (Redis 집계 → b2b.api_usage 주기적 upsert)
+
+요청 경로
+- incr(): Redis 파이프라인 1회 (HINCRBY api_usage:{날짜}:{key_id} {상태 클래스} 1 + dirty 집합 등록)
+  → DB 조회 / 커밋 없음, 워커가 여러 개여도 카운트 유실 없음
+
+백그라운드 (WriteBehindQueue 스레드, USAGE_COUNTER_FLUSH_INTERVAL초마다)
+- dirty 집합의 해시를 읽기만 함 (삭제하지 않음)
+- INSERT ... SELECT ... JOIN b2b.api_keys ... ON CONFLICT (key_id, usage_date) DO UPDATE로 누적
+  (database/migrations/b2b/004) → 집계 중 삭제된 API 키의 행은 버림 (FK 위반으로 전체 기록이 막히지 않음)
+- 커밋 후에 읽은 만큼 해시에서 차감 (0이 되면 삭제, Lua 1회) → 커밋 전에 죽어도 카운트 유실 없음
+- DB 기록 실패 시 Redis 해시는 그대로(다음 주기에 다시 읽음), 메모리 카운트는 보관했다가 다시 기록
+
+Redis 장애 / REDIS_URL 미설정 시 워커 메모리에 모아서 같은 방식으로 기록 (fail-open)
+request_count = 전체, error_count = 4xx + 5xx
+"""
+import os
+import threading
+import time
+from datetime import date, datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import Date, Integer, column, select, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from backend.core.db import SessionLocal
+from backend.core.rate_limit import get_redis
+from backend.core.write_behind import WriteBehindQueue
+from backend.utils.redis import get_redis_client
+from .models import ApiKey, ApiUsage
+
+USAGE_COUNTER_FLUSH_INTERVAL = float(os.getenv("USAGE_COUNTER_FLUSH_INTERVAL", "5"))
+USAGE_COUNTER_TTL = 7 * 86400  # 기록되지 못한 해시의 최대 보관 기간
+
+DIRTY_KEY = "api_usage:dirty"
+
+# 기록한 만큼 해시에서 차감, 모든 필드가 0이면 해시 삭제 + dirty 해제 (그 사이 증가분은 남음)
+# KEYS[1]: 해시, KEYS[2]: dirty 집합 / ARGV: 필드, 차감값, 필드, 차감값, ...
+_ACK_SCRIPT = """
+for i = 1, #ARGV, 2 do
+    redis.call('HINCRBY', KEYS[1], ARGV[i], -tonumber(ARGV[i + 1]))
+end
+for _, v in ipairs(redis.call('HVALS', KEYS[1])) do
+    if tonumber(v) ~= 0 then
+        return 0
+    end
+end
+redis.call('DEL', KEYS[1])
+redis.call('SREM', KEYS[2], KEYS[1])
+return 1
+"""
+
+
+def _hash_key(usage_date: date, key_id: int) -> str:
+    return f"api_usage:{usage_date.isoformat()}:{key_id}"
+
+
+def _parse_hash_key(hash_key: str) -> Tuple[date, int]:
+    _, usage_date, key_id = hash_key.split(":")
+    return date.fromisoformat(usage_date), int(key_id)
+
+
+def _status_class(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+def _redis_enabled() -> bool:
+    return bool(os.getenv("REDIS_URL"))
+
+
+class UsageCounter(WriteBehindQueue):
+    """
+    (key_id, 날짜, 상태 클래스)별 호출 수 집계기
+
+    큐 대신 Redis 해시 / 워커 메모리 카운터를 쓰므로 flush()를 재정의,
+    백그라운드 스레드 / stop_all() / stats_all()은 WriteBehindQueue 그대로 사용
+    """
+
+    def __init__(self, name: str, flush_interval: float = 5):
+        super().__init__(name, flush_interval=flush_interval)
+        # (key_id, 날짜) → [요청 수, 에러 수] - Redis 미사용 / 장애 / DB 실패분
+        self._pending: Dict[Tuple[int, date], List[int]] = {}
+        self._pending_lock = threading.Lock()
+        self._ack_script = None
+        self.redis_errors = 0
+
+    def _add_pending(self, key_id: int, usage_date: date, requests: int, errors: int):
+        with self._pending_lock:
+            bucket = self._pending.setdefault((key_id, usage_date), [0, 0])
+            bucket[0] += requests
+            bucket[1] += errors
+
+    async def incr(self, key_id: int, status_code: int, count: int = 1):
+        """호출 count건 집계 (요청 경로, Redis 왕복 1회)"""
+        self._ensure_started()
+        usage_date = datetime.utcnow().date()
+
+        if _redis_enabled():
+            try:
+                redis = await get_redis()
+                hash_key = _hash_key(usage_date, key_id)
+                pipe = redis.pipeline(transaction=False)
+                pipe.hincrby(hash_key, _status_class(status_code), count)
+                pipe.expire(hash_key, USAGE_COUNTER_TTL)
+                pipe.sadd(DIRTY_KEY, hash_key)
+                await pipe.execute()
+                return
+            except Exception as e:
+                self.redis_errors += 1
+                print(f"[UsageCounter] Redis incr failed, counting in memory: {e}")
+
+        self._add_pending(key_id, usage_date, count, count if status_code >= 400 else 0)
+
+    def _read_redis(self) -> Dict[str, Dict[str, int]]:
+        """dirty 해시 읽기 (삭제는 커밋 후 _ack_redis) - 해시 키 → {상태 클래스: 수}"""
+        client = get_redis_client()
+        hash_keys = list(client.smembers(DIRTY_KEY))
+        if not hash_keys:
+            return {}
+
+        pipe = client.pipeline(transaction=False)
+        for hash_key in hash_keys:
+            pipe.hgetall(hash_key)
+        results = pipe.execute()
+
+        collected = {}
+        for hash_key, counts in zip(hash_keys, results):
+            if not counts:
+                client.srem(DIRTY_KEY, hash_key)  # 만료된 해시
+                continue
+            collected[hash_key] = {k: int(v) for k, v in counts.items()}
+        return collected
+
+    def _ack_redis(self, collected: Dict[str, Dict[str, int]]):
+        """커밋된 만큼 해시에서 차감"""
+        client = get_redis_client()
+        if self._ack_script is None:
+            self._ack_script = client.register_script(_ACK_SCRIPT)
+        pipe = client.pipeline(transaction=False)
+        for hash_key, counts in collected.items():
+            args = [item for field, count in counts.items() for item in (field, count)]
+            self._ack_script(keys=[hash_key, DIRTY_KEY], args=args, client=pipe)
+        pipe.execute()
+
+    def write_batch(self, db: Session, rows: List[dict]) -> int:
+        """(key_id, 날짜)별 누적 - 존재하는 API 키의 행만 기록, 기록한 행 수 반환"""
+        counts = values(
+            column("key_id", Integer),
+            column("usage_date", Date),
+            column("request_count", Integer),
+            column("error_count", Integer),
+            name="counts"
+        ).data([(r["key_id"], r["usage_date"], r["request_count"], r["error_count"]) for r in rows])
+
+        stmt = pg_insert(ApiUsage).from_select(
+            ["key_id", "usage_date", "request_count", "error_count"],
+            select(counts.c.key_id, counts.c.usage_date, counts.c.request_count, counts.c.error_count)
+            .join(ApiKey, ApiKey.key_id == counts.c.key_id)
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_api_usage_key_date",
+            set_={
+                "request_count": ApiUsage.request_count + stmt.excluded.request_count,
+                "error_count": ApiUsage.error_count + stmt.excluded.error_count,
+            }
+        )
+        return db.execute(stmt).rowcount
+
+    def flush(self) -> int:
+        """Redis / 메모리 카운터를 api_usage에 누적 - 기록한 (key_id, 날짜) 수 반환"""
+        with self._flush_lock:
+            collected = {}
+            if _redis_enabled():
+                try:
+                    collected = self._read_redis()
+                except Exception as e:
+                    self.redis_errors += 1
+                    print(f"[UsageCounter] Redis collect failed: {e}")
+
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+
+            totals: Dict[Tuple[int, date], List[int]] = {k: list(v) for k, v in pending.items()}
+            for hash_key, counts in collected.items():
+                usage_date, key_id = _parse_hash_key(hash_key)
+                bucket = totals.setdefault((key_id, usage_date), [0, 0])
+                bucket[0] += sum(counts.values())
+                bucket[1] += sum(v for k, v in counts.items() if k in ("4xx", "5xx"))
+            if not totals:
+                return 0
+
+            rows = [
+                {"key_id": key_id, "usage_date": usage_date, "request_count": requests, "error_count": errors}
+                for (key_id, usage_date), (requests, errors) in totals.items()
+            ]
+            start = time.perf_counter()
+            db = SessionLocal()
+            try:
+                written = self.write_batch(db, rows)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                self.failed += len(rows)
+                # 메모리 카운트는 다음 주기에 다시 기록 (Redis 해시는 차감 전이므로 다시 읽힘)
+                for (key_id, usage_date), (requests, errors) in pending.items():
+                    self._add_pending(key_id, usage_date, requests, errors)
+                print(f"[UsageCounter] Flush failed, retrying {len(rows)} rows next interval: {e}")
+                return 0
+            finally:
+                db.close()
+
+            if collected:
+                try:
+                    self._ack_redis(collected)
+                except Exception as e:
+                    # 차감 실패분은 다음 주기에 한 번 더 누적될 수 있음 (유실보다 중복 쪽을 택함)
+                    self.redis_errors += 1
+                    print(f"[UsageCounter] Redis ack failed: {e}")
+
+            if written < len(rows):
+                self.dropped += len(rows) - written
+                print(f"[UsageCounter] Dropped {len(rows) - written} rows for deleted API keys")
+            self.written += written
+            self.last_flush_ms = round((time.perf_counter() - start) * 1000, 2)
+            return len(rows)
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "written": self.written,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "redis_errors": self.redis_errors,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+usage_counter = UsageCounter("api_usage_counter", flush_interval=USAGE_COUNTER_FLUSH_INTERVAL)
@@ -0,0 +1,135 @@
+"""
+AI 서비스 compact 응답(msgpack) 디코딩 + 영화 표시용 필드 채우기
+
+AI_WIRE_FORMAT=msgpack이면 게이트웨이가 Accept: application/x-msgpack으로 요청
+→ AI 서비스는 [movie_id, score, runtime, recommendation_type]만 반환 (ai/wire.py)
+→ 제목 / 줄거리 / 포스터 등은 movie_catalog 캐시로 채워 기존 JSON 응답과 같은 모양으로 복원
+  (/recommend_single의 fallback_level / fallback_info는 compact 응답에 그대로 실려 옴)
+
+AI 서비스가 JSON으로 응답하면(구버전 / msgpack 미설치) 그대로 사용
+backend에 msgpack이 없으면 JSON 형식 유지
+
+스트리밍(/v1/recommend, Accept로 선택): 게이트웨이 ↔ AI 서비스는 NDJSON,
+클라이언트에는 Accept에 따라 NDJSON(application/x-ndjson) 또는 SSE(text/event-stream)
+"""
+import os
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from backend.core.json_response import dumps
+from backend.domains.movie.catalog import movie_catalog
+
+try:
+    import msgpack
+except ImportError:  # 선택 의존성
+    msgpack = None
+
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+
+def _compact_enabled() -> bool:
+    if os.getenv("AI_WIRE_FORMAT", "json").lower() != "msgpack":
+        return False
+    if msgpack is None:
+        print("[Wire] AI_WIRE_FORMAT=msgpack but 'msgpack' is not installed - using JSON")
+        return False
+    return True
+
+
+COMPACT_ENABLED = _compact_enabled()
+
+
+def request_headers(headers: Optional[dict]) -> Optional[dict]:
+    """AI 서비스 요청 헤더 (compact 사용 시 Accept 추가)"""
+    if not COMPACT_ENABLED:
+        return headers
+    return {**(headers or {}), "Accept": MSGPACK_MEDIA_TYPE}
+
+
+def stream_media_type(accept: Optional[str]) -> Optional[str]:
+    """클라이언트가 요청한 스트리밍 형식 (없으면 None → 일반 JSON 응답)"""
+    if not accept:
+        return None
+    if SSE_MEDIA_TYPE in accept:
+        return SSE_MEDIA_TYPE
+    if NDJSON_MEDIA_TYPE in accept:
+        return NDJSON_MEDIA_TYPE
+    return None
+
+
+def encode_frame(media_type: str, frame: Dict[str, Any]) -> bytes:
+    """스트리밍 프레임 1개 (SSE: event = frame["type"])"""
+    data = dumps(frame)
+    if media_type == SSE_MEDIA_TYPE:
+        return b"event: " + frame["type"].encode() + b"\ndata: " + data + b"\n\n"
+    return data + b"\n"
+
+
+def is_compact(response: httpx.Response) -> bool:
+    return response.headers.get("content-type", "").startswith(MSGPACK_MEDIA_TYPE)
+
+
+def _hydrate_movie(
+    item: List[Any],
+    fields: List[str],
+    catalog: Dict[int, dict],
+    extra: Optional[Dict[str, Any]] = None
+) -> dict:
+    """compact 항목 + 카탈로그 → AI JSON 응답과 같은 영화 dict (extra: 뒤에 붙는 단일 추천 필드)"""
+    compact = dict(zip(fields, item))
+    movie_id = compact["movie_id"]
+    display = catalog.get(movie_id)
+    if display is None:
+        display = {"tmdb_id": None, "title": "Unknown", "genres": [], "vote_average": 0, "vote_count": 0,
+                   "overview": "", "release_date": "", "poster_path": ""}
+    # AI 서비스 응답과 같은 키 순서
+    return {
+        "movie_id": movie_id,
+        "tmdb_id": display["tmdb_id"],
+        "title": display["title"],
+        "runtime": compact.get("runtime", display.get("runtime", 0)),
+        "genres": display["genres"],
+        "vote_average": display["vote_average"],
+        "vote_count": display["vote_count"],
+        "overview": display["overview"],
+        "release_date": display["release_date"],
+        "poster_path": display["poster_path"],
+        "score": compact.get("score"),
+        "recommendation_type": compact.get("recommendation_type"),
+        **(extra or {}),
+    }
+
+
+async def decode(response: httpx.Response) -> Any:
+    """compact 응답 → 기존 JSON 응답과 같은 dict (/recommend, /recommend_single)"""
+    body = msgpack.unpackb(response.content, raw=False)
+    fields = body["fields"]
+
+    if "movie" in body:
+        item = body["movie"]
+        if item is None:
+            return None
+        catalog = await movie_catalog.get_many_async([item[0]])
+        extra = {k: body[k] for k in ("fallback_level", "fallback_info") if k in body}
+        return _hydrate_movie(item, fields, catalog, extra)
+
+    lists = [body["track_a"]["movies"], body["track_b"]["movies"], *(body.get("reserve") or {}).values()]
+    catalog = await movie_catalog.get_many_async(item[0] for items in lists for item in items)
+
+    result = {
+        track: {
+            "label": body[track]["label"],
+            "movies": [_hydrate_movie(item, fields, catalog) for item in body[track]["movies"]],
+            "total_runtime": body[track]["total_runtime"],
+        }
+        for track in ("track_a", "track_b")
+    }
+    result["elapsed_time"] = body.get("elapsed_time", 0)
+    result["reserve"] = (
+        {track: [_hydrate_movie(item, fields, catalog) for item in items] for track, items in body["reserve"].items()}
+        if body.get("reserve") is not None else None
+    )
+    return result
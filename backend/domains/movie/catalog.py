@@ -0,0 +1,70 @@
+# backend/domains/movie/catalog.py
+"""
+영화 표시용 필드 캐시 (movie_id → 제목 / 줄거리 / 포스터 등)
+
+AI 서비스 compact 응답(movie_id, score, runtime만)을 게이트웨이에서 채울 때 사용
+- 워커 로컬 LRU (utils.cache.TTLCache, MOVIE_CATALOG_SIZE편, MOVIE_CATALOG_TTL초)
+- 미스는 한 번의 SELECT ... WHERE movie_id = ANY(:ids)로 모아서 조회 (async DB)
+- 필드 형식은 AI 서비스 메타데이터(ai/inference/data_source.py)와 동일
+"""
+
+import os
+from typing import Dict, Iterable
+
+from sqlalchemy import text
+
+from backend.core.db import async_session
+from backend.utils.cache import TTLCache
+
+MOVIE_CATALOG_SIZE = int(os.getenv("MOVIE_CATALOG_SIZE", "50000"))
+MOVIE_CATALOG_TTL = int(os.getenv("MOVIE_CATALOG_TTL", "3600"))
+
+CATALOG_SQL = text("""
+    SELECT movie_id, tmdb_id, title, runtime, genres,
+           overview, poster_path, release_date, vote_average, vote_count
+    FROM movies
+    WHERE movie_id = ANY(:ids)
+""")
+
+
+def _display_fields(row) -> dict:
+    return {
+        "tmdb_id": row.tmdb_id,
+        "title": row.title,
+        "runtime": row.runtime or 0,
+        "genres": row.genres or [],
+        "vote_average": float(row.vote_average) if row.vote_average else 0.0,
+        "vote_count": int(row.vote_count) if row.vote_count else 0,
+        "overview": row.overview or "",
+        "release_date": str(row.release_date) if row.release_date else "",
+        "poster_path": row.poster_path,
+    }
+
+
+class MovieCatalog:
+    def __init__(self, maxsize: int = 50000, ttl: int = 3600):
+        self._cache = TTLCache("movie_catalog", maxsize=maxsize, ttl=ttl)
+
+    async def get_many_async(self, movie_ids: Iterable[int]) -> Dict[int, dict]:
+        """movie_id → 표시용 필드 (카탈로그에 없는 영화는 결과에서 빠짐)"""
+        found = {}
+        missing = []
+        for movie_id in dict.fromkeys(movie_ids):
+            hit, fields = self._cache.lookup(movie_id)
+            if hit:
+                found[movie_id] = fields
+            else:
+                missing.append(movie_id)
+
+        if missing:
+            async with async_session() as db:
+                rows = (await db.execute(CATALOG_SQL, {"ids": missing})).fetchall()
+            for row in rows:
+                fields = _display_fields(row)
+                self._cache.set(row.movie_id, fields)
+                found[row.movie_id] = fields
+        return found
+
+
+# 싱글톤
+movie_catalog = MovieCatalog(maxsize=MOVIE_CATALOG_SIZE, ttl=MOVIE_CATALOG_TTL)
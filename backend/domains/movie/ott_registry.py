@@ -0,0 +1,144 @@
+# backend/domains/movie/ott_registry.py
+"""
+OTT provider 사전 + 사용자 구독 OTT 캐시
+
+provider 사전 (프로세스 전역)
+- ott_providers 전체를 한 번 읽어 provider_id ↔ provider_name ↔ logo_path 조회
+- OTT_REGISTRY_REFRESH초마다 다시 읽음 (테이블이 작아 전체 재조회가 변경 감지보다 쌈, utils.cache.TTLCache)
+- 시드 / 어드민에서 같은 프로세스가 변경하면 refresh() 호출
+
+사용자 구독 OTT (Redis, 모든 워커 공유)
+- user_otts:{user_id}: 구독 provider_id 목록 (JSON)
+- 온보딩 / 마이페이지 OTT 변경 커밋 후 invalidate_user()
+- Redis 장애 / REDIS_URL 미설정 시 DB 조회 (fail-open)
+"""
+
+import json
+import os
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from backend.core.db import SessionLocal
+from backend.utils.cache import TTLCache
+from backend.utils.redis import get_redis_client
+
+OTT_REGISTRY_REFRESH = int(os.getenv("OTT_REGISTRY_REFRESH", "600"))  # 10분
+USER_OTT_CACHE_TTL = int(os.getenv("USER_OTT_CACHE_TTL", "1800"))  # 30분
+
+
+class OttRegistry:
+    """provider_id → {provider_id, provider_name, logo_path, display_priority, is_active}"""
+
+    def __init__(self, refresh_interval: int = 600):
+        # 항목 1개 (전체 사전), 동시 미스는 한 번만 조회, 조회 실패 시 이전 사전 유지
+        self._cache = TTLCache("ott_providers", maxsize=1, ttl=refresh_interval, stale_on_error=True)
+
+    @staticmethod
+    def _load() -> dict:
+        db = SessionLocal()
+        try:
+            rows = db.execute(text("""
+                SELECT provider_id, provider_name, logo_path, display_priority, is_active
+                FROM ott_providers
+                ORDER BY provider_id
+            """)).fetchall()
+        finally:
+            db.close()
+        by_id = {row.provider_id: dict(row._mapping) for row in rows}
+        return {
+            "by_id": by_id,
+            "by_name": {p["provider_name"]: p for p in by_id.values()},
+        }
+
+    def _providers(self) -> dict:
+        try:
+            return self._cache.get_or_load("providers", self._load)
+        except Exception as e:
+            # 첫 조회 실패 - 다음 호출에서 재시도
+            print(f"[OttRegistry] Load failed: {e}")
+            return {"by_id": {}, "by_name": {}}
+
+    def refresh(self):
+        """다음 조회 때 다시 읽음 (ott_providers 변경 후)"""
+        self._cache.delete("providers")
+
+    def is_loaded(self) -> bool:
+        """최신 사전이 메모리에 있는지 (async 경로에서 스레드풀 사용 여부 결정)"""
+        return self._cache.contains("providers")
+
+    def get(self, provider_id: int) -> Optional[dict]:
+        return self._providers()["by_id"].get(provider_id)
+
+    def name(self, provider_id: int) -> Optional[str]:
+        provider = self.get(provider_id)
+        return provider["provider_name"] if provider else None
+
+    def id_of(self, provider_name: str) -> Optional[int]:
+        provider = self._providers()["by_name"].get(provider_name)
+        return provider["provider_id"] if provider else None
+
+    def all_names(self) -> List[str]:
+        """전체 provider_name (provider_id 순)"""
+        return [p["provider_name"] for p in self._providers()["by_id"].values()]
+
+    def names(self, provider_ids: List[int]) -> List[str]:
+        by_id = self._providers()["by_id"]
+        return [by_id[pid]["provider_name"] for pid in provider_ids if pid in by_id]
+
+
+# 싱글톤
+ott_registry = OttRegistry(refresh_interval=OTT_REGISTRY_REFRESH)
+
+
+# ==================== 사용자 구독 OTT ====================
+
+def _user_key(user_id: str) -> str:
+    return f"user_otts:{user_id}"
+
+
+def _client():
+    if not os.getenv("REDIS_URL"):
+        return None
+    return get_redis_client()
+
+
+def get_user_provider_ids(db: Session, user_id: str) -> List[int]:
+    """사용자 구독 provider_id 목록 (캐시 → DB)"""
+    try:
+        client = _client()
+        if client is not None:
+            cached = client.get(_user_key(user_id))
+            if cached is not None:
+                return json.loads(cached)
+    except Exception as e:
+        print(f"[OttRegistry] User cache get failed ({user_id[:8]}...): {e}")
+        client = None
+
+    rows = db.execute(
+        text("SELECT provider_id FROM user_ott_map WHERE user_id = :uid ORDER BY provider_id"),
+        {"uid": user_id}
+    ).fetchall()
+    provider_ids = [row[0] for row in rows]
+
+    try:
+        if client is not None:
+            client.set(_user_key(user_id), json.dumps(provider_ids), ex=USER_OTT_CACHE_TTL)
+    except Exception as e:
+        print(f"[OttRegistry] User cache put failed ({user_id[:8]}...): {e}")
+    return provider_ids
+
+
+def get_user_provider_names(db: Session, user_id: str) -> List[str]:
+    return ott_registry.names(get_user_provider_ids(db, user_id))
+
+
+def invalidate_user(user_id: str):
+    """사용자 구독 OTT 변경 커밋 후 호출"""
+    try:
+        client = _client()
+        if client is not None:
+            client.delete(_user_key(user_id))
+    except Exception as e:
+        print(f"[OttRegistry] User cache invalidate failed ({user_id[:8]}...): {e}")
@@ -8,6 +8,8 @@ from fastapi import HTTPException, status
 from backend.domains.user.models import User, UserOttMap, UserOnboardingAnswer
 from backend.domains.movie.models import Movie
 from backend.utils.password import verify_password
+from backend.domains.movie import ott_registry
+from backend.domains.recommendation import context_cache
 
 
 # ======================================================
@@ -65,13 +67,8 @@ def get_current_ott(db: Session, user: User) -> List[int]:
     Returns:
         List[int]: 현재 구독 중인 OTT provider ID 리스트
     """
-    # 현재 구독 중인 OTT 조회
-    current_subscriptions = db.query(UserOttMap).filter(
-        UserOttMap.user_id == user.user_id
-    ).all()
-    
-    # provider_id만 추출하여 리스트로 반환
-    return [subscription.provider_id for subscription in current_subscriptions]
+    # 현재 구독 중인 OTT 조회 (구독 OTT 캐시 → DB)
+    return ott_registry.get_user_provider_ids(db, str(user.user_id))
 
 
 # ======================================================
@@ -110,6 +107,8 @@ def update_user_ott(db: Session, user: User, ott_ids: List[int]) -> List[int]:
     
     # 3. 커밋
     db.commit()
+    context_cache.invalidate(str(user.user_id))
+    ott_registry.invalidate_user(str(user.user_id))
     
     return ott_ids
 
@@ -289,6 +288,7 @@ def save_satisfaction_survey(
 
     # 5. DB에 저장
     db.commit()
+    context_cache.invalidate(str(user.user_id))
     
     return {
         "session_id": session_id,
@@ -5,6 +5,8 @@ from sqlalchemy.orm import Session
 
 from backend.domains.user.models import User, UserOnboardingAnswer, UserOttMap
 from backend.domains.movie.models import Movie
+from backend.domains.movie import ott_registry
+from backend.domains.recommendation import context_cache
 from .models import OnboardingCandidate
 from .schema import (
     OnboardingCompleteResponse,
@@ -28,6 +30,8 @@ def save_user_ott(
         db.add(UserOttMap(user_id=user.user_id, provider_id=provider_id))
 
     db.commit()
+    context_cache.invalidate(str(user.user_id))
+    ott_registry.invalidate_user(str(user.user_id))
 
 
 # ========================================
@@ -57,6 +61,7 @@ def save_onboarding_answers(
     user.onboarding_completed_at = datetime.utcnow()
     db.add(user)
     db.commit()
+    context_cache.invalidate(str(user.user_id))
 
 
 # ========================================
@@ -91,6 +96,7 @@ def skip_onboarding(
     user.onboarding_completed_at = datetime.utcnow()
     db.add(user)
     db.commit()
+    context_cache.invalidate(str(user.user_id))
     db.refresh(user)
 
     return OnboardingCompleteResponse(
@@ -2,12 +2,26 @@
 """
 AI 추천 모델 어댑터 v3 - B2B External API 호출
 B2C 무비서도 B2B API Key를 사용하여 추천 서비스 호출 (Dog Fooding)
+
+전송 방식 (B2C_TRANSPORT)
+- inprocess (기본): External API 로직을 프로세스 내부에서 호출 (b2b.gateway)
+  인증은 시작 시 한 번, 사용량은 배치 기록 → 자기 자신으로의 HTTP 왕복 없음
+- http: B2B_API_URL의 /v1/* 로 HTTP 호출 (외부 고객과 완전히 같은 경로)
 """
 
 import os
 import httpx
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional, Dict, Any
 
+from backend.core.http_clients import http_clients
+from backend.utils.cache import TTLCache
+from backend.domains.b2b import gateway
+from backend.domains.movie.ott_registry import ott_registry
+from . import reserve
+from .schema import UserRecommendationContext
+
 
 class AIModelAdapter:
     """
@@ -20,96 +34,37 @@ class AIModelAdapter:
         self.api_base_url = os.getenv("B2B_API_URL", "http://localhost:8000")
         # B2C용 API Key (B2B Console에서 발급받은 키)
         self.api_key = os.getenv("B2C_API_KEY", "")
+        # 전송 방식: inprocess | http
+        self.transport = os.getenv("B2C_TRANSPORT", "inprocess").lower()
         self.is_loaded = True
 
-        # 캐싱 변수
-        self._popular_movies_cache = None  # 인기 영화 목록 (24시간 TTL)
-        self._cache_timestamp = None  # 캐시 생성 시각
-        self._user_profile_cache = {}  # user_id → (movie_ids, timestamp) - 세션 캐싱 (5분 TTL)
-        self._all_ott_names = None  # 전체 OTT 목록 (영구 캐시)
-
-
-    def _get_user_watched_movies(self, user_id: str) -> List[int]:
-        """사용자의 시청 기록에서 movie_id 리스트 반환"""
-        try:
-            from sqlalchemy import text
-            from backend.core.db import SessionLocal
-
-            db = SessionLocal()
-            try:
-                # movie_logs에서 조회
-                result = db.execute(
-                    text("SELECT movie_id FROM movie_logs WHERE user_id = :uid ORDER BY watched_at DESC LIMIT 50"),
-                    {"uid": user_id}
-                ).fetchall()
-
-                if result:
-                    return [row[0] for row in result]
-
-                # 온보딩 응답에서 조회
-                result = db.execute(
-                    text("SELECT movie_id FROM user_onboarding_answers WHERE user_id = :uid"),
-                    {"uid": user_id}
-                ).fetchall()
+        # 인기 영화 목록 (24시간 TTL, DB 오류 시 만료된 목록 사용)
+        self._popular_movies = TTLCache("popular_movies", maxsize=1, ttl=86400, stale_on_error=True)
 
-                if result:
-                    return [row[0] for row in result]
 
-            finally:
-                db.close()
+    @staticmethod
+    def _load_popular_movies() -> Optional[List[int]]:
+        """인기 영화 상위 50개 조회 (랜덤 샘플링용) - 결과가 없으면 None (캐시하지 않음)"""
+        from sqlalchemy import text
+        from backend.core.db import SessionLocal
 
-        except Exception as e:
-            print(f"[AI Model] DB query error: {e}")
-
-        return []
-
-    def _get_recent_recommended_movies(self, user_id: str, session_limit: int = 3) -> List[int]:
-        """
-        최근 N개 추천 세션에서 추천된 영화 ID 조회
-        
-        Args:
-            user_id: 사용자 ID
-            session_limit: 조회할 최근 세션 개수 (기본값 3)
-        
-        Returns:
-            최근 추천된 영화 ID 리스트
-        """
+        db = SessionLocal()
         try:
-            from sqlalchemy import text
-            from backend.core.db import SessionLocal
-
-            db = SessionLocal()
-            try:
-                # 최근 N개 세션의 recommended_movie_ids 조회
-                result = db.execute(
-                    text("""
-                        SELECT recommended_movie_ids 
-                        FROM recommendation_sessions 
-                        WHERE user_id = :uid 
-                        ORDER BY created_at DESC 
-                        LIMIT :limit
-                    """),
-                    {"uid": user_id, "limit": session_limit}
-                ).fetchall()
-
-                if result:
-                    # 모든 세션의 영화 ID를 하나의 리스트로 합침
-                    all_movie_ids = []
-                    for row in result:
-                        movie_ids = row[0]  # recommended_movie_ids 배열
-                        if movie_ids:
-                            all_movie_ids.extend(movie_ids)
-                    
-                    # 중복 제거
-                    return list(set(all_movie_ids))
-
-            finally:
-                db.close()
-
-        except Exception as e:
-            print(f"[AI Model] Error fetching recent recommendations: {e}")
-
-        return []
+            result = db.execute(
+                text("""
+                    SELECT movie_id 
+                    FROM movies 
+                    WHERE vote_count >= 5000 
+                      AND vote_average >= 7.0 
+                      AND EXTRACT(YEAR FROM release_date) >= 2000
+                      AND adult = false
+                    ORDER BY popularity DESC NULLS LAST
+                    LIMIT 50
+                """)
+            ).fetchall()
+            return [row[0] for row in result] or None
+        finally:
+            db.close()
 
     def _get_popular_movies(self, limit: int = 5) -> List[int]:
         """
@@ -121,250 +76,204 @@ class AIModelAdapter:
         Returns:
             인기 영화 movie_id 리스트
         """
-        import time
         import random
-        
-        # 캐시 확인 (24시간)
-        if self._popular_movies_cache and self._cache_timestamp:
-            if time.time() - self._cache_timestamp < 86400:  # 24시간
-                # 캐시된 목록에서 랜덤 샘플링
-                if len(self._popular_movies_cache) > limit:
-                    return random.sample(self._popular_movies_cache, limit)
-                return self._popular_movies_cache
-        
-        # DB 조회
-        try:
-            from sqlalchemy import text
-            from backend.core.db import SessionLocal
-            
-            db = SessionLocal()
-            try:
-                # 상위 50개 조회 (랜덤 샘플링용)
-                result = db.execute(
-                    text("""
-                        SELECT movie_id 
-                        FROM movies 
-                        WHERE vote_count >= 5000 
-                          AND vote_average >= 7.0 
-                          AND EXTRACT(YEAR FROM release_date) >= 2000
-                          AND adult = false
-                        ORDER BY popularity DESC NULLS LAST
-                        LIMIT 50
-                    """)
-                ).fetchall()
-                
-                if result:
-                    movies = [row[0] for row in result]
-                    # 캐시 저장
-                    self._popular_movies_cache = movies
-                    self._cache_timestamp = time.time()
-                    
-                    # 랜덤 샘플링
-                    if len(movies) > limit:
-                        return random.sample(movies, limit)
-                    return movies
-            finally:
-                db.close()
-        except Exception as e:
-            print(f"[AI Model] Error fetching popular movies: {e}")
-            # 에러 시 캐시가 있으면 사용
-            if self._popular_movies_cache:
-                if len(self._popular_movies_cache) > limit:
-                    return random.sample(self._popular_movies_cache, limit)
-                return self._popular_movies_cache
-        
-        return []
 
-    def _get_all_ott_names(self) -> List[str]:
-        """전체 OTT provider_name 목록 조회 (영구 캐싱)"""
-        if self._all_ott_names:
-            return self._all_ott_names
-        
         try:
-            from sqlalchemy import text
-            from backend.core.db import SessionLocal
-            
-            db = SessionLocal()
-            try:
-                result = db.execute(
-                    text("SELECT provider_name FROM ott_providers ORDER BY provider_id")
-                ).fetchall()
-                
-                if result:
-                    self._all_ott_names = [row[0] for row in result]
-                    return self._all_ott_names
-            finally:
-                db.close()
+            movies = self._popular_movies.get_or_load("popular", self._load_popular_movies)
         except Exception as e:
-            print(f"[AI Model] Error fetching all OTTs: {e}")
-        
-        return []
-
-    def _get_positive_feedback_movies(self, user_id: str) -> List[int]:
-        """긍정 피드백 영화 조회"""
-        try:
-            from sqlalchemy import text
-            from backend.core.db import SessionLocal
+            print(f"[AI Model] Error fetching popular movies: {e}")
+            return []
 
-            db = SessionLocal()
-            try:
-                result = db.execute(
-                    text("""
-                        SELECT movie_id 
-                        FROM b2c.user_movie_feedback 
-                        WHERE user_id = :uid 
-                          AND feedback_type = 'satisfaction_positive'
-                        ORDER BY created_at DESC
-                        LIMIT 20
-                    """),
-                    {"uid": user_id}
-                ).fetchall()
-
-                return [row[0] for row in result] if result else []
-
-            finally:
-                db.close()
+        if not movies:
+            return []
+        if len(movies) > limit:
+            return random.sample(movies, limit)
+        return movies
 
-        except Exception as e:
-            print(f"[AI Model] Error fetching positive feedback: {e}")
+    def _get_all_ott_names(self) -> List[str]:
+        """전체 OTT provider_name 목록 (프로세스 전역 provider 사전)"""
+        return ott_registry.all_names()
 
-        return []
+    def _load_context(self, user_id: str) -> UserRecommendationContext:
+        """컨텍스트를 넘겨받지 못한 경우 (legacy predict 등) 자체 세션으로 조회"""
+        from backend.core.db import SessionLocal
+        from . import service
 
-    def _get_negative_feedback_movies(self, user_id: str) -> List[int]:
-        """부정 피드백 영화 조회"""
+        db = SessionLocal()
         try:
-            from sqlalchemy import text
-            from backend.core.db import SessionLocal
-
-            db = SessionLocal()
-            try:
-                result = db.execute(
-                    text("""
-                        SELECT movie_id 
-                        FROM b2c.user_movie_feedback 
-                        WHERE user_id = :uid 
-                          AND feedback_type = 'satisfaction_negative'
-                        ORDER BY created_at DESC
-                        LIMIT 20
-                    """),
-                    {"uid": user_id}
-                ).fetchall()
-
-                return [row[0] for row in result] if result else []
-
-            finally:
-                db.close()
-
+            return service.load_user_context(db, user_id)
         except Exception as e:
-            print(f"[AI Model] Error fetching negative feedback: {e}")
-
-        return []
-
-    def _get_all_feedback_movies(self, user_id: str) -> List[int]:
-        """모든 피드백 영화 조회 (긍정 + 부정)"""
-        try:
-            from sqlalchemy import text
-            from backend.core.db import SessionLocal
-
-            db = SessionLocal()
-            try:
-                result = db.execute(
-                    text("""
-                        SELECT DISTINCT movie_id 
-                        FROM b2c.user_movie_feedback 
-                        WHERE user_id = :uid
-                    """),
-                    {"uid": user_id}
-                ).fetchall()
-
-                return [row[0] for row in result] if result else []
-
-            finally:
-                db.close()
+            print(f"[AI Model] Error loading user context: {e}")
+            return UserRecommendationContext(user_id=user_id)
+        finally:
+            db.close()
 
-        except Exception as e:
-            print(f"[AI Model] Error fetching all feedback: {e}")
+    def _get_user_movie_ids(self, context: UserRecommendationContext) -> List[int]:
+        """
+        사용자 프로필 영화 ID (긍정 피드백 > 온보딩 > 시청 기록)
+        데이터가 없으면 인기 영화로 대체
+        """
+        user_movie_ids = context.profile_movie_ids()
+        if user_movie_ids:
+            print(f"[AI Model] User profile: {len(context.positive_ids)} feedback + {len(context.onboarding_ids)} onboarding + {len(context.watched_ids)} watch history")
+            return user_movie_ids
 
-        return []
+        print(f"[AI Model] No user data for {context.user_id[:8]}... - using popular movies")
+        return self._get_popular_movies(limit=5)
 
-    def _get_onboarding_movies(self, user_id: str) -> List[int]:
-        """온보딩 영화 조회"""
-        try:
-            from sqlalchemy import text
-            from backend.core.db import SessionLocal
+    def _call_api(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        External API 호출 후 data 반환
 
-            db = SessionLocal()
+        inprocess 전송이 불가능하면 (키 미설정, 스레드풀 밖 호출) HTTP로 대체
+        실패 시 httpx.HTTPError 또는 HTTPException
+        """
+        if self.transport == "inprocess":
             try:
-                result = db.execute(
-                    text("""
-                        SELECT movie_id 
-                        FROM b2c.user_onboarding_answers 
-                        WHERE user_id = :uid
-                        ORDER BY created_at
-                    """),
-                    {"uid": user_id}
-                ).fetchall()
-
-                return [row[0] for row in result] if result else []
-
-            finally:
-                db.close()
+                print(f"[AI Model] Calling External API in-process: {endpoint}")
+                return gateway.call_internal_from_thread(endpoint, payload)
+            except gateway.InternalTransportUnavailable as e:
+                print(f"[AI Model] In-process transport unavailable ({e}) - falling back to HTTP")
+
+        print(f"[AI Model] Calling B2B API: {self.api_base_url}{endpoint}")
+        headers = {"X-API-Key": self.api_key} if self.api_key else {}
+
+        response = http_clients.get_sync("b2b_api").post(
+            f"{self.api_base_url}{endpoint}",
+            json=payload,
+            headers=headers
+        )
+        response.raise_for_status()
+        return self._extract_data(response.json())
+
+    async def _call_api_async(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """_call_api의 async 버전 (이벤트 루프에서 직접 AI 호출 대기, 스레드 점유 없음)"""
+        if self.transport == "inprocess":
+            principal = await gateway.get_internal_principal_async()
+            if principal is not None:
+                print(f"[AI Model] Calling External API in-process: {endpoint}")
+                return await gateway.call_internal(principal, endpoint, payload)
+            print("[AI Model] In-process transport unavailable (B2C_API_KEY) - falling back to HTTP")
+
+        print(f"[AI Model] Calling B2B API: {self.api_base_url}{endpoint}")
+        headers = {"X-API-Key": self.api_key} if self.api_key else {}
+
+        response = await http_clients.get_async("b2b_api").post(
+            f"{self.api_base_url}{endpoint}",
+            json=payload,
+            headers=headers
+        )
+        response.raise_for_status()
+        return self._extract_data(response.json())
+
+    @staticmethod
+    def _extract_data(api_result: Dict[str, Any]) -> Dict[str, Any]:
+        """External API 응답에서 data 추출"""
+        if api_result.get("success") and "data" in api_result:
+            return api_result["data"]
+        return api_result
+
+    def _lookups_cached(self, context: UserRecommendationContext, preferred_otts: Optional[List[str]]) -> bool:
+        """payload 생성에 DB 조회(인기 영화 / 전체 OTT)가 필요 없는지 - async 경로에서 스레드풀 사용 여부 결정"""
+        if not preferred_otts and not ott_registry.is_loaded():
+            return False
+        if not context.profile_movie_ids():
+            return self._popular_movies.contains("popular")
+        return True
+
+    def _recommend_payload(
+        self,
+        context: UserRecommendationContext,
+        available_time: int,
+        preferred_genres: Optional[List[str]],
+        preferred_otts: Optional[List[str]],
+        allow_adult: bool,
+        excluded_ids_a: Optional[List[int]],
+        excluded_ids_b: Optional[List[int]]
+    ) -> Dict[str, Any]:
+        """/v1/recommend 요청 payload (사용자 프로필 + 피드백 제외 반영)"""
+        # 사용자 영화 ID (긍정 피드백 + 온보딩 + 시청 기록)
+        user_movie_ids = self._get_user_movie_ids(context)
+
+        print(f"[AI Model] Recent recommendations to exclude: {len(context.recent_ids)} movies from last 3 sessions")
+        negative_feedback = context.negative_ids  # 부정만
+        print(f"[AI Model] Feedback: {len(context.feedback_ids)} total ({len(negative_feedback)} negative)")
+
+        # excluded_ids에 최근 추천 영화 + 모든 피드백 영화 추가
+        excluded_ids_a = context.excluded_ids(excluded_ids_a)
+        excluded_ids_b = context.excluded_ids(excluded_ids_b)
+
+        # OTT 구독 정보 없으면 전체 OTT 사용
+        if not preferred_otts:
+            preferred_otts = self._get_all_ott_names()
+            if preferred_otts:
+                print(f"[AI Model] No OTT subscription - using all OTTs ({len(preferred_otts)})")
+
+        payload = {
+            "user_movie_ids": user_movie_ids,
+            "available_time": available_time,
+            "preferred_genres": preferred_genres,
+            "preferred_otts": preferred_otts,
+            "allow_adult": allow_adult,
+            "excluded_ids_a": excluded_ids_a,
+            "excluded_ids_b": excluded_ids_b,
+            "negative_movie_ids": negative_feedback,  # NEW: 부정 피드백 전달
+            "include_reserve": reserve.RESERVE_ENABLED  # 재추천용 교체 후보 (세션별 보관)
+        }
 
-        except Exception as e:
-            print(f"[AI Model] Error fetching onboarding movies: {e}")
+        print(f"[AI Model] Payload: time={available_time}, genres={preferred_genres}, excluded_a={len(excluded_ids_a)}, excluded_b={len(excluded_ids_b)}, negative={len(negative_feedback)}")
+        return payload
 
-        return []
+    def _single_payload(
+        self,
+        context: UserRecommendationContext,
+        target_runtime: int,
+        excluded_ids: List[int],
+        track: str,
+        preferred_genres: Optional[List[str]],
+        preferred_otts: Optional[List[str]],
+        allow_adult: bool
+    ) -> Dict[str, Any]:
+        """/v1/recommend_single 요청 payload"""
+        # 사용자 영화 ID (긍정 피드백 + 온보딩 + 시청 기록)
+        user_movie_ids = self._get_user_movie_ids(context)
+
+        print(f"[AI Model] Recent recommendations to exclude: {len(context.recent_ids)} movies from last 3 sessions")
+        negative_feedback = context.negative_ids
+        print(f"[AI Model] Feedback: {len(context.feedback_ids)} total ({len(negative_feedback)} negative)")
+
+        # excluded_ids에 최근 추천 영화 + 모든 피드백 영화 추가
+        excluded_ids = context.excluded_ids(excluded_ids)
+
+        # OTT 구독 정보 없으면 전체 OTT 사용
+        if not preferred_otts:
+            preferred_otts = self._get_all_ott_names()
+            if preferred_otts:
+                print(f"[AI Model] No OTT subscription - using all OTTs ({len(preferred_otts)})")
+
+        payload = {
+            "user_movie_ids": user_movie_ids,
+            "target_runtime": target_runtime,
+            "excluded_ids": excluded_ids,
+            "track": track,
+            "preferred_genres": preferred_genres,
+            "preferred_otts": preferred_otts,
+            "allow_adult": allow_adult,
+            "negative_movie_ids": negative_feedback  # NEW
+        }
 
-    def _get_user_movie_ids(self, user_id: str, force_refresh: bool = False) -> List[int]:
-        """
-        사용자 영화 ID 조회 (피드백 + 온보딩 + 시청 기록)
-        
-        Args:
-            user_id: 사용자 ID
-            force_refresh: True면 캐시 무시하고 새로 조회 (전체 추천용)
-                          False면 캐시 사용 (재추천용)
-        
-        Returns:
-            사용자 선호 영화 ID 리스트 (긍정 피드백 > 온보딩 > 시청 기록)
-        """
-        import time
-        
-        # 캐시 확인 (force_refresh=False일 때만)
-        if not force_refresh and user_id in self._user_profile_cache:
-            cached_ids, cached_time = self._user_profile_cache[user_id]
-            if time.time() - cached_time < 300:  # 5분
-                print(f"[AI Model] Using cached profile for {user_id[:8]}...")
-                return cached_ids
-        
-        user_movie_ids = []
-        
-        # 1. 긍정 피드백 영화 조회
-        positive_feedback = self._get_positive_feedback_movies(user_id)
-        user_movie_ids.extend(positive_feedback)
-        
-        # 2. 온보딩 영화 조회
-        onboarding_movies = self._get_onboarding_movies(user_id)
-        user_movie_ids.extend(onboarding_movies)
-        
-        # 3. 시청 기록 조회 (선택적)
-        watch_history = self._get_user_watched_movies(user_id)
-        user_movie_ids.extend(watch_history)
-        
-        # 중복 제거 (순서 유지)
-        user_movie_ids = list(dict.fromkeys(user_movie_ids))
-        
-        if user_movie_ids:
-            # 캐시 저장
-            self._user_profile_cache[user_id] = (user_movie_ids, time.time())
-            print(f"[AI Model] User profile: {len(positive_feedback)} feedback + {len(onboarding_movies)} onboarding + {len(watch_history)} watch history")
-            return user_movie_ids
-        
-        # 4. Fallback: 인기 영화
-        print(f"[AI Model] No user data for {user_id[:8]}... - using popular movies")
-        popular_movies = self._get_popular_movies(limit=5)
-        self._user_profile_cache[user_id] = (popular_movies, time.time())
-        return popular_movies
+        print(f"[AI Model] Payload: runtime={target_runtime}, track={track}, excluded={len(excluded_ids)}, negative={len(negative_feedback)}")
+        return payload
 
+    @staticmethod
+    def _track_result(ai_result: Dict[str, Any]) -> Dict[str, Any]:
+        print(f"[AI Model] Response received from External API")
+        return {
+            "track_a": ai_result.get("track_a"),
+            "track_b": ai_result.get("track_b"),
+            "algorithm": ai_result.get("algorithm", "hybrid"),
+            "reserve": ai_result.get("reserve")
+        }
 
     def recommend(
         self,
@@ -374,11 +283,14 @@ class AIModelAdapter:
         preferred_otts: Optional[List[str]] = None,
         allow_adult: bool = False,
         excluded_ids_a: Optional[List[int]] = None,
-        excluded_ids_b: Optional[List[int]] = None
+        excluded_ids_b: Optional[List[int]] = None,
+        context: Optional[UserRecommendationContext] = None
     ) -> Dict[str, Any]:
         """
         초기 추천 - 영화 조합 반환 (v3 - 피드백 반영)
 
+        context: router가 요청 세션으로 조회한 사용자 컨텍스트 (없으면 직접 조회)
+
         Returns:
             {
                 'track_a': { 'label': '...', 'movies': [...], 'total_runtime': int },
@@ -387,67 +299,46 @@ class AIModelAdapter:
             }
         """
         try:
-            # 사용자 영화 ID 조회 (force_refresh=True → 항상 새 프로필 생성)
-            user_movie_ids = self._get_user_movie_ids(user_id, force_refresh=True)
-            
-            # 최근 3개 세션에서 추천된 영화 조회
-            recent_recommended = self._get_recent_recommended_movies(user_id, session_limit=3)
-            print(f"[AI Model] Recent recommendations to exclude: {len(recent_recommended)} movies from last 3 sessions")
-            
-            # 피드백 데이터 조회
-            all_feedback = self._get_all_feedback_movies(user_id)  # 긍정 + 부정 모두
-            negative_feedback = self._get_negative_feedback_movies(user_id)  # 부정만
-            print(f"[AI Model] Feedback: {len(all_feedback)} total ({len(negative_feedback)} negative)")
-            
-            # excluded_ids에 최근 추천 영화 + 모든 피드백 영화 추가
-            excluded_ids_a = excluded_ids_a or []
-            excluded_ids_a = list(set(excluded_ids_a + recent_recommended + all_feedback))
-            
-            excluded_ids_b = excluded_ids_b or []
-            excluded_ids_b = list(set(excluded_ids_b + recent_recommended + all_feedback))
-            
-            # OTT 구독 정보 없으면 전체 OTT 사용
-            if not preferred_otts:
-                preferred_otts = self._get_all_ott_names()
-                if preferred_otts:
-                    print(f"[AI Model] No OTT subscription - using all OTTs ({len(preferred_otts)})")
-
-            payload = {
-                "user_movie_ids": user_movie_ids,
-                "available_time": available_time,
-                "preferred_genres": preferred_genres,
-                "preferred_otts": preferred_otts,
-                "allow_adult": allow_adult,
-                "excluded_ids_a": excluded_ids_a,
-                "excluded_ids_b": excluded_ids_b,
-                "negative_movie_ids": negative_feedback  # NEW: 부정 피드백 전달
-            }
-
-            print(f"[AI Model] Calling B2B API: {self.api_base_url}/v1/recommend")
-            print(f"[AI Model] Payload: time={available_time}, genres={preferred_genres}, excluded_a={len(excluded_ids_a)}, excluded_b={len(excluded_ids_b)}, negative={len(negative_feedback)}")
+            if context is None:
+                context = self._load_context(user_id)
 
-            headers = {"X-API-Key": self.api_key} if self.api_key else {}
+            payload = self._recommend_payload(
+                context, available_time, preferred_genres, preferred_otts,
+                allow_adult, excluded_ids_a, excluded_ids_b
+            )
+            return self._track_result(self._call_api("/v1/recommend", payload))
 
-            with httpx.Client(timeout=30.0) as client:
-                response = client.post(
-                    f"{self.api_base_url}/v1/recommend",
-                    json=payload,
-                    headers=headers
-                )
-                response.raise_for_status()
-                api_result = response.json()
+        except (httpx.HTTPError, HTTPException) as e:
+            print(f"[AI Model] API error: {e}")
+            return self._empty_response()
+        except Exception as e:
+            print(f"[AI Model] Error: {e}")
+            import traceback
+            traceback.print_exc()
+            return self._empty_response()
 
-            # External API 응답에서 data 추출
-            if api_result.get("success") and "data" in api_result:
-                result = api_result["data"]
+    async def recommend_async(
+        self,
+        context: UserRecommendationContext,
+        available_time: int = 180,
+        preferred_genres: Optional[List[str]] = None,
+        preferred_otts: Optional[List[str]] = None,
+        allow_adult: bool = False,
+        excluded_ids_a: Optional[List[int]] = None,
+        excluded_ids_b: Optional[List[int]] = None
+    ) -> Dict[str, Any]:
+        """recommend의 async 버전 (async 엔드포인트용, context 필수)"""
+        try:
+            args = (context, available_time, preferred_genres, preferred_otts,
+                    allow_adult, excluded_ids_a, excluded_ids_b)
+            if self._lookups_cached(context, preferred_otts):
+                payload = self._recommend_payload(*args)
             else:
-                result = api_result
+                payload = await run_in_threadpool(self._recommend_payload, *args)
+            return self._track_result(await self._call_api_async("/v1/recommend", payload))
 
-            print(f"[AI Model] Response received from B2B API")
-            return result
-
-        except httpx.HTTPError as e:
-            print(f"[AI Model] HTTP error: {e}")
+        except (httpx.HTTPError, HTTPException) as e:
+            print(f"[AI Model] API error: {e}")
             return self._empty_response()
         except Exception as e:
             print(f"[AI Model] Error: {e}")
@@ -463,73 +354,66 @@ class AIModelAdapter:
         track: str = "a",
         preferred_genres: Optional[List[str]] = None,
         preferred_otts: Optional[List[str]] = None,
-        allow_adult: bool = False
+        allow_adult: bool = False,
+        context: Optional[UserRecommendationContext] = None
     ) -> Optional[Dict[str, Any]]:
         """
         개별 영화 재추천 - 단일 영화 반환
 
+        context: router가 요청 세션으로 조회한 사용자 컨텍스트 (없으면 직접 조회)
+
         Returns:
             { 'tmdb_id': int, 'title': str, 'runtime': int, ... } 또는 None
         """
         try:
-            # 사용자 영화 ID 조회 (force_refresh=False → 캐시 사용, 5분 이내)
-            user_movie_ids = self._get_user_movie_ids(user_id, force_refresh=False)
-            
-            # 최근 3개 세션에서 추천된 영화 조회
-            recent_recommended = self._get_recent_recommended_movies(user_id, session_limit=3)
-            print(f"[AI Model] Recent recommendations to exclude: {len(recent_recommended)} movies from last 3 sessions")
-            
-            # 피드백 데이터 조회
-            all_feedback = self._get_all_feedback_movies(user_id)
-            negative_feedback = self._get_negative_feedback_movies(user_id)
-            print(f"[AI Model] Feedback: {len(all_feedback)} total ({len(negative_feedback)} negative)")
-            
-            # excluded_ids에 최근 추천 영화 + 모든 피드백 영화 추가
-            excluded_ids = list(set(excluded_ids + recent_recommended + all_feedback))
-            
-            # OTT 구독 정보 없으면 전체 OTT 사용
-            if not preferred_otts:
-                preferred_otts = self._get_all_ott_names()
-                if preferred_otts:
-                    print(f"[AI Model] No OTT subscription - using all OTTs ({len(preferred_otts)})")
-
-            payload = {
-                "user_movie_ids": user_movie_ids,
-                "target_runtime": target_runtime,
-                "excluded_ids": excluded_ids,
-                "track": track,
-                "preferred_genres": preferred_genres,
-                "preferred_otts": preferred_otts,
-                "allow_adult": allow_adult,
-                "negative_movie_ids": negative_feedback  # NEW
-            }
+            if context is None:
+                context = self._load_context(user_id)
 
-            print(f"[AI Model] Calling B2B API: {self.api_base_url}/v1/recommend_single")
-            print(f"[AI Model] Payload: runtime={target_runtime}, track={track}, excluded={len(excluded_ids)}, negative={len(negative_feedback)}")
+            payload = self._single_payload(
+                context, target_runtime, excluded_ids, track,
+                preferred_genres, preferred_otts, allow_adult
+            )
+            result = self._call_api("/v1/recommend_single", payload)
 
-            headers = {"X-API-Key": self.api_key} if self.api_key else {}
+            if result:
+                print(f"[AI Model] Single movie: {result.get('title')} ({result.get('runtime')}min)")
+            return result
 
-            with httpx.Client(timeout=30.0) as client:
-                response = client.post(
-                    f"{self.api_base_url}/v1/recommend_single",
-                    json=payload,
-                    headers=headers
-                )
-                response.raise_for_status()
-                api_result = response.json()
+        except (httpx.HTTPError, HTTPException) as e:
+            print(f"[AI Model] API error: {e}")
+            return None
+        except Exception as e:
+            print(f"[AI Model] Error: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
 
-            # External API 응답에서 data 추출
-            if api_result.get("success") and "data" in api_result:
-                result = api_result["data"]
+    async def recommend_single_async(
+        self,
+        context: UserRecommendationContext,
+        target_runtime: int,
+        excluded_ids: List[int],
+        track: str = "a",
+        preferred_genres: Optional[List[str]] = None,
+        preferred_otts: Optional[List[str]] = None,
+        allow_adult: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """recommend_single의 async 버전 (async 엔드포인트용, context 필수)"""
+        try:
+            args = (context, target_runtime, excluded_ids, track,
+                    preferred_genres, preferred_otts, allow_adult)
+            if self._lookups_cached(context, preferred_otts):
+                payload = self._single_payload(*args)
             else:
-                result = api_result
+                payload = await run_in_threadpool(self._single_payload, *args)
+            result = await self._call_api_async("/v1/recommend_single", payload)
 
             if result:
                 print(f"[AI Model] Single movie: {result.get('title')} ({result.get('runtime')}min)")
             return result
 
-        except httpx.HTTPError as e:
-            print(f"[AI Model] HTTP error: {e}")
+        except (httpx.HTTPError, HTTPException) as e:
+            print(f"[AI Model] API error: {e}")
             return None
         except Exception as e:
             print(f"[AI Model] Error: {e}")
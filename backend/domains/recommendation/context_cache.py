@@ -0,0 +1,192 @@
+# backend/domains/recommendation/context_cache.py
+"""
+사용자 추천 컨텍스트 Redis 캐시 (모든 uvicorn 워커 공유)
+
+키 구조 (Hash) - rec_ctx:{user_id}
+- base: OTT / 피드백 / 온보딩 / 시청 기록 / 최근 20개 세션 (JSON)
+- genres:{장르,...}: 해당 장르와 겹치는 최근 20개 세션의 Track A ID (JSON, Track A 제외용)
+
+무효화 / 갱신
+- 온보딩, OTT 변경, 만족도 조사, 시청 기록: 커밋 후 invalidate (다음 추천 때 DB 1회 조회, 교체 후보도 삭제)
+- 추천 세션 저장, OTT 클릭, 재추천: 캐시 항목을 그 자리에서 갱신 (DB 재조회 없음)
+- 모든 변경은 rec_ctx_ver:{user_id}를 증가 → 변경 전에 DB를 읽은 요청의 늦은 put은 무시
+
+Redis 장애 / REDIS_URL 미설정 시 캐시 없이 동작 (fail-open)
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis
+
+from backend.utils.redis import get_redis_client
+from . import reserve
+
+CONTEXT_CACHE_TTL = int(os.getenv("REC_CONTEXT_CACHE_TTL", "1800"))  # 30분
+CONTEXT_SESSION_LIMIT = 20  # 캐시에 보관하는 최근 세션 수 (Track A/B 제외 기준과 동일)
+
+
+def _key(user_id: str) -> str:
+    return f"rec_ctx:{user_id}"
+
+
+def _version_key(user_id: str) -> str:
+    return f"rec_ctx_ver:{user_id}"
+
+
+def _genre_field(genres: List[str]) -> str:
+    return "genres:" + ",".join(sorted(set(genres)))
+
+
+def _client() -> Optional[redis.Redis]:
+    if not os.getenv("REDIS_URL"):
+        return None
+    return get_redis_client()
+
+
+def get(user_id: str, genres: Optional[List[str]]) -> Tuple[Optional[Dict[str, Any]], Optional[list], Optional[str]]:
+    """
+    캐시 조회 (1 round trip)
+
+    Returns:
+        (base, genre_sessions, version)
+        - base가 None이면 미스
+        - 장르 요청인데 genre_sessions가 None이면 해당 장르 항목만 미스
+        - version은 put()에 그대로 전달
+    """
+    try:
+        client = _client()
+        if client is None:
+            return None, None, None
+
+        fields = ["base"] + ([_genre_field(genres)] if genres else [])
+        pipe = client.pipeline(transaction=False)
+        pipe.hmget(_key(user_id), fields)
+        pipe.get(_version_key(user_id))
+        values, version = pipe.execute()
+
+        base = json.loads(values[0]) if values[0] else None
+        if not genres:
+            return base, [], version
+        genre_sessions = json.loads(values[1]) if values[1] else None
+        return base, genre_sessions, version
+    except Exception as e:
+        print(f"[ContextCache] get failed ({user_id[:8]}...): {e}")
+        return None, None, None
+
+
+def put(
+    user_id: str,
+    genres: Optional[List[str]],
+    base: Dict[str, Any],
+    genre_sessions: list,
+    version: Optional[str]
+):
+    """DB 조회 결과 저장 - 조회 이후 변경(version 증가)이 있었으면 저장하지 않음"""
+    try:
+        client = _client()
+        if client is None:
+            return
+
+        key, version_key = _key(user_id), _version_key(user_id)
+        mapping = {"base": json.dumps(base)}
+        if genres:
+            mapping[_genre_field(genres)] = json.dumps(genre_sessions)
+
+        with client.pipeline() as pipe:
+            pipe.watch(version_key)
+            if pipe.get(version_key) != version:
+                return
+            pipe.multi()
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, CONTEXT_CACHE_TTL)
+            pipe.execute()
+    except redis.WatchError:
+        pass  # 조회 중 변경 발생 → 다음 요청에서 다시 조회
+    except Exception as e:
+        print(f"[ContextCache] put failed ({user_id[:8]}...): {e}")
+
+
+def invalidate(user_id: str):
+    """사용자 컨텍스트 삭제 (커밋 후 호출) - 재추천 교체 후보(reserve)도 함께 삭제"""
+    try:
+        client = _client()
+        if client is None:
+            return
+
+        pipe = client.pipeline()
+        pipe.delete(_key(user_id))
+        reserve.invalidate_pipeline(pipe, user_id)
+        pipe.incr(_version_key(user_id))
+        pipe.expire(_version_key(user_id), CONTEXT_CACHE_TTL)
+        pipe.execute()
+    except Exception as e:
+        print(f"[ContextCache] invalidate failed ({user_id[:8]}...): {e}")
+
+
+def _update(user_id: str, apply):
+    """
+    캐시된 항목을 그 자리에서 갱신 (WATCH/MULTI)
+
+    apply(fields) -> 변경할 {field: value} (fields: 현재 hash 전체, JSON 디코드됨)
+    항목이 없으면 버전만 증가 (다음 조회 때 DB에서 새로 읽음)
+    """
+    try:
+        client = _client()
+        if client is None:
+            return
+
+        key, version_key = _key(user_id), _version_key(user_id)
+
+        def transaction(pipe):
+            raw = pipe.hgetall(key)
+            pipe.multi()
+            if raw.get("base"):
+                fields = {name: json.loads(value) for name, value in raw.items()}
+                changes = apply(fields)
+                if changes:
+                    pipe.hset(key, mapping={name: json.dumps(value) for name, value in changes.items()})
+            pipe.incr(version_key)
+            pipe.expire(version_key, CONTEXT_CACHE_TTL)
+
+        client.transaction(transaction, key)
+    except Exception as e:
+        print(f"[ContextCache] update failed ({user_id[:8]}...): {e}")
+        invalidate(user_id)
+
+
+def record_session(
+    user_id: str,
+    genres: Optional[List[str]],
+    movie_ids: List[int],
+    track_a_ids: List[int],
+    track_b_ids: List[int]
+):
+    """추천 세션 저장 반영 - 최근 세션 / 겹치는 장르의 Track A 목록 앞에 추가"""
+    requested = set(genres or [])
+
+    def apply(fields):
+        base = fields["base"]
+        session = {"ids": movie_ids, "ab": track_a_ids + track_b_ids}
+        base["sessions"] = ([session] + base.get("sessions", []))[:CONTEXT_SESSION_LIMIT]
+        changes = {"base": base}
+
+        for name, genre_sessions in fields.items():
+            if not name.startswith("genres:"):
+                continue
+            if requested & set(name[len("genres:"):].split(",")):
+                changes[name] = ([track_a_ids] + genre_sessions)[:CONTEXT_SESSION_LIMIT]
+        return changes
+
+    _update(user_id, apply)
+
+
+def add_feedback(user_id: str, movie_ids: List[int]):
+    """OTT 클릭 / 재추천 등 피드백 추가 반영 (제외 목록용 feedback_ids)"""
+    def apply(fields):
+        base = fields["base"]
+        base["feedback_ids"] = list(dict.fromkeys(movie_ids + base.get("feedback_ids", [])))
+        return {"base": base}
+
+    _update(user_id, apply)
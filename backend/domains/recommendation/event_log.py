@@ -0,0 +1,96 @@
+# backend/domains/recommendation/event_log.py
+"""
+추천 활동 이벤트 write-behind 기록 (OTT 클릭, 재추천, 시청 기록)
+
+요청 경로에서는 큐에 넣기만 하고 백그라운드 스레드가 EVENT_FLUSH_INTERVAL초마다 다건 INSERT
+→ 응답 시간이 primary DB 쓰기 지연과 무관
+
+- user_movie_feedback: 다건 INSERT (created_at은 이벤트 발생 시각)
+- movie_logs: 다건 upsert (같은 배치의 같은 (user, movie)는 마지막 것만)
+- 시청 기록은 추천 제외 목록에 영향 → 커밋 후 context_cache.invalidate()
+  (피드백은 호출 시점에 context_cache.add_feedback()으로 캐시를 바로 갱신)
+
+추천 세션 저장은 session_id를 응답에 돌려줘야 하므로 동기 기록 유지
+"""
+
+import os
+import uuid
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from backend.core.write_behind import WriteBehindQueue
+from . import context_cache
+from .models import MovieLog, UserMovieFeedback
+
+EVENT_BATCH_SIZE = int(os.getenv("EVENT_BATCH_SIZE", "500"))
+EVENT_FLUSH_INTERVAL = float(os.getenv("EVENT_FLUSH_INTERVAL", "0.2"))
+EVENT_QUEUE_MAX = int(os.getenv("EVENT_QUEUE_MAX", "20000"))
+EVENT_QUEUE_BLOCK_TIMEOUT = float(os.getenv("EVENT_QUEUE_BLOCK_TIMEOUT", "0.5"))  # 동기 엔드포인트 backpressure
+EVENT_QUEUE_OVERFLOW = os.getenv("EVENT_QUEUE_OVERFLOW", "drop_newest")
+
+
+class ActivityEventWriter(WriteBehindQueue):
+    """item: ("feedback" | "watched", row dict)"""
+
+    def write_batch(self, db: Session, items: List[tuple]):
+        feedback = [row for kind, row in items if kind == "feedback"]
+        watched = {}
+        for kind, row in items:
+            if kind == "watched":
+                watched[(row["user_id"], row["movie_id"])] = row
+
+        if feedback:
+            db.execute(insert(UserMovieFeedback), feedback)
+        if watched:
+            stmt = pg_insert(MovieLog)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[MovieLog.user_id, MovieLog.movie_id],
+                set_={"watched_at": stmt.excluded.watched_at}
+            )
+            db.execute(stmt, list(watched.values()))
+
+    def after_commit(self, items: List[tuple]):
+        for user_id in {str(row["user_id"]) for kind, row in items if kind == "watched"}:
+            context_cache.invalidate(user_id)
+
+
+activity_writer = ActivityEventWriter(
+    "activity_events",
+    batch_size=EVENT_BATCH_SIZE,
+    flush_interval=EVENT_FLUSH_INTERVAL,
+    max_size=EVENT_QUEUE_MAX,
+    overflow=EVENT_QUEUE_OVERFLOW
+)
+
+
+def _submit(kind: str, row: dict, blocking: bool) -> bool:
+    # async 엔드포인트는 blocking=False (이벤트 루프에서 대기 금지)
+    return activity_writer.submit((kind, row), timeout=EVENT_QUEUE_BLOCK_TIMEOUT if blocking else 0)
+
+
+def record_feedback(
+    user_id: str,
+    movie_id: int,
+    feedback_type: str,
+    session_id=None,
+    blocking: bool = True
+) -> bool:
+    return _submit("feedback", {
+        "user_id": uuid.UUID(str(user_id)),
+        "movie_id": movie_id,
+        "session_id": session_id,
+        "feedback_type": feedback_type,
+        "created_at": datetime.now()
+    }, blocking)
+
+
+def record_watched(user_id: str, movie_id: int, blocking: bool = True) -> bool:
+    return _submit("watched", {
+        "user_id": uuid.UUID(str(user_id)),
+        "movie_id": movie_id,
+        "watched_at": datetime.now()
+    }, blocking)
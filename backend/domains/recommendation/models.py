@@ -44,4 +44,14 @@ class RecommendationSession(Base):
     req_runtime_max = Column(Integer, nullable=True)
     recommended_movie_ids = Column(ARRAY(Integer), nullable=True)  # SQL 스키마: integer[]
     feedback_details = Column(JSONB, nullable=True)
-    created_at = Column(TIMESTAMP, server_default=func.now())
\ No newline at end of file
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+class RecommendationSessionItem(Base):
+    """세션별 추천 영화 (이전 추천 제외 목록 조회용 정규화 테이블)"""
+    __tablename__ = "recommendation_session_items"
+
+    session_id = Column(BigInteger, ForeignKey("recommendation_sessions.session_id", ondelete="CASCADE"), primary_key=True)
+    track = Column(String(1), primary_key=True)  # 'a': 선호 장르, 'b': 장르 확장
+    movie_id = Column(Integer, primary_key=True)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now())
@@ -0,0 +1,138 @@
+# backend/domains/recommendation/reserve.py
+"""
+재추천 교체 후보 예비 목록 (Redis, 모든 uvicorn 워커 공유)
+
+/recommend 때 AI 서비스가 조합에 쓰지 않은 후보 중 트랙별 / 런타임 구간별 상위 영화를 함께 반환
+→ 세션 단위로 보관했다가 /recommend/single 요청을 컨텍스트 조회 / AI 호출 없이 처리
+
+키 구조 - 사용자당 최신 세션 1개
+- rec_reserve:{user_id}: {"session_id", "genres", "allow_adult", "a": [...], "b": [...]} (JSON)
+- rec_reserve_served:{user_id}: 이미 교체 결과로 내준 영화 ID (Set, 워커 간 중복 방지)
+
+AI 서비스로 넘기는 경우 (take()가 None)
+- 다른 세션 / 장르 / 성인물 조건의 요청
+- 대상 런타임 90~100% 구간에 남은 후보 없음 (AI는 70% / 0%까지 확장 탐색)
+- 시청 기록 / OTT / 온보딩 / 만족도 조사 변경 → context_cache.invalidate()에서 함께 삭제
+
+Redis 장애 / REDIS_URL 미설정 시 항상 AI 서비스 호출 (fail-open)
+"""
+
+import json
+import os
+import random
+from typing import Any, Dict, List, Optional
+
+import redis
+
+from backend.utils.redis import get_redis_client
+
+RESERVE_ENABLED = os.getenv("REC_RESERVE_ENABLED", "true").lower() == "true"
+RESERVE_TTL = int(os.getenv("REC_RESERVE_TTL", "1800"))  # 30분
+
+
+def _key(user_id: str) -> str:
+    return f"rec_reserve:{user_id}"
+
+
+def _served_key(user_id: str) -> str:
+    return f"rec_reserve_served:{user_id}"
+
+
+def _client() -> Optional[redis.Redis]:
+    if not RESERVE_ENABLED or not os.getenv("REDIS_URL"):
+        return None
+    return get_redis_client()
+
+
+def put(
+    user_id: str,
+    session_id: int,
+    genres: Optional[List[str]],
+    allow_adult: bool,
+    reserve: Optional[Dict[str, List[Dict[str, Any]]]]
+):
+    """세션 저장 후 교체 후보 보관 (이전 세션의 후보 / 사용 기록은 교체)"""
+    if not reserve:
+        return
+    try:
+        client = _client()
+        if client is None:
+            return
+
+        value = {
+            "session_id": session_id,
+            "genres": sorted(genres or []),
+            "allow_adult": allow_adult,
+            "a": reserve.get("a") or [],
+            "b": reserve.get("b") or [],
+        }
+        pipe = client.pipeline()
+        pipe.set(_key(user_id), json.dumps(value), ex=RESERVE_TTL)
+        pipe.delete(_served_key(user_id))
+        pipe.execute()
+    except Exception as e:
+        print(f"[Reserve] put failed ({user_id[:8]}...): {e}")
+
+
+def take(
+    user_id: str,
+    session_id: Optional[int],
+    track: str,
+    target_runtime: int,
+    excluded_ids: List[int],
+    genres: Optional[List[str]],
+    allow_adult: bool
+) -> Optional[Dict[str, Any]]:
+    """
+    예비 목록에서 교체 영화 1편 선택 (없으면 None → AI 서비스 호출)
+
+    선택 기준은 AI recommend_single과 동일
+    - 런타임: 대상의 90%~100%
+    - 점수에 0.7~1.3배 랜덤 노이즈 적용 후 최고점
+    """
+    if session_id is None:
+        return None
+    try:
+        client = _client()
+        if client is None:
+            return None
+
+        pipe = client.pipeline(transaction=False)
+        pipe.get(_key(user_id))
+        pipe.smembers(_served_key(user_id))
+        raw, served = pipe.execute()
+        if not raw:
+            return None
+
+        stash = json.loads(raw)
+        if (
+            stash["session_id"] != session_id
+            or stash["genres"] != sorted(genres or [])
+            or stash["allow_adult"] != allow_adult
+        ):
+            return None
+
+        excluded = set(excluded_ids) | {int(movie_id) for movie_id in served}
+        min_runtime = int(target_runtime * 0.9)
+        candidates = [
+            movie for movie in stash.get(track.lower(), [])
+            if movie["movie_id"] not in excluded and min_runtime <= movie["runtime"] <= target_runtime
+        ]
+        candidates.sort(key=lambda movie: movie.get("score", 0) * (0.7 + random.random() * 0.6), reverse=True)
+
+        # SADD 결과로 선점 (동시 요청이 같은 영화를 고르면 다음 후보)
+        for movie in candidates:
+            if client.sadd(_served_key(user_id), movie["movie_id"]):
+                client.expire(_served_key(user_id), RESERVE_TTL)
+                movie["fallback_level"] = 0
+                movie["fallback_info"] = "perfect (90-100%)"
+                return movie
+        return None
+    except Exception as e:
+        print(f"[Reserve] take failed ({user_id[:8]}...): {e}")
+        return None
+
+
+def invalidate_pipeline(pipe, user_id: str):
+    """사용자 컨텍스트 무효화와 같은 파이프라인에서 예비 목록 삭제"""
+    pipe.delete(_key(user_id), _served_key(user_id))
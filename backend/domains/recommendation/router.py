@@ -1,13 +1,16 @@
 # backend/domains/recommendation/router.py
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
 
-from backend.core.db import get_db
-from backend.domains.auth.utils import get_current_user
+from backend.core.db import get_db, get_async_db
+from backend.core.json_response import FastJSONResponse
+from backend.domains.auth.utils import get_current_user, get_current_user_async
 from backend.domains.user.models import User
-from . import service, schema
+from . import reserve, service, schema
 from .ai_model import get_ai_model
 
 # AI 모델 로딩 (싱글톤)
@@ -19,10 +22,10 @@ router = APIRouter(tags=["recommendation"])
 # ==================== 새로운 API (v2) ====================
 
 @router.post("/api/v2/recommend", response_model=schema.RecommendationResponseV2)
-def recommend_movies_v2(
+async def recommend_movies_v2(
     req: schema.RecommendationRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     영화 추천 v2 - 시간 맞춤 조합 추천
@@ -30,17 +33,19 @@ def recommend_movies_v2(
     - Track A: 선호 장르 + OTT 필터 (같은 장르일 때만 이전 기록 제외)
     - Track B: 장르 확장 (장르 상관없이 이전 기록 제외)
     - 총 런타임이 입력 시간의 90%~100% 범위
+    - async 경로: DB는 AsyncSession, AI 호출 대기 중 스레드풀 워커를 점유하지 않음
     """
     user_id = str(current_user.user_id)
 
-    # 사용자 OTT 조회
-    user_otts = service.get_user_ott_names(db, user_id)
+    # 사용자 컨텍스트 (OTT, 피드백, 온보딩, 시청 기록, 이전 추천) - 단일 쿼리
+    context = await service.load_user_context_async(db, user_id, req.genres)
+    user_otts = context.ott_names
 
     # Track A: 같은 장르일 때만 이전 기록 제외 (최근 20개 세션)
-    recent_a = service.get_recent_recommended_ids_by_genre(db, user_id, req.genres, limit=20)
-    
+    recent_a = context.recent_a_ids
+
     # Track B: 장르 상관없이 이전 기록 제외 (최근 20개 세션)
-    recent_b = service.get_recent_recommended_ids_all(db, user_id, limit=20)
+    recent_b = context.recent_b_ids
 
     excluded_a = list(set((req.excluded_ids or []) + recent_a))
     excluded_b = list(set((req.excluded_ids or []) + recent_b))
@@ -54,8 +59,8 @@ def recommend_movies_v2(
         print(f"[Recommend] Track B excluded IDs (first 10): {excluded_b[:10]}")
 
     # AI 추천 호출 (Track A, B 별도 제외 목록)
-    result = ai_model.recommend(
-        user_id=user_id,
+    result = await ai_model.recommend_async(
+        context=context,
         available_time=req.runtime_limit or 180,
         preferred_genres=req.genres or None,
         preferred_otts=user_otts,
@@ -64,52 +69,72 @@ def recommend_movies_v2(
         excluded_ids_b=excluded_b
     )
 
+    # 교체 후보 예비 목록 (응답에는 포함하지 않고 세션별로 보관)
+    reserve_items = result.pop('reserve', None)
+
     # 추천 결과 저장 (Track A, B 분리) - session_id 반환
     track_a_ids = [m['movie_id'] for m in result.get('track_a', {}).get('movies', [])]
     track_b_ids = [m['movie_id'] for m in result.get('track_b', {}).get('movies', [])]
 
     session_id = None
     if track_a_ids or track_b_ids:
-        session_id = service.save_recommendation_session(
+        session_id = await service.save_recommendation_session_async(
             db, user_id, req.genres, req.runtime_limit or 180, track_a_ids, track_b_ids
         )
+        await run_in_threadpool(
+            reserve.put, user_id, session_id, req.genres, not req.exclude_adult, reserve_items
+        )
 
-    # session_id를 응답에 추가
-    result['session_id'] = session_id
-    return result
+    # RecommendationResponseV2 필드만 그대로 직렬화 (response_model 재검증 생략, 스키마는 문서용)
+    return FastJSONResponse({
+        "track_a": result.get("track_a"),
+        "track_b": result.get("track_b"),
+        "elapsed_time": result.get("elapsed_time"),
+        "session_id": session_id,
+    })
 
 
 @router.post("/api/v2/recommend/single", response_model=schema.ReRecommendResponse)
-def recommend_single_movie(
+async def recommend_single_movie(
     req: schema.ReRecommendRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     개별 영화 재추천 - 단일 영화 교체
 
     - 기존 추천 영화를 새 영화로 교체
     - 런타임이 대상 영화의 90%~100% 범위
+    - /recommend 때 보관한 교체 후보(reserve)에서 먼저 선택, 없을 때만 AI 호출
     """
     user_id = str(current_user.user_id)
 
-    # 사용자 OTT 조회
-    user_otts = service.get_user_ott_names(db, user_id)
-
-    # AI 단일 추천 호출
-    movie = ai_model.recommend_single(
-        user_id=user_id,
-        target_runtime=req.target_runtime,
-        excluded_ids=req.excluded_ids,
-        track=req.track,
-        preferred_genres=req.genres or None,
-        preferred_otts=user_otts,
-        allow_adult=not req.exclude_adult
+    # 교체 후보 예비 목록 (컨텍스트 조회 / AI 호출 없음)
+    movie = await run_in_threadpool(
+        reserve.take, user_id, req.session_id, req.track, req.target_runtime,
+        req.excluded_ids, req.genres, not req.exclude_adult
     )
+    if movie:
+        print(f"[Recommend] Reserve hit: session={req.session_id}, track={req.track}, movie={movie.get('movie_id')}")
+    else:
+        # 사용자 컨텍스트 (OTT, 피드백, 온보딩, 시청 기록, 이전 추천) - 단일 쿼리
+        context = await service.load_user_context_async(db, user_id)
+        user_otts = context.ott_names
+
+        # AI 단일 추천 호출
+        movie = await ai_model.recommend_single_async(
+            context=context,
+            target_runtime=req.target_runtime,
+            excluded_ids=req.excluded_ids,
+            track=req.track,
+            preferred_genres=req.genres or None,
+            preferred_otts=user_otts,
+            allow_adult=not req.exclude_adult
+        )
 
     if movie:
         # 재추천 활동 로깅 (B2C 활동 피드용)
-        service.log_re_recommendation(
+        await service.log_re_recommendation_async(
             db=db,
             user_id=user_id,
             source_movie_id=req.source_movie_id,
@@ -110,3 +110,31 @@ class MovieDetailResponse(BaseModel):
     info: MovieInfo
     otts: List[OttInfo]
     tag_genome: Optional[dict] = None
+
+
+# ==================== Internal - User Context ====================
+
+class UserRecommendationContext(BaseModel):
+    """
+    추천 1회에 필요한 사용자 데이터 (service.load_user_context 단일 쿼리로 구성)
+    - router: OTT / Track별 이전 추천 제외 목록
+    - AIModelAdapter: 프로필 영화 / 피드백 / 최근 추천 제외
+    """
+    user_id: str
+    ott_names: Optional[List[str]] = None  # 구독 OTT (없으면 None)
+    positive_ids: List[int] = []  # 만족 피드백 (최근 20개)
+    negative_ids: List[int] = []  # 불만족 피드백 (최근 20개, 유사도 페널티용)
+    feedback_ids: List[int] = []  # 모든 피드백 영화 (제외용)
+    onboarding_ids: List[int] = []  # 온보딩 선택 영화
+    watched_ids: List[int] = []  # 시청 기록 (최근 50개)
+    recent_ids: List[int] = []  # 최근 3개 세션 추천 영화
+    recent_a_ids: List[int] = []  # Track A: 같은 장르 최근 20개 세션
+    recent_b_ids: List[int] = []  # Track B: 장르 무관 최근 20개 세션
+
+    def profile_movie_ids(self) -> List[int]:
+        """프로필 영화 (긍정 피드백 > 온보딩 > 시청 기록, 순서 유지 중복 제거)"""
+        return list(dict.fromkeys(self.positive_ids + self.onboarding_ids + self.watched_ids))
+
+    def excluded_ids(self, extra: Optional[List[int]] = None) -> List[int]:
+        """요청 제외 목록 + 최근 추천 + 모든 피드백 영화"""
+        return list(set((extra or []) + self.recent_ids + self.feedback_ids))
@@ -1,31 +1,224 @@
 # backend/domains/recommendation/service.py
 
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 
 # [중요] 타 도메인 모델 Import
+from backend.domains.movie import ott_registry
 from backend.domains.movie.models import Movie, MovieOttMap, OttProvider
-from backend.domains.recommendation.models import MovieLog, MovieClick
-from . import schema
+from . import context_cache, event_log, schema
 
 
 def get_user_ott_names(db: Session, user_id: str) -> Optional[List[str]]:
-    """사용자가 선택한 OTT provider_name 목록 조회"""
-    result = db.execute(
-        text("""
-            SELECT p.provider_name
-            FROM user_ott_map u
-            JOIN ott_providers p ON u.provider_id = p.provider_id
-            WHERE u.user_id = :uid
-        """),
-        {"uid": user_id}
-    ).fetchall()
-
-    if not result:
-        return None
+    """사용자가 선택한 OTT provider_name 목록 조회 (구독 OTT 캐시 + provider 사전)"""
+    return ott_registry.get_user_provider_names(db, user_id) or None
+
+
+# 태그별 조회 개수
+CONTEXT_FEEDBACK_LIMIT = 20  # 긍정/부정 피드백
+CONTEXT_WATCHED_LIMIT = 50  # 시청 기록
+CONTEXT_RECENT_SESSIONS = 3  # 최근 추천 제외 (AI 호출 시)
+CONTEXT_TRACK_SESSIONS = context_cache.CONTEXT_SESSION_LIMIT  # Track A/B 이전 추천 제외
+
+# 추천 컨텍스트 단일 쿼리 - (tag, movie_id, name, ord) 행을 UNION ALL로 반환
+# 세션 관련 태그의 ord는 세션 순위 (1 = 최신) → 캐시에 세션 단위로 보관
+# session / genre_session 행은 영화가 없는 세션도 순위를 유지하기 위한 표시용
+USER_CONTEXT_SQL = text("""
+    WITH recent_sessions AS (
+        SELECT session_id, recommended_movie_ids,
+               ROW_NUMBER() OVER (ORDER BY created_at DESC) AS rn
+        FROM recommendation_sessions
+        WHERE user_id = :uid
+        ORDER BY created_at DESC
+        LIMIT :track_sessions
+    ),
+    genre_sessions AS (
+        SELECT session_id,
+               ROW_NUMBER() OVER (ORDER BY created_at DESC) AS rn
+        FROM recommendation_sessions
+        WHERE user_id = :uid
+          AND req_genres IS NOT NULL
+          AND req_genres && CAST(:genres AS varchar[])
+        ORDER BY created_at DESC
+        LIMIT :track_sessions
+    ),
+    feedback AS (
+        SELECT movie_id, feedback_type,
+               ROW_NUMBER() OVER (PARTITION BY feedback_type ORDER BY created_at DESC) AS rn
+        FROM user_movie_feedback
+        WHERE user_id = :uid
+    )
+    SELECT 'ott' AS tag, NULL::int AS movie_id, p.provider_name::varchar AS name, p.provider_id::bigint AS ord
+    FROM user_ott_map u
+    JOIN ott_providers p ON u.provider_id = p.provider_id
+    WHERE u.user_id = :uid
+    UNION ALL
+    SELECT 'positive', movie_id, NULL::varchar, rn
+    FROM feedback WHERE feedback_type = 'satisfaction_positive' AND rn <= :feedback_limit
+    UNION ALL
+    SELECT 'negative', movie_id, NULL::varchar, rn
+    FROM feedback WHERE feedback_type = 'satisfaction_negative' AND rn <= :feedback_limit
+    UNION ALL
+    SELECT DISTINCT 'feedback', movie_id, NULL::varchar, 0::bigint
+    FROM feedback
+    UNION ALL
+    SELECT 'onboarding', movie_id, NULL::varchar, id::bigint
+    FROM user_onboarding_answers WHERE user_id = :uid
+    UNION ALL
+    SELECT 'watched', movie_id, NULL::varchar, rn
+    FROM (
+        SELECT movie_id, ROW_NUMBER() OVER (ORDER BY watched_at DESC) AS rn
+        FROM movie_logs WHERE user_id = :uid
+    ) w
+    WHERE rn <= :watched_limit
+    UNION ALL
+    SELECT 'session', NULL::int, NULL::varchar, rn
+    FROM recent_sessions
+    UNION ALL
+    SELECT 'recent', unnest(recommended_movie_ids), NULL::varchar, rn
+    FROM recent_sessions
+    UNION ALL
+    SELECT 'recent_b', i.movie_id, NULL::varchar, s.rn
+    FROM recent_sessions s
+    JOIN recommendation_session_items i ON i.session_id = s.session_id
+    UNION ALL
+    SELECT 'genre_session', NULL::int, NULL::varchar, rn
+    FROM genre_sessions
+    UNION ALL
+    SELECT 'recent_a', i.movie_id, NULL::varchar, g.rn
+    FROM genre_sessions g
+    JOIN recommendation_session_items i ON i.session_id = g.session_id AND i.track = 'a'
+    ORDER BY tag, ord
+""")
+
+
+def _unique(ids: List[int]) -> List[int]:
+    return list(dict.fromkeys(ids))
+
+
+def _context_params(user_id: str, genres: Optional[List[str]]) -> dict:
+    return {
+        "uid": user_id,
+        "genres": genres or None,
+        "feedback_limit": CONTEXT_FEEDBACK_LIMIT,
+        "watched_limit": CONTEXT_WATCHED_LIMIT,
+        "track_sessions": CONTEXT_TRACK_SESSIONS,
+    }
 
-    return [row[0] for row in result]
+
+def _group_context_rows(rows):
+    """
+    USER_CONTEXT_SQL 결과 → 컨텍스트 원본
+
+    Returns:
+        (base, genre_sessions) - context_cache에 그대로 저장되는 형태
+        - base.sessions: 최근 세션별 {"ids": 추천 영화, "ab": Track A+B} (최신순)
+        - genre_sessions: 장르가 겹치는 최근 세션별 Track A ID (최신순)
+    """
+    grouped = {}
+    ott_names = []
+    sessions = {}
+    genre_sessions = {}
+    for tag, movie_id, name, ord in rows:
+        if tag == "ott":
+            ott_names.append(name)
+        elif tag in ("session", "recent", "recent_b"):
+            session = sessions.setdefault(ord, {"ids": [], "ab": []})
+            if tag == "recent":
+                session["ids"].append(movie_id)
+            elif tag == "recent_b":
+                session["ab"].append(movie_id)
+        elif tag in ("genre_session", "recent_a"):
+            track_a = genre_sessions.setdefault(ord, [])
+            if tag == "recent_a":
+                track_a.append(movie_id)
+        elif movie_id is not None:
+            grouped.setdefault(tag, []).append(movie_id)
+
+    base = {
+        "ott_names": ott_names or None,
+        "positive_ids": _unique(grouped.get("positive", [])),
+        "negative_ids": _unique(grouped.get("negative", [])),
+        "feedback_ids": _unique(grouped.get("feedback", [])),
+        "onboarding_ids": _unique(grouped.get("onboarding", [])),
+        "watched_ids": _unique(grouped.get("watched", [])),
+        "sessions": [sessions[rank] for rank in sorted(sessions)],
+    }
+    return base, [genre_sessions[rank] for rank in sorted(genre_sessions)]
+
+
+def _query_user_context(db: Session, user_id: str, genres: Optional[List[str]]):
+    """단일 쿼리로 컨텍스트 원본 조회"""
+    rows = db.execute(USER_CONTEXT_SQL, _context_params(user_id, genres)).fetchall()
+    return _group_context_rows(rows)
+
+
+def _build_context(user_id: str, base: dict, genre_sessions: list) -> schema.UserRecommendationContext:
+    """컨텍스트 원본(DB 또는 캐시) → UserRecommendationContext"""
+    sessions = base.get("sessions", [])
+    return schema.UserRecommendationContext(
+        user_id=user_id,
+        ott_names=base.get("ott_names"),
+        positive_ids=base.get("positive_ids", []),
+        negative_ids=base.get("negative_ids", []),
+        feedback_ids=base.get("feedback_ids", []),
+        onboarding_ids=base.get("onboarding_ids", []),
+        watched_ids=base.get("watched_ids", []),
+        recent_ids=_unique([mid for s in sessions[:CONTEXT_RECENT_SESSIONS] for mid in s["ids"]]),
+        recent_a_ids=_unique([mid for ids in genre_sessions for mid in ids]),
+        recent_b_ids=_unique([mid for s in sessions for mid in s["ab"]]),
+    )
+
+
+def load_user_context(
+    db: Session,
+    user_id: str,
+    genres: Optional[List[str]] = None
+) -> schema.UserRecommendationContext:
+    """
+    추천에 필요한 사용자 데이터 조회 (Redis 캐시 → 없으면 단일 쿼리)
+
+    기존 router(get_user_ott_names, get_recent_recommended_ids_*)와
+    AIModelAdapter(_get_*_movies) 개별 쿼리 7개 이상을 대체
+    캐시는 쓰기 경로에서 명시적으로 무효화/갱신 (context_cache 참고)
+
+    Args:
+        db: 요청 세션
+        user_id: 사용자 ID
+        genres: 요청 장르 (Track A 이전 추천 제외용, 없으면 recent_a_ids 비어 있음)
+    """
+    base, genre_sessions, version = context_cache.get(user_id, genres)
+    if base is None or genre_sessions is None:
+        base, genre_sessions = _query_user_context(db, user_id, genres)
+        context_cache.put(user_id, genres, base, genre_sessions, version)
+    else:
+        print(f"[Recommend] User context cache hit: {user_id[:8]}...")
+
+    return _build_context(user_id, base, genre_sessions)
+
+
+async def load_user_context_async(
+    db: AsyncSession,
+    user_id: str,
+    genres: Optional[List[str]] = None
+) -> schema.UserRecommendationContext:
+    """
+    load_user_context의 async 버전 (async 추천 엔드포인트용)
+
+    DB 조회는 AsyncSession, Redis 캐시(동기 클라이언트, ms 단위)는 스레드풀에서 실행
+    """
+    base, genre_sessions, version = await run_in_threadpool(context_cache.get, user_id, genres)
+    if base is None or genre_sessions is None:
+        rows = (await db.execute(USER_CONTEXT_SQL, _context_params(user_id, genres))).fetchall()
+        base, genre_sessions = _group_context_rows(rows)
+        await run_in_threadpool(context_cache.put, user_id, genres, base, genre_sessions, version)
+    else:
+        print(f"[Recommend] User context cache hit: {user_id[:8]}...")
+
+    return _build_context(user_id, base, genre_sessions)
 
 
 def get_hybrid_recommendations(db: Session, user_id: str, req: schema.RecommendationRequest, model_instance):
@@ -82,30 +275,44 @@ def get_hybrid_recommendations(db: Session, user_id: str, req: schema.Recommenda
     return results
 
 def log_click(db: Session, user_id: str, movie_id: int, provider_id: int):
-    """OTT 클릭을 user_movie_feedback 테이블에 저장 (provider_id 포함)"""
-    try:
-        # feedback_type에 provider_id를 포함시켜 저장 (예: 'ott_click:8')
-        feedback_type = f'ott_click:{provider_id}' if provider_id else 'ott_click'
-        new_feedback = MovieClick(
-            user_id=user_id,
-            movie_id=movie_id,
-            feedback_type=feedback_type,
-            session_id=None
-        )
-        db.add(new_feedback)
-        db.commit()
-    except Exception as e:
-        db.rollback()
-        print(f"[WARN] OTT 클릭 로깅 실패: {e}")
+    """OTT 클릭을 user_movie_feedback 테이블에 저장 (provider_id 포함) - write-behind 배치 기록"""
+    # feedback_type에 provider_id를 포함시켜 저장 (예: 'ott_click:8')
+    feedback_type = f'ott_click:{provider_id}' if provider_id else 'ott_click'
+    if event_log.record_feedback(user_id, movie_id, feedback_type):
+        context_cache.add_feedback(user_id, [movie_id])
+
 
 def mark_watched(db: Session, user_id: str, movie_id: int):
-    stmt = text("""
-        INSERT INTO movie_logs (user_id, movie_id, watched_at)
-        VALUES (:uid, :mid, NOW())
-        ON CONFLICT (user_id, movie_id) DO UPDATE SET watched_at = NOW()
-    """)
-    db.execute(stmt, {"uid": user_id, "mid": movie_id})
-    db.commit()
+    """시청 기록 (movie_logs upsert) - write-behind 배치 기록, 기록 후 컨텍스트 캐시 무효화"""
+    event_log.record_watched(user_id, movie_id)
+
+
+# 이전 추천 제외 목록 - recommendation_session_items에서 단일 SELECT DISTINCT
+# (세션은 idx_rec_sessions_user_created, 영화는 items PK (session_id, track, movie_id) 사용)
+RECENT_IDS_BY_GENRE_SQL = text("""
+    SELECT DISTINCT i.movie_id
+    FROM (
+        SELECT session_id
+        FROM recommendation_sessions
+        WHERE user_id = :uid
+          AND req_genres && CAST(:genres AS varchar[])
+        ORDER BY created_at DESC
+        LIMIT :lim
+    ) s
+    JOIN recommendation_session_items i ON i.session_id = s.session_id AND i.track = 'a'
+""")
+
+RECENT_IDS_ALL_SQL = text("""
+    SELECT DISTINCT i.movie_id
+    FROM (
+        SELECT session_id
+        FROM recommendation_sessions
+        WHERE user_id = :uid
+        ORDER BY created_at DESC
+        LIMIT :lim
+    ) s
+    JOIN recommendation_session_items i ON i.session_id = s.session_id
+""")
 
 
 def get_recent_recommended_ids_by_genre(
@@ -119,40 +326,10 @@ def get_recent_recommended_ids_by_genre(
     장르가 같은 최근 N회 추천된 Track A 영화 ID 조회
     """
     if not genres:
-        print(f"[DEBUG Track A] No genres provided, returning empty list")
         return []
 
-    print(f"[DEBUG Track A] Genres: {genres}, User: {user_id[:8]}..., Limit: {limit}")
-
-    # 장르가 일치하는 세션에서 track_a_ids 조회
-    result = db.execute(
-        text("""
-            SELECT feedback_details->>'track_a_ids' as track_a_ids
-            FROM recommendation_sessions
-            WHERE user_id = :uid
-              AND req_genres IS NOT NULL
-              AND req_genres && CAST(:genres AS varchar[])
-            ORDER BY created_at DESC
-            LIMIT :lim
-        """),
-        {"uid": user_id, "genres": genres, "lim": limit}
-    ).fetchall()
-
-    print(f"[DEBUG Track A] Query returned {len(result)} sessions")
-
-    all_ids = set()
-    for row in result:
-        if row[0]:
-            try:
-                import json
-                ids = json.loads(row[0])
-                print(f"[DEBUG Track A] Found {len(ids)} IDs in session: {ids[:5]}..." if len(ids) > 5 else f"[DEBUG Track A] Found {len(ids)} IDs: {ids}")
-                all_ids.update(ids)
-            except:
-                pass
-
-    print(f"[DEBUG Track A] Total unique IDs to exclude: {len(all_ids)}")
-    return list(all_ids)
+    result = db.execute(RECENT_IDS_BY_GENRE_SQL, {"uid": user_id, "genres": genres, "lim": limit}).fetchall()
+    return [row[0] for row in result]
 
 
 def get_recent_recommended_ids_all(db: Session, user_id: str, limit: int = 5) -> List[int]:
@@ -160,38 +337,49 @@ def get_recent_recommended_ids_all(db: Session, user_id: str, limit: int = 5) ->
     Track B용: 장르 상관없이 최근 N회 추천된 전체 영화 ID 조회
     Track A + Track B 모두 제외 (어떤 트랙에서든 추천된 영화는 제외)
     """
-    result = db.execute(
-        text("""
-            SELECT
-                feedback_details->>'track_a_ids' as track_a_ids,
-                feedback_details->>'track_b_ids' as track_b_ids
-            FROM recommendation_sessions
-            WHERE user_id = :uid
-            ORDER BY created_at DESC
-            LIMIT :lim
-        """),
-        {"uid": user_id, "lim": limit}
-    ).fetchall()
-
-    all_ids = set()
+    result = db.execute(RECENT_IDS_ALL_SQL, {"uid": user_id, "lim": limit}).fetchall()
+    return [row[0] for row in result]
+
+
+# 세션 + 세션 영화(recommendation_session_items)를 한 문장으로 저장
+SAVE_SESSION_SQL = text("""
+    WITH new_session AS (
+        INSERT INTO recommendation_sessions
+        (user_id, req_genres, req_runtime_max, recommended_movie_ids, feedback_details, created_at)
+        VALUES (:uid, :genres, :runtime, :movie_ids, :feedback, NOW())
+        RETURNING session_id, user_id, created_at
+    ),
+    new_items AS (
+        INSERT INTO recommendation_session_items (session_id, user_id, movie_id, track, created_at)
+        SELECT n.session_id, n.user_id, t.movie_id, t.track, n.created_at
+        FROM new_session n
+        CROSS JOIN (
+            SELECT unnest(CAST(:track_a_ids AS integer[])) AS movie_id, 'a' AS track
+            UNION ALL
+            SELECT unnest(CAST(:track_b_ids AS integer[])), 'b'
+        ) t
+        ON CONFLICT DO NOTHING
+    )
+    SELECT session_id FROM new_session
+""")
+
+
+def _session_params(user_id, genres, runtime_max, track_a_ids, track_b_ids) -> dict:
     import json
-    for row in result:
-        # Track A IDs
-        if row[0]:
-            try:
-                ids = json.loads(row[0])
-                all_ids.update(ids)
-            except:
-                pass
-        # Track B IDs
-        if row[1]:
-            try:
-                ids = json.loads(row[1])
-                all_ids.update(ids)
-            except:
-                pass
-
-    return list(all_ids)
+
+    feedback_details = {
+        "track_a_ids": track_a_ids,
+        "track_b_ids": track_b_ids
+    }
+    return {
+        "uid": user_id,
+        "genres": genres,
+        "runtime": runtime_max,
+        "movie_ids": track_a_ids + track_b_ids,
+        "track_a_ids": track_a_ids,
+        "track_b_ids": track_b_ids,
+        "feedback": json.dumps(feedback_details)
+    }
 
 
 def save_recommendation_session(
@@ -203,30 +391,34 @@ def save_recommendation_session(
     track_b_ids: List[int]
 ) -> int:
     """추천 세션 저장 (Track A, B 분리 저장) - session_id 반환"""
-    import json
-
-    feedback_details = {
-        "track_a_ids": track_a_ids,
-        "track_b_ids": track_b_ids
-    }
-
     result = db.execute(
-        text("""
-            INSERT INTO recommendation_sessions
-            (user_id, req_genres, req_runtime_max, recommended_movie_ids, feedback_details, created_at)
-            VALUES (:uid, :genres, :runtime, :movie_ids, :feedback, NOW())
-            RETURNING session_id
-        """),
-        {
-            "uid": user_id,
-            "genres": genres,
-            "runtime": runtime_max,
-            "movie_ids": track_a_ids + track_b_ids,
-            "feedback": json.dumps(feedback_details)
-        }
+        SAVE_SESSION_SQL,
+        _session_params(user_id, genres, runtime_max, track_a_ids, track_b_ids)
     )
     session_id = result.fetchone()[0]
     db.commit()
+    context_cache.record_session(user_id, genres, track_a_ids + track_b_ids, track_a_ids, track_b_ids)
+    return session_id
+
+
+async def save_recommendation_session_async(
+    db: AsyncSession,
+    user_id: str,
+    genres: Optional[List[str]],
+    runtime_max: int,
+    track_a_ids: List[int],
+    track_b_ids: List[int]
+) -> int:
+    """save_recommendation_session의 async 버전"""
+    result = await db.execute(
+        SAVE_SESSION_SQL,
+        _session_params(user_id, genres, runtime_max, track_a_ids, track_b_ids)
+    )
+    session_id = result.scalar_one()
+    await db.commit()
+    await run_in_threadpool(
+        context_cache.record_session, user_id, genres, track_a_ids + track_b_ids, track_a_ids, track_b_ids
+    )
     return session_id
 
 
@@ -238,7 +430,7 @@ def log_re_recommendation(
     session_id: Optional[int] = None
 ):
     """
-    재추천 활동 로깅 (user_movie_feedback 테이블)
+    재추천 활동 로깅 (user_movie_feedback 테이블) - write-behind 배치 기록
     - result_movie_id: 새로 추천된 영화 (movie_id 필드에 저장)
     - session_id: 추천 세션 ID (FK 제약조건 준수)
 
@@ -248,16 +440,21 @@ def log_re_recommendation(
     if result_movie_id is None:
         return  # 추천 실패 시 로깅 안함
 
-    db.execute(
-        text("""
-            INSERT INTO user_movie_feedback
-            (user_id, movie_id, session_id, feedback_type, created_at)
-            VALUES (:uid, :mid, :sid, 're_recommendation', NOW())
-        """),
-        {
-            "uid": user_id,
-            "mid": result_movie_id,  # 새로 추천된 영화 ID
-            "sid": session_id        # 실제 추천 세션 ID (FK 준수)
-        }
-    )
-    db.commit()
\ No newline at end of file
+    # movie_id: 새로 추천된 영화 ID, session_id: 실제 추천 세션 ID (FK 준수)
+    if event_log.record_feedback(user_id, result_movie_id, 're_recommendation', session_id):
+        context_cache.add_feedback(user_id, [result_movie_id])
+
+
+async def log_re_recommendation_async(
+    db: AsyncSession,
+    user_id: str,
+    source_movie_id: Optional[int],
+    result_movie_id: Optional[int],
+    session_id: Optional[int] = None
+):
+    """log_re_recommendation의 async 버전 (큐가 가득 차도 이벤트 루프에서 기다리지 않음)"""
+    if result_movie_id is None:
+        return  # 추천 실패 시 로깅 안함
+
+    if event_log.record_feedback(user_id, result_movie_id, 're_recommendation', session_id, blocking=False):
+        await run_in_threadpool(context_cache.add_feedback, user_id, [result_movie_id])
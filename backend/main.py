@@ -5,6 +5,8 @@ from dotenv import load_dotenv
 # 환경변수 로드 (.env) - 모든 import 전에 먼저 로드해야 함
 load_dotenv()
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -18,6 +20,24 @@ from backend.domains.recommendation.router import router as recommendation_route
 from backend.domains.mypage.router import router as mypage_router
 from backend.domains.b2b.router import router as b2b_router
 from backend.domains.b2b.external_router import router as external_router
+from backend.domains.b2b.gateway import AI_HEDGE_ENABLED, ai_hedge, ai_pool
+from backend.core import write_behind
+from backend.core.http_clients import http_clients
+from backend.core.json_response import FastJSONResponse
+from backend.core.db import async_engine
+from backend.utils import cache
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # 종료: write-behind 큐(사용량, 활동 이벤트) 기록 → 서비스 간 HTTP 커넥션 / async DB 풀 정리
+    write_behind.stop_all()
+    ai_pool.stop()
+    await http_clients.close_all()
+    if async_engine is not None:
+        await async_engine.dispose()
+
 
 app = FastAPI(
     title="MovieSir API",
@@ -25,6 +45,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/swagger",
     redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # CORS 설정 - 프로덕션 (모든 origin 허용, B2B API는 API Key로 인증)
@@ -34,6 +56,10 @@ app.add_middleware(
     allow_credentials=False,  # 와일드카드 사용 시 False 필수
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset",
+        "X-RateLimit-Burst-Limit", "X-RateLimit-Burst-Remaining", "Retry-After",
+    ],
 )
 
 # CORS 설정 - 로컬 개발 환경 (credentials 허용)
@@ -63,3 +89,27 @@ app.include_router(external_router)
 @app.get("/")
 def root():
     return {"message": "ok"}
+
+
+@app.get("/metrics/http-pools")
+def http_pool_metrics():
+    """서비스 간 HTTP 커넥션 풀 사용률 (업스트림별)"""
+    return http_clients.stats()
+
+
+@app.get("/metrics/write-behind")
+def write_behind_metrics():
+    """write-behind 큐 상태 (대기 / 기록 / 버림 / 실패 건수)"""
+    return write_behind.stats_all()
+
+
+@app.get("/metrics/caches")
+def cache_metrics():
+    """프로세스 내 캐시 적중률 / 크기 / 제거 건수 (캐시별)"""
+    return cache.stats_all()
+
+
+@app.get("/metrics/ai-pool")
+def ai_pool_metrics():
+    """AI 복제본별 처리 중 요청 / 헬스 / 브레이커 / p99 제외 상태 + hedge 비율 / 승리 건수"""
+    return {**ai_pool.stats(), "hedging": {"enabled": AI_HEDGE_ENABLED, **ai_hedge.stats()}}
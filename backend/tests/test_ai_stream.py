@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from backend.core.replica_pool import ReplicaPool
+from backend.domains.b2b import gateway, wire
+
+TRACK = {"type": "track", "track": "track_a", "data": {}}
+META = {"type": "meta", "elapsed_time": 0.1, "reserve": None}
+ERROR = {"type": "error", "error": {"code": "AI_SERVICE_ERROR", "message": "boom"}}
+
+
+class FakeClients:
+    def __init__(self, handler):
+        self.handler = handler
+
+    def get_async(self, name):
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """AI 복제본 1개 풀 + complete / cancel 호출 기록"""
+    pool = ReplicaPool("test", ["http://ai"], probe_interval=0)
+    calls = []
+    complete, cancel = pool.complete, pool.cancel
+
+    def record_complete(replica, started, ok):
+        calls.append(("complete", ok))
+        complete(replica, started, ok)
+
+    def record_cancel(replica):
+        calls.append(("cancel",))
+        cancel(replica)
+
+    monkeypatch.setattr(pool, "complete", record_complete)
+    monkeypatch.setattr(pool, "cancel", record_cancel)
+    monkeypatch.setattr(gateway, "ai_pool", pool)
+    pool.calls = calls
+    return pool
+
+
+def _serve(monkeypatch, *frames):
+    body = "".join(json.dumps(frame) + "\n" for frame in frames)
+
+    def handler(request):
+        return httpx.Response(200, text=body, headers={"content-type": wire.NDJSON_MEDIA_TYPE})
+
+    monkeypatch.setattr(gateway, "http_clients", FakeClients(handler))
+
+
+async def _consume(limit=None):
+    """external_router처럼 마지막 프레임까지 읽고 aclose()"""
+    frames = gateway.stream_from_ai("/recommend", {})
+    received = []
+    try:
+        async for frame in frames:
+            received.append(frame)
+            if frame["type"] in ("meta", "error") or len(received) == limit:
+                break
+    finally:
+        await frames.aclose()
+    return received
+
+
+class TestStreamFromAiPoolAccounting:
+    """스트림 결과가 복제본 풀 브레이커 / 지연 시간에 반영 (정상 종료 후 aclose()는 취소가 아님)"""
+
+    def test_completed_stream_counts_as_success(self, pool, monkeypatch):
+        _serve(monkeypatch, TRACK, META)
+        replica = pool.replicas[0]
+        replica.consecutive_failures = 2
+
+        frames = asyncio.run(_consume())
+        assert [frame["type"] for frame in frames] == ["track", "meta"]
+        assert pool.calls == [("complete", True)]
+        assert replica.consecutive_failures == 0
+        assert len(replica.latencies_ms) == 1
+
+    def test_error_frame_counts_as_failure(self, pool, monkeypatch):
+        _serve(monkeypatch, TRACK, ERROR)
+
+        asyncio.run(_consume())
+        assert pool.calls == [("complete", False)]
+        assert pool.replicas[0].consecutive_failures == 1
+
+    def test_close_before_last_frame_is_cancel(self, pool, monkeypatch):
+        _serve(monkeypatch, TRACK, META)
+
+        asyncio.run(_consume(limit=1))
+        assert pool.calls == [("cancel",)]
+        assert len(pool.replicas[0].latencies_ms) == 0
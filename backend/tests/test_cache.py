@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+
+from backend.utils.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    """프로세스 내 캐시 테스트"""
+
+    def test_lru_eviction(self):
+        """maxsize 초과 시 가장 오래 쓰지 않은 항목 제거"""
+        cache = TTLCache("test_lru", maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1  # a 최근 사용
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+        assert len(cache) == 2
+
+    def test_ttl_expiry(self):
+        """ttl이 지난 항목은 미스"""
+        clock = FakeClock()
+        cache = TTLCache("test_ttl", ttl=10, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 9
+        assert cache.get("a") == 1
+        clock.now = 10
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_counters(self):
+        cache = TTLCache("test_counters")
+        cache.get_or_load("a", lambda: 1)
+        cache.get_or_load("a", lambda: 2)
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["loads"]) == (1, 1, 1)
+
+    def test_none_not_cached_by_default(self):
+        calls = []
+        cache = TTLCache("test_none")
+        for _ in range(2):
+            cache.get_or_load("a", lambda: calls.append(1))
+        assert len(calls) == 2
+
+        cache = TTLCache("test_cache_none", cache_none=True)
+        calls.clear()
+        for _ in range(2):
+            cache.get_or_load("a", lambda: calls.append(1))
+        assert len(calls) == 1
+
+    def test_single_flight(self):
+        """동시 미스 10건 → loader 1회"""
+        cache = TTLCache("test_single_flight")
+        calls = []
+        results = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.1)
+            return "value"
+
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader)))
+            for _ in range(10)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert results == ["value"] * 10
+
+    def test_load_error(self):
+        """loader 예외 전달, stale_on_error면 만료된 값 반환"""
+        clock = FakeClock()
+
+        def fail():
+            raise RuntimeError("db down")
+
+        cache = TTLCache("test_error", ttl=10, clock=clock)
+        with pytest.raises(RuntimeError):
+            cache.get_or_load("a", fail)
+
+        cache = TTLCache("test_stale", ttl=10, stale_on_error=True, clock=clock)
+        cache.set("a", "old")
+        clock.now = 20
+        assert cache.get_or_load("a", fail) == "old"
+        assert cache.stats()["load_errors"] == 1
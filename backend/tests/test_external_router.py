@@ -0,0 +1,167 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from backend.core.rate_limit import RateLimitResult
+from backend.domains.b2b import external_router
+from backend.domains.b2b.dependencies import ApiPrincipal
+
+
+@pytest.fixture
+def charges(monkeypatch):
+    """enforce_rate_limit / record_usage 호출 기록 (Redis / DB 없이)"""
+    calls = {"charged": [], "usage": []}
+
+    async def fake_enforce(principal, cost=1):
+        calls["charged"].append(cost)
+        raise AssertionError("should not be charged")
+
+    async def fake_record_usage(key_id, endpoint, status_code, process_time_ms, count=1):
+        calls["usage"].append((endpoint, status_code, count))
+
+    monkeypatch.setattr(external_router, "enforce_rate_limit", fake_enforce)
+    monkeypatch.setattr(external_router, "record_usage", fake_record_usage)
+    return calls
+
+
+class TestDebugProfileAuth:
+    """X-Debug-Profile은 어드민 키만 - 거부된 호출은 한도 차감 없음"""
+
+    def test_recommend_rejects_before_charge(self, charges):
+        api_key = ApiPrincipal(1, 1, 1000, plan_type="BASIC")
+        request = external_router.RecommendRequest(user_movie_ids=[1])
+
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(external_router.external_recommend(
+                request, api_key, x_debug_profile="1", accept=None, idempotency_key=None
+            ))
+        assert exc.value.status_code == 403
+        assert charges["charged"] == []
+
+    def test_recommend_single_rejects_before_charge(self, charges):
+        api_key = ApiPrincipal(1, 1, 1000, plan_type="BASIC")
+        request = external_router.RecommendSingleRequest(user_movie_ids=[1], target_runtime=100)
+
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(external_router.external_recommend_single(
+                request, api_key, x_debug_profile="1", idempotency_key=None
+            ))
+        assert exc.value.status_code == 403
+        assert charges["charged"] == []
+
+
+def _frames(*items):
+    """stream_from_ai 대체 - dict는 프레임, 예외는 그 시점에 발생"""
+    async def stream(path, payload):
+        for item in items:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    return stream
+
+
+async def _read_stream(request, api_key):
+    response = await external_router._stream_recommend(request, api_key, external_router.wire.NDJSON_MEDIA_TYPE, 0)
+    return [json.loads(line) async for line in response.body_iterator]
+
+
+class TestStreamRecommend:
+    """/v1/recommend 스트리밍 - 빈 / 깨진 AI 스트림도 오류 응답 + 실제 상태 코드로 사용량 기록"""
+
+    def _api_key(self):
+        api_key = ApiPrincipal(1, 1, 1000, plan_type="BASIC")
+        api_key.rate_limit = RateLimitResult(True, 1000, 1, 0)
+        return api_key
+
+    def test_empty_stream_is_503(self, charges, monkeypatch):
+        monkeypatch.setattr(external_router, "stream_from_ai", _frames())
+
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(_read_stream(external_router.RecommendRequest(user_movie_ids=[1]), self._api_key()))
+        assert exc.value.status_code == 503
+        assert charges["usage"] == [("/v1/recommend", 503, 1)]
+
+    def test_failure_after_first_track_ends_with_error_frame(self, charges, monkeypatch):
+        invalid = HTTPException(503, {"code": "AI_SERVICE_ERROR", "message": "Invalid response from AI service"})
+        track = {"type": "track", "track": "track_a", "data": {"label": "A", "movies": [], "total_runtime": 0}}
+        monkeypatch.setattr(external_router, "stream_from_ai", _frames(track, invalid))
+
+        frames = asyncio.run(_read_stream(external_router.RecommendRequest(user_movie_ids=[1]), self._api_key()))
+        assert [frame["type"] for frame in frames] == ["track", "error"]
+        assert frames[1]["error"]["code"] == "AI_SERVICE_ERROR"
+        assert charges["usage"] == [("/v1/recommend", 503, 1)]
+
+    def test_complete_stream(self, charges, monkeypatch):
+        track_a = {"type": "track", "track": "track_a", "data": {}}
+        track_b = {"type": "track", "track": "track_b", "data": {}}
+        meta = {"type": "meta", "elapsed_time": 0.1, "reserve": None}
+        monkeypatch.setattr(external_router, "stream_from_ai", _frames(track_a, track_b, meta))
+
+        frames = asyncio.run(_read_stream(external_router.RecommendRequest(user_movie_ids=[1]), self._api_key()))
+        assert [frame["type"] for frame in frames] == ["track", "track", "meta"]
+        assert frames[2]["data"]["remaining_quota"] == 999
+        assert charges["usage"] == [("/v1/recommend", 200, 1)]
+
+
+class TestRecommendBatch:
+    """/v1/recommend/batch - 부분 허용된 한도 / 항목별 AI 오류가 결과와 사용량 상태 코드에 반영"""
+
+    def _run(self, charges, monkeypatch, count, granted, outcomes):
+        api_key = ApiPrincipal(1, 1, 1000, plan_type="BASIC")
+        requested = []
+
+        async def fake_enforce(principal, cost=1):
+            charges["charged"].append(cost)
+            principal.rate_limit = RateLimitResult(True, 1000, 1000, 0, granted=granted)
+            return principal.rate_limit
+
+        async def fake_forward(path, payload):
+            requested.append(len(payload["items"]))
+            if isinstance(outcomes, Exception):
+                raise outcomes
+            return {"results": outcomes}
+
+        monkeypatch.setattr(external_router, "enforce_rate_limit", fake_enforce)
+        monkeypatch.setattr(external_router, "forward_to_ai", fake_forward)
+        request = external_router.BatchRecommendRequest(
+            items=[external_router.RecommendRequest(user_movie_ids=[i + 1]) for i in range(count)]
+        )
+        response = asyncio.run(external_router.external_recommend_batch(request, api_key, idempotency_key=None))
+        return json.loads(response.body), requested
+
+    def test_items_past_granted_are_rate_limited(self, charges, monkeypatch):
+        outcomes = [{"data": {"track_a": {"movies": []}, "track_b": {"movies": []}}}] * 2
+        body, requested = self._run(charges, monkeypatch, count=4, granted=2, outcomes=outcomes)
+
+        assert charges["charged"] == [4]
+        assert requested == [2]  # 허용된 항목만 AI 호출
+        results = body["data"]["results"]
+        assert [entry["success"] for entry in results] == [True, True, False, False]
+        assert [entry["error"]["code"] for entry in results[2:]] == ["RATE_LIMIT_EXCEEDED"] * 2
+        assert body["meta"]["succeeded"] == 2 and body["meta"]["failed"] == 2
+        # 거부된 항목은 사용량 기록 없음
+        assert charges["usage"] == [("/v1/recommend/batch", 200, 2)]
+
+    def test_item_ai_error_is_recorded_as_500(self, charges, monkeypatch):
+        outcomes = [
+            {"data": {"track_a": {"movies": []}, "track_b": {"movies": []}}},
+            {"error": "boom"},
+            {"data": {"track_a": {"movies": []}, "track_b": {"movies": []}}},
+        ]
+        body, _ = self._run(charges, monkeypatch, count=4, granted=3, outcomes=outcomes)
+
+        results = body["data"]["results"]
+        assert [entry["success"] for entry in results] == [True, False, True, False]
+        assert results[1]["error"]["code"] == "RECOMMENDATION_FAILED"
+        assert results[3]["error"]["code"] == "RATE_LIMIT_EXCEEDED"
+        assert sorted(charges["usage"]) == [("/v1/recommend/batch", 200, 2), ("/v1/recommend/batch", 500, 1)]
+
+    def test_ai_failure_records_status_for_granted_items(self, charges, monkeypatch):
+        error = HTTPException(status_code=503, detail={"code": "AI_SERVICE_ERROR", "message": "down"})
+
+        with pytest.raises(HTTPException) as exc:
+            self._run(charges, monkeypatch, count=3, granted=2, outcomes=error)
+        assert exc.value.status_code == 503
+        assert charges["usage"] == [("/v1/recommend/batch", 503, 2)]
@@ -0,0 +1,27 @@
+from backend.core.hedging import HedgePolicy
+
+
+class TestHedgePolicy:
+    """hedged request 정책 테스트"""
+
+    def test_delay_needs_samples(self):
+        policy = HedgePolicy("test", min_samples=10, min_delay_ms=1)
+        for ms in range(1, 10):
+            policy.record_latency("/recommend", ms)
+        assert policy.delay("/recommend") is None
+
+        policy.record_latency("/recommend", 1000)
+        # 10건 중 p95 = 최댓값
+        assert policy.delay("/recommend") == 1.0
+        assert policy.delay("/recommend_single") is None
+
+    def test_budget(self):
+        """요청 100건당 hedge 5건까지"""
+        policy = HedgePolicy("test", budget_ratio=0.05)
+        granted = 0
+        for _ in range(100):
+            policy.on_request()
+            granted += policy.try_acquire()
+
+        assert granted == 5
+        assert policy.stats()["budget_exhausted"] == 95
@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from backend.core.json_response import FastJSONResponse
+from backend.core.rate_limit import RateLimitResult
+from backend.domains.b2b import external_router, idempotency
+from backend.domains.b2b.dependencies import ApiPrincipal
+
+
+class FakeRedis:
+    """idempotency가 쓰는 명령만 구현한 메모리 Redis (SET NX / GET / 처리 중 표시 해제 스크립트)"""
+
+    def __init__(self):
+        self.data = {}
+        self.set_calls = 0
+
+    async def set(self, key, value, nx=False, ex=None):
+        self.set_calls += 1
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    def register_script(self, script):
+        async def release(keys, args):
+            if self.data.get(keys[0]) == args[0]:
+                del self.data[keys[0]]
+                return 1
+            return 0
+        return release
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+
+    async def get_redis():
+        return fake
+
+    monkeypatch.setattr(idempotency, "get_redis", get_redis)
+    monkeypatch.setattr(idempotency, "_release_script", None)
+    monkeypatch.setattr(idempotency, "_inflight", {})
+    return fake
+
+
+class TestIdempotency:
+    """Idempotency-Key 처리 테스트"""
+
+    def test_without_key_is_noop(self):
+        idempotent = asyncio.run(idempotency.begin(1, "/v1/recommend", None, {"user_movie_ids": [1]}))
+
+        assert idempotent.replay is None and idempotent.redis_key is None
+        asyncio.run(idempotent.release())
+
+    def test_invalid_key(self):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(idempotency.begin(1, "/v1/recommend", "k" * 256, {}))
+        assert exc.value.status_code == 400
+        assert exc.value.detail["code"] == "INVALID_IDEMPOTENCY_KEY"
+
+    def test_fingerprint_ignores_key_order(self):
+        a = idempotency._fingerprint({"user_movie_ids": [1, 2], "available_time": 180})
+        b = idempotency._fingerprint({"available_time": 180, "user_movie_ids": [1, 2]})
+
+        assert a == b
+        assert a != idempotency._fingerprint({"available_time": 180, "user_movie_ids": [2, 1]})
+
+    def test_reuse_with_different_body(self, redis):
+        async def main():
+            first = await idempotency.begin(1, "/v1/recommend", "k1", {"user_movie_ids": [1]})
+            await first.complete(FastJSONResponse({"ok": True}))
+            await idempotency.begin(1, "/v1/recommend", "k1", {"user_movie_ids": [2]})
+
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(main())
+        assert exc.value.status_code == 422
+        assert exc.value.detail["code"] == "IDEMPOTENCY_KEY_REUSED"
+
+    def test_concurrent_requests_share_result(self, redis):
+        payload = {"user_movie_ids": [1]}
+
+        async def main():
+            owner = await idempotency.begin(1, "/v1/recommend", "k1", payload)
+            waiter = asyncio.create_task(idempotency.begin(1, "/v1/recommend", "k1", payload))
+            await asyncio.sleep(0)
+            assert not waiter.done()  # 같은 워커 → _inflight Future 대기
+            await owner.complete(FastJSONResponse({"movies": [1]}, headers={"X-RateLimit-Remaining": "9"}))
+            return owner, await waiter
+
+        owner, waiter = asyncio.run(main())
+        assert owner.token is not None and waiter.token is None
+        assert waiter.replay_response().body == b'{"movies":[1]}'
+        assert waiter.replay_response().headers["x-ratelimit-remaining"] == "9"
+        assert redis.set_calls == 2  # 처리 중 표시 1회 + 완료 응답 저장 1회 (대기 요청은 Redis 미사용)
+        assert idempotency._inflight == {}
+
+    def test_release_allows_retry(self, redis):
+        payload = {"user_movie_ids": [1]}
+
+        async def main():
+            failed = await idempotency.begin(1, "/v1/recommend", "k1", payload)
+            await failed.release()
+            return await idempotency.begin(1, "/v1/recommend", "k1", payload)
+
+        retry = asyncio.run(main())
+        assert retry.replay is None and retry.token is not None
+
+
+class TestIdempotentEndpoint:
+    """/v1/recommend 재시도 - 저장된 응답 재사용, 한도 차감 / AI 호출 / 사용량 기록 없음"""
+
+    def test_replay_does_not_charge(self, redis, monkeypatch):
+        calls = {"charged": 0, "ai": 0, "usage": 0}
+
+        async def fake_enforce(principal, cost=1):
+            calls["charged"] += cost
+            principal.rate_limit = RateLimitResult(True, 1000, calls["charged"], 0)
+            return principal.rate_limit
+
+        async def fake_forward(path, payload, headers=None):
+            calls["ai"] += 1
+            return {"track_a": {"movies": [calls["ai"]]}, "track_b": {"movies": []}}
+
+        async def fake_record_usage(*args, **kwargs):
+            calls["usage"] += 1
+
+        monkeypatch.setattr(external_router, "enforce_rate_limit", fake_enforce)
+        monkeypatch.setattr(external_router, "forward_to_ai", fake_forward)
+        monkeypatch.setattr(external_router, "record_usage", fake_record_usage)
+
+        async def call():
+            return await external_router.external_recommend(
+                external_router.RecommendRequest(user_movie_ids=[1]), ApiPrincipal(1, 1, 1000),
+                x_debug_profile=None, accept=None, idempotency_key="retry-1"
+            )
+
+        first = asyncio.run(call())
+        retry = asyncio.run(call())
+        assert retry.body == first.body
+        assert retry.headers[idempotency.REPLAYED_HEADER] == "true"
+        assert retry.headers["x-ratelimit-remaining"] == "999"
+        assert calls == {"charged": 1, "ai": 1, "usage": 1}
@@ -0,0 +1,37 @@
+import anyio
+import anyio.to_thread
+import pytest
+
+from backend.domains.b2b import gateway
+from backend.domains.b2b.dependencies import ApiPrincipal
+
+
+@pytest.fixture
+def internal_calls(monkeypatch):
+    """call_internal 대체 - 호출 횟수 기록 후 RuntimeError (차감 / AI 호출 이후 오류 가정)"""
+    calls = []
+
+    async def fake_call_internal(principal, endpoint, payload):
+        calls.append(endpoint)
+        raise RuntimeError("failure inside call_internal")
+
+    monkeypatch.setattr(gateway, "call_internal", fake_call_internal)
+    monkeypatch.setattr(gateway, "get_internal_principal", lambda: ApiPrincipal(1, 1, 1000, internal=True))
+    return calls
+
+
+class TestCallInternalFromThread:
+    """HTTP 대체 경로(InternalTransportUnavailable)는 호출 전 판별만 - 이중 차감 방지"""
+
+    def test_outside_worker_thread_is_unavailable(self, internal_calls):
+        with pytest.raises(gateway.InternalTransportUnavailable):
+            gateway.call_internal_from_thread("/v1/recommend", {})
+        assert internal_calls == []
+
+    def test_error_inside_call_propagates(self, internal_calls):
+        async def main():
+            await anyio.to_thread.run_sync(gateway.call_internal_from_thread, "/v1/recommend", {})
+
+        with pytest.raises(RuntimeError, match="inside call_internal"):
+            anyio.run(main)
+        assert internal_calls == ["/v1/recommend"]
@@ -0,0 +1,27 @@
+import json
+from datetime import date
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+
+from backend.core.json_response import FastJSONResponse, dumps
+
+
+class TestFastJSONResponse:
+    """orjson 응답 직렬화 테스트"""
+
+    def test_db_types(self):
+        body = {"price": Decimal("1.5"), "day": date(2026, 1, 2), "id": UUID(int=1), "ko": "추천"}
+
+        assert json.loads(dumps(body)) == {
+            "price": 1.5, "day": "2026-01-02", "id": "00000000-0000-0000-0000-000000000001", "ko": "추천"
+        }
+
+    def test_numpy_values(self):
+        np = pytest.importorskip("numpy")
+        body = {"score": np.float32(0.5), "id": np.int64(7), "vec": np.arange(3), "cols": np.eye(2)[:, 0]}
+
+        response = FastJSONResponse(body, headers={"X-RateLimit-Remaining": "9"})
+        assert json.loads(response.body) == {"score": 0.5, "id": 7, "vec": [0, 1, 2], "cols": [1.0, 0.0]}
+        assert response.headers["x-ratelimit-remaining"] == "9"
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from backend.core import rate_limit
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")  # Lua 스크립트 실행
+
+
+@pytest.fixture
+def hit(monkeypatch):
+    """메모리 Redis(fakeredis + Lua)에서 hit() 실행 - 같은 이벤트 루프에서 여러 번 호출"""
+    monkeypatch.setattr(rate_limit, "redis_client", fakeredis.aioredis.FakeRedis(decode_responses=True))
+    monkeypatch.setattr(rate_limit, "_hit_script", None)
+    # burst 카운터는 초 단위 키 → 테스트 중 초가 바뀌지 않게 고정
+    now = float(int(rate_limit.time.time()))
+    monkeypatch.setattr(rate_limit.time, "time", lambda: now)
+
+    def run(*calls):
+        async def main():
+            return [await rate_limit.hit(*args, **kwargs) for args, kwargs in calls]
+        return asyncio.run(main())
+    return run
+
+
+def call(*args, **kwargs):
+    return args, kwargs
+
+
+class TestRateLimitHit:
+    """_HIT_SCRIPT - burst / 일일 한도 / 부분 허용"""
+
+    def test_daily_limit_rejection_is_not_counted(self, hit):
+        results = hit(call("1", 2), call("1", 2), call("1", 2), call("1", 2))
+
+        assert [r.allowed for r in results] == [True, True, False, False]
+        assert results[-1].exceeded == "daily"
+        assert results[-1].count == 2  # 거부된 호출은 카운트하지 않음
+        assert results[-1].headers()["Retry-After"]
+
+    def test_burst_rejection_does_not_count_daily(self, hit):
+        results = hit(call("1", 10, 2), call("1", 10, 2), call("1", 10, 2), call("1", 10))
+
+        assert [r.allowed for r in results[:3]] == [True, True, False]
+        assert results[2].exceeded == "burst" and results[2].retry_after == 1
+        assert results[2].count == 2
+        assert results[3].count == 3  # burst 거부분은 일일 카운트에 없음
+
+    def test_partial_grant(self, hit):
+        first, batch, after = hit(call("1", 5, cost=3), call("1", 5, cost=4), call("1", 5, cost=2))
+
+        assert (first.granted, first.remaining) == (3, 2)
+        assert batch.allowed and batch.granted == 2 and batch.remaining == 0
+        assert not after.allowed and after.granted == 0 and after.exceeded == "daily"
+
+    def test_keys_are_separate(self, hit):
+        a, b = hit(call("1", 1), call("2", 1))
+
+        assert a.allowed and b.allowed
@@ -0,0 +1,146 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import httpx
+import pytest
+
+from backend.core.replica_pool import CLOSED, HALF_OPEN, OPEN, ReplicaPool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_pool(urls, **kwargs):
+    # probe_interval=0: 백그라운드 헬스 체크 스레드 없이 테스트에서 직접 호출
+    return ReplicaPool("test", urls, probe_interval=0, **kwargs)
+
+
+@pytest.fixture
+def health_server():
+    """/health 응답 본문을 지정할 수 있는 로컬 AI 서비스 대역"""
+    servers = []
+
+    def start(body: dict, status: int = 200) -> str:
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+class TestReplicaPool:
+    """AI 복제본 풀 테스트"""
+
+    def test_least_outstanding(self):
+        pool = make_pool(["http://a", "http://b", "http://c"])
+        a, b, c = pool.replicas
+        pool.begin(a)
+        pool.begin(a)
+        pool.begin(b)
+
+        assert pool.choose() is c
+        pool.begin(c)
+        assert pool.choose() in (b, c)
+
+    def test_breaker_open_and_half_open(self):
+        clock = FakeClock()
+        pool = make_pool(["http://a", "http://b"], failure_threshold=3, open_seconds=10, clock=clock)
+        a, b = pool.replicas
+
+        for _ in range(3):
+            pool.complete(a, pool.begin(a), ok=False)
+        assert a.state == OPEN
+        assert all(pool.choose() is b for _ in range(5))
+
+        # open_seconds 경과 → 시험 요청 1건만 허용
+        clock.now = 10
+        pool.begin(b)  # b가 더 바쁘게 만들어 a 선택 유도
+        assert pool.choose() is a
+        assert a.state == HALF_OPEN
+        started = pool.begin(a)
+        assert pool.choose() is b  # 시험 요청 진행 중에는 a 제외
+
+        # 시험 요청 실패 → 다시 open
+        pool.complete(a, started, ok=False)
+        assert a.state == OPEN
+
+        clock.now = 20
+        pool.choose()
+        pool.complete(a, pool.begin(a), ok=True)
+        assert a.state == CLOSED
+
+    def test_all_open_returns_none(self):
+        pool = make_pool(["http://a"], failure_threshold=1)
+        a = pool.replicas[0]
+        pool.complete(a, pool.begin(a), ok=False)
+
+        assert pool.choose() is None
+        assert pool.stats()["no_replica"] == 1
+
+    def test_p99_ejection(self):
+        clock = FakeClock()
+        pool = make_pool(
+            ["http://a", "http://b"],
+            min_samples=10, eject_p99_ms=100, eject_seconds=30, clock=clock
+        )
+        a, b = pool.replicas
+        for replica, latency in ((a, 0.5), (b, 0.01)):
+            for _ in range(10):
+                started = pool.begin(replica)
+                clock.now += latency
+                pool.complete(replica, started, ok=True)
+
+        pool.evaluate_latency()
+        assert a.ejections == 1 and b.ejections == 0
+        assert all(pool.choose() is b for _ in range(5))
+
+        # 제외 기간 종료 → 복귀 (이전 표본은 비움)
+        clock.now += 30
+        pool.evaluate_latency()
+        assert a.ejected_until == 0 and len(a.latencies_ms) == 0
+
+    def test_last_replica_not_ejected(self):
+        clock = FakeClock()
+        pool = make_pool(["http://a"], min_samples=1, eject_p99_ms=100, clock=clock)
+        a = pool.replicas[0]
+        started = pool.begin(a)
+        clock.now += 1
+        pool.complete(a, started, ok=True)
+
+        pool.evaluate_latency()
+        assert a.ejections == 0
+        assert pool.choose() is a
+
+    def test_health_probe(self, health_server):
+        ready = health_server({"status": "healthy", "ready": True})
+        loading = health_server({"status": "healthy", "ready": False})
+        down = "http://127.0.0.1:9"  # 연결 거부
+        pool = make_pool([ready, loading, down], unhealthy_threshold=1)
+
+        with httpx.Client() as client:
+            pool.probe_all(client)
+
+        healthy = {r.url: r.healthy for r in pool.replicas}
+        assert healthy == {ready: True, loading: False, down: False}
+        assert all(pool.choose().url == ready for _ in range(5))
@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from backend.domains.b2b import wire
+
+
+class TestStreamWire:
+    """/v1/recommend 스트리밍 형식 선택 / 프레임 인코딩 테스트"""
+
+    def test_media_type_from_accept(self):
+        assert wire.stream_media_type(None) is None
+        assert wire.stream_media_type("application/json") is None
+        assert wire.stream_media_type("application/x-ndjson") == wire.NDJSON_MEDIA_TYPE
+        assert wire.stream_media_type("text/event-stream, application/x-ndjson") == wire.SSE_MEDIA_TYPE
+
+    def test_encode_frame(self):
+        frame = {"type": "track", "track": "track_a", "data": {"label": "추천"}}
+
+        ndjson = wire.encode_frame(wire.NDJSON_MEDIA_TYPE, frame)
+        assert ndjson.endswith(b"\n") and json.loads(ndjson) == frame
+
+        event, data, blank, _ = wire.encode_frame(wire.SSE_MEDIA_TYPE, frame).split(b"\n")
+        assert event == b"event: track" and blank == b""
+        assert json.loads(data[len(b"data: "):]) == frame
+
+
+class TestCompactSingle:
+    """msgpack /recommend_single 응답도 JSON 경로와 같은 필드 (fallback_level / fallback_info 포함)"""
+
+    def test_fallback_fields_pass_through(self, monkeypatch):
+        msgpack = pytest.importorskip("msgpack")
+        display = {"tmdb_id": 10, "title": "추천", "runtime": 100, "genres": ["Drama"], "vote_average": 7.5,
+                   "vote_count": 10, "overview": "", "release_date": "2020-01-01", "poster_path": "/p.jpg"}
+
+        async def fake_get_many(movie_ids):
+            return {movie_id: display for movie_id in movie_ids}
+
+        monkeypatch.setattr(wire.movie_catalog, "get_many_async", fake_get_many)
+        body = {"fields": ["movie_id", "score", "runtime", "recommendation_type"], "movie": [1, 0.5, 100, "a"],
+                "fallback_level": 1, "fallback_info": "good (70-100%)"}
+        response = httpx.Response(200, content=msgpack.packb(body), headers={"content-type": wire.MSGPACK_MEDIA_TYPE})
+
+        movie = asyncio.run(wire.decode(response))
+        assert movie["movie_id"] == 1 and movie["title"] == "추천"
+        assert (movie["fallback_level"], movie["fallback_info"]) == (1, "good (70-100%)")
+        assert list(movie)[-2:] == ["fallback_level", "fallback_info"]
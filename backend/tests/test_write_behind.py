@@ -0,0 +1,106 @@
+import contextlib
+import threading
+import time
+
+from backend.core import write_behind
+
+
+class FakeSession:
+    """SAVEPOINT 단위로 기록되는 세션 (DB 없이 write-behind 동작 확인용)"""
+
+    def __init__(self, store):
+        self.store = store
+        self.staged = []
+
+    @contextlib.contextmanager
+    def begin_nested(self):
+        mark = len(self.staged)
+        try:
+            yield
+        except Exception:
+            del self.staged[mark:]
+            raise
+
+    def commit(self):
+        self.store.extend(self.staged)
+        self.staged = []
+
+    def rollback(self):
+        self.staged = []
+
+    def close(self):
+        pass
+
+
+class RejectingWriter(write_behind.WriteBehindQueue):
+    """"bad" 이벤트가 섞인 배치는 FK 위반처럼 전체 실패"""
+
+    def write_batch(self, db, items):
+        if "bad" in items:
+            raise ValueError("foreign key violation")
+        db.staged.extend(items)
+
+
+class TestWriteBehindQueue:
+    """배치 실패 시 실패한 이벤트만 버리는지 테스트"""
+
+    def test_bad_event_drops_only_itself(self, monkeypatch):
+        store = []
+        monkeypatch.setattr(write_behind, "SessionLocal", lambda: FakeSession(store))
+        writer = RejectingWriter("test_rejecting", flush_interval=60)
+        committed = []
+        writer.after_commit = committed.extend
+        for item in ["a", "bad", "b", "c"]:
+            writer._items.append(item)
+
+        assert writer.flush() == 4
+        assert store == ["a", "b", "c"]
+        assert committed == ["a", "b", "c"]
+        assert (writer.written, writer.failed) == (3, 1)
+        write_behind._registry.pop("test_rejecting")
+
+
+class BrokenCloseSession(FakeSession):
+    """첫 close()만 실패 (끊긴 커넥션 정리 실패 가정)"""
+
+    failures = 1
+
+    def close(self):
+        if BrokenCloseSession.failures:
+            BrokenCloseSession.failures -= 1
+            raise RuntimeError("connection already closed")
+
+
+class TestFlusherThread:
+    """flush 예외 / 죽은 스레드에도 기록이 멈추지 않는지 테스트"""
+
+    def test_flush_error_keeps_thread_running(self, monkeypatch):
+        store = []
+        monkeypatch.setattr(write_behind, "SessionLocal", lambda: BrokenCloseSession(store))
+        writer = RejectingWriter("test_flush_error", batch_size=1, flush_interval=0.01)
+
+        writer.submit("a")
+        writer.submit("b")
+        deadline = time.monotonic() + 2
+        while "b" not in store and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert "b" in store
+        assert writer._thread.is_alive()
+        writer.stop()
+        write_behind._registry.pop("test_flush_error")
+
+    def test_dead_thread_is_restarted_on_submit(self, monkeypatch):
+        store = []
+        monkeypatch.setattr(write_behind, "SessionLocal", lambda: FakeSession(store))
+        writer = RejectingWriter("test_restart", batch_size=1, flush_interval=0.01)
+        dead = threading.Thread(target=lambda: None)
+        dead.start()
+        dead.join()
+        writer._thread = dead
+
+        writer.submit("a")
+        assert writer._thread is not dead and writer._thread.is_alive()
+        writer.stop()
+        assert store == ["a"]
+        write_behind._registry.pop("test_restart")
@@ -0,0 +1,208 @@
+"""
+프로세스 내 메모리 캐시 (크기 제한 LRU + TTL + single-flight)
+
+- maxsize를 넘으면 가장 오래 쓰지 않은 항목부터 제거 → 오래 떠 있는 워커도 메모리 사용량 고정
+- ttl초가 지난 항목은 미스 (None이면 만료 없음)
+- get_or_load(): 같은 키의 동시 미스는 loader를 한 번만 실행하고 나머지는 결과를 기다림
+  (10개 요청이 동시에 미스 → DB 조회 1회)
+- loader 실패 시 stale_on_error=True면 만료된 값이라도 반환
+- stats(): 적중 / 미스 / 제거 / 만료 / 로드 건수 (/metrics/caches)
+
+Redis 캐시(context_cache 등)는 워커 간 공유가 필요한 데이터용, 이 캐시는 워커별 사전/설정용
+
+사용:
+    popular_cache = TTLCache("popular_movies", maxsize=1, ttl=86400)
+    movies = popular_cache.get_or_load("popular", load_popular_movies)
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+# 이름 → 캐시 (stats_all 대상)
+_registry: Dict[str, "TTLCache"] = {}
+
+
+class _Flight:
+    """진행 중인 loader 호출 (같은 키의 동시 미스가 결과를 공유)"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class TTLCache:
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 1024,
+        ttl: Optional[float] = None,
+        cache_none: bool = False,
+        stale_on_error: bool = False,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            maxsize: 최대 항목 수 (LRU 제거)
+            ttl: 항목 유효 시간 (초, None이면 만료 없음)
+            cache_none: loader가 None을 반환해도 저장할지 (기본: 저장하지 않고 다음에 다시 로드)
+            stale_on_error: loader 예외 시 만료된 값이 남아 있으면 반환
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.cache_none = cache_none
+        self.stale_on_error = stale_on_error
+        self._clock = clock
+
+        self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.loads = 0
+        self.load_errors = 0
+
+        _registry[name] = self
+
+    # ==================== 내부 ====================
+
+    def _expired(self, expires_at: Optional[float]) -> bool:
+        return expires_at is not None and self._clock() >= expires_at
+
+    def _lookup(self, key: Hashable) -> Any:
+        """lock 보유 상태에서 호출 - 유효한 값 또는 _MISSING"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return _MISSING
+
+        value, expires_at = entry
+        if self._expired(expires_at):
+            # stale_on_error용으로 남겨둠 (덮어쓰기 / LRU로 정리)
+            self.expirations += 1
+            self.misses += 1
+            return _MISSING
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def _store(self, key: Hashable, value: Any, ttl: Optional[float]):
+        """lock 보유 상태에서 호출"""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = self._clock() + ttl if ttl is not None else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    # ==================== 조회 / 저장 ====================
+
+    def lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        """(적중 여부, 값) - None도 캐시할 수 있는 경우 구분용"""
+        with self._lock:
+            value = self._lookup(key)
+        if value is _MISSING:
+            return False, None
+        return True, value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        hit, value = self.lookup(key)
+        return value if hit else default
+
+    def contains(self, key: Hashable) -> bool:
+        """유효한 값이 있는지 (통계에 반영하지 않음)"""
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and not self._expired(entry[1])
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        캐시 조회 → 미스면 loader() 결과 저장 후 반환 (같은 키는 동시에 한 번만 실행)
+
+        loader 예외는 기다리던 호출자 모두에게 전달 (stale_on_error면 만료된 값 반환)
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                return value
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = loader()
+            flight.value = value
+            with self._lock:
+                self.loads += 1
+                if value is not None or self.cache_none:
+                    self._store(key, value, ttl)
+            return value
+        except BaseException as e:
+            with self._lock:
+                self.load_errors += 1
+                entry = self._data.get(key)
+            if self.stale_on_error and entry is not None:
+                print(f"[Cache:{self.name}] Load failed, serving stale value: {e}")
+                flight.value = entry[0]
+                return entry[0]
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "loads": self.loads,
+            "load_errors": self.load_errors,
+        }
+
+
+def stats_all() -> dict:
+    return {name: cache.stats() for name, cache in _registry.items()}
@@ -0,0 +1,46 @@
+-- =============================================
+-- MovieSir B2B 마이그레이션
+-- 004: api_usage (key_id, usage_date) 유니크 제약
+-- 생성일: 2025-01-29
+--
+-- 일별 사용량은 Redis 카운터(HINCRBY)에 모았다가 백그라운드에서
+-- INSERT ... ON CONFLICT (key_id, usage_date) DO UPDATE로 더함
+-- (조회 → 증가 → 커밋의 read-modify-write 경쟁으로 카운트가 유실되던 문제 제거)
+-- =============================================
+
+BEGIN;
+
+-- 1. 기존 중복 행 병합 (동시 요청으로 같은 날짜 행이 여러 개 생긴 경우)
+WITH merged AS (
+    SELECT key_id, usage_date,
+           MIN(usage_id) AS keep_id,
+           SUM(COALESCE(request_count, 0)) AS request_count,
+           SUM(COALESCE(error_count, 0)) AS error_count
+    FROM b2b.api_usage
+    GROUP BY key_id, usage_date
+    HAVING COUNT(*) > 1
+),
+updated AS (
+    UPDATE b2b.api_usage u
+    SET request_count = m.request_count, error_count = m.error_count
+    FROM merged m
+    WHERE u.usage_id = m.keep_id
+)
+DELETE FROM b2b.api_usage u
+USING merged m
+WHERE u.key_id = m.key_id
+  AND u.usage_date = m.usage_date
+  AND u.usage_id <> m.keep_id;
+
+-- 2. 유니크 제약 (기존 조회용 인덱스를 대체)
+ALTER TABLE b2b.api_usage
+    ADD CONSTRAINT uq_api_usage_key_date UNIQUE (key_id, usage_date);
+
+DROP INDEX IF EXISTS b2b.idx_api_usage_key_date;
+
+COMMIT;
+
+-- =============================================
+-- 적용 확인 쿼리
+-- =============================================
+-- SELECT conname FROM pg_constraint WHERE conname = 'uq_api_usage_key_date';
@@ -0,0 +1,48 @@
+-- =============================================
+-- MovieSir B2C 마이그레이션
+-- 004: 추천 세션 영화 정규화 테이블 (recommendation_session_items)
+-- 생성일: 2025-01-28
+--
+-- 이전 추천 제외 목록을 feedback_details(JSONB)의 track_a_ids / track_b_ids를
+-- 매 요청 파싱하는 대신 인덱스가 있는 정규화 테이블에서 SELECT DISTINCT로 조회
+-- save_recommendation_session이 세션과 같은 문장(트랜잭션)에서 기록
+-- =============================================
+
+BEGIN;
+
+-- 1. 세션별 추천 영화 (트랙 구분)
+CREATE TABLE IF NOT EXISTS b2c.recommendation_session_items (
+    session_id BIGINT NOT NULL REFERENCES b2c.recommendation_sessions(session_id) ON DELETE CASCADE,
+    user_id UUID NOT NULL,
+    movie_id INTEGER NOT NULL,
+    track CHAR(1) NOT NULL,  -- 'a': 선호 장르, 'b': 장르 확장
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (session_id, track, movie_id)
+);
+
+-- 사용자별 최근 추천 영화 (기간 기준 조회 / 사용자 삭제 정리용)
+CREATE INDEX IF NOT EXISTS idx_rec_session_items_user_created
+    ON b2c.recommendation_session_items (user_id, created_at DESC);
+
+-- 2. recommendation_sessions 인덱스
+-- 사용자별 최근 N개 세션 (제외 목록, 추천 컨텍스트)
+CREATE INDEX IF NOT EXISTS idx_rec_sessions_user_created
+    ON b2c.recommendation_sessions (user_id, created_at DESC);
+
+-- 장르 겹침 필터 (req_genres && :genres)
+CREATE INDEX IF NOT EXISTS idx_rec_sessions_req_genres
+    ON b2c.recommendation_sessions USING GIN (req_genres);
+
+-- 3. 기존 세션 백필 (feedback_details의 track_a_ids / track_b_ids)
+INSERT INTO b2c.recommendation_session_items (session_id, user_id, movie_id, track, created_at)
+SELECT s.session_id, s.user_id, ids.value::int, t.track, COALESCE(s.created_at, NOW())
+FROM b2c.recommendation_sessions s
+CROSS JOIN (VALUES ('a', 'track_a_ids'), ('b', 'track_b_ids')) AS t(track, field)
+CROSS JOIN LATERAL jsonb_array_elements_text(
+    CASE WHEN jsonb_typeof(s.feedback_details->t.field) = 'array'
+         THEN s.feedback_details->t.field ELSE '[]'::jsonb END
+) AS ids(value)
+WHERE s.user_id IS NOT NULL
+ON CONFLICT DO NOTHING;
+
+COMMIT;